@@ -0,0 +1,31 @@
+"""add created_at indexes for keyset pagination
+
+Revision ID: 7c1f0a2d9b4e
+Revises: 333be6389f09
+Create Date: 2026-10-18 19:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1f0a2d9b4e'
+down_revision: Union[str, Sequence[str], None] = '333be6389f09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # InnoDB 二级索引隐含主键，(created_at) 即可支撑 ORDER BY created_at, id
+    op.create_index('created_at_index', 'f_attachment', ['created_at'], unique=False)
+    op.create_index('created_at_index', 'f_sys_admin', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('created_at_index', table_name='f_sys_admin')
+    op.drop_index('created_at_index', table_name='f_attachment')
@@ -0,0 +1,52 @@
+"""add content-addressed attachment blobs
+
+Revision ID: a93e5b7d2c10
+Revises: 7c1f0a2d9b4e
+Create Date: 2026-10-18 20:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93e5b7d2c10'
+down_revision: Union[str, Sequence[str], None] = '7c1f0a2d9b4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'f_attachment_blob',
+        sa.Column('id', mysql.BIGINT(), nullable=False),
+        sa.Column('attach_hash', mysql.CHAR(length=64), nullable=False, comment='内容 SHA-256（十六进制）'),
+        sa.Column('storage_key', mysql.VARCHAR(length=255), nullable=False, comment='存储路径'),
+        sa.Column('attach_size', mysql.BIGINT(), server_default=sa.text("'0'"), nullable=False, comment='内容字节数'),
+        sa.Column('attach_mimetype', mysql.VARCHAR(length=128), server_default=sa.text("''"), nullable=False, comment='mime类型'),
+        sa.Column('attach_extension', mysql.VARCHAR(length=16), server_default=sa.text("''"), nullable=False, comment='后缀名'),
+        sa.Column('ref_count', mysql.INTEGER(), server_default=sa.text("'0'"), nullable=False, comment='引用该内容的附件数'),
+        sa.Column('created_at', mysql.INTEGER(), server_default=sa.text("'0'"), nullable=False),
+        sa.Column('updated_at', mysql.INTEGER(), server_default=sa.text("'0'"), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        comment='附件内容表（按内容哈希去重）',
+    )
+    op.create_index('attach_hash_index', 'f_attachment_blob', ['attach_hash'], unique=True)
+    # 存量附件没有哈希，保持空串，不参与去重
+    op.add_column(
+        'f_attachment',
+        sa.Column('attach_hash', mysql.VARCHAR(length=64), server_default=sa.text("''"), nullable=False, comment='内容 SHA-256，对应 f_attachment_blob.attach_hash'),
+    )
+    op.create_index('attach_hash_index', 'f_attachment', ['attach_hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('attach_hash_index', table_name='f_attachment')
+    op.drop_column('f_attachment', 'attach_hash')
+    op.drop_index('attach_hash_index', table_name='f_attachment_blob')
+    op.drop_table('f_attachment_blob')
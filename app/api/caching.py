@@ -0,0 +1,196 @@
+"""
+路由级响应缓存。
+
+    @router.get("/me", response_model=UserSchema)
+    @cached(tags=["user:{current_user.id}"])
+    async def read_user_me(current_user: FUsers = Depends(...)): ...
+
+依赖项（鉴权、限流等）照常执行；命中时不调用端点，直接返回缓存的响应体，
+不查询数据库也不序列化。响应带弱 ETag，If-None-Match 匹配时返回 304。
+条目过期后的 stale 秒内先返回旧内容，同时在后台重新生成（各 worker 中只有一个刷新）。
+后台刷新与标签刚失效后的重新生成从主库读取，不会把从库上的旧数据记在新的代数下。
+
+- per_user：键中带当前用户 id（取自 `current_user` 参数），响应为
+  `Cache-Control: private, no-cache`，客户端每次带 ETag 重新验证；
+  为 False 时所有用户共用一份，`public, max-age=...`
+- tags：标签模板，用端点参数格式化；写入数据后 `response_cache.invalidate(标签)` 使其失效
+- 端点返回 Response 时缓存其 body（只缓存 200）；其他返回值直接编码为 JSON，
+  不再经过 response_model 过滤
+"""
+
+import asyncio
+import functools
+import hashlib
+import inspect
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Any, Callable, Dict, Optional, Sequence, Set, Tuple
+from urllib.parse import urlencode
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.metrics import response_cache_requests_total
+from app.core.responses import etag_matches
+from app.db.replica import primary_reads
+from app.db.session import AsyncSessionLocal
+from app.middleware.utils import get_route_template
+from app.services.response_cache import CacheEntry, response_cache
+
+logger = logging.getLogger(__name__)
+
+_REFRESH_LOCK_TTL = 30  # 秒
+_REQUEST_PARAM = "_cache_request"
+
+# 后台刷新任务的强引用，避免执行中被回收
+_refreshing: Set[asyncio.Task] = set()
+
+
+def _cache_key(request: Request, user_id: Optional[int]) -> str:
+    query = urlencode(sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{request.url.path}?{query}".encode()).hexdigest()
+    return f"{'public' if user_id is None else user_id}:{digest}"
+
+
+def _render(result: Any) -> Optional[Tuple[bytes, str]]:
+    """(响应体, Content-Type)；不可缓存时返回 None"""
+    if isinstance(result, Response):
+        # StreamingResponse / FileResponse 没有 body
+        body = getattr(result, "body", None)
+        if result.status_code != 200 or body is None or "set-cookie" in result.headers:
+            return None
+        return bytes(body), result.headers.get("content-type", "application/json")
+    return to_json(result), "application/json"
+
+
+def _etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _response(
+    request: Request, entry: CacheEntry, state: str, per_user: bool
+) -> Response:
+    headers = {"ETag": entry.etag, "X-Cache": state}
+    if per_user:
+        headers["Cache-Control"] = "private, no-cache"
+    else:
+        headers["Cache-Control"] = (
+            f"public, max-age={entry.max_age}, stale-while-revalidate={entry.stale}"
+        )
+        headers["Age"] = str(int(entry.age))
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None and etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type=entry.media_type, headers=headers)
+
+
+def cached(
+    max_age: Optional[int] = None,
+    *,
+    stale: Optional[int] = None,
+    per_user: bool = True,
+    tags: Sequence[str] = (),
+) -> Callable:
+    """缓存 GET 端点的响应；max_age / stale 默认取 RESPONSE_CACHE_MAX_AGE / _STALE"""
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        params = list(signature.parameters.values())
+        if per_user and "current_user" not in signature.parameters:
+            raise TypeError(f"{func.__name__}: per_user cache needs a current_user")
+        request_param = next((p.name for p in params if p.annotation is Request), None)
+        if request_param is None:
+            params.append(
+                inspect.Parameter(
+                    _REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request
+                )
+            )
+        # 后台刷新时请求的会话已关闭，换成新的会话
+        sessions = [p.name for p in params if p.annotation is AsyncSession]
+
+        async def call(kwargs: Dict[str, Any]) -> Any:
+            if inspect.iscoroutinefunction(func):
+                return await func(**kwargs)
+            return await run_in_threadpool(func, **kwargs)
+
+        def make_entry(
+            result: Any, generations: Dict[str, int]
+        ) -> Optional[CacheEntry]:
+            rendered = _render(result)
+            if rendered is None:
+                return None
+            body, media_type = rendered
+            return CacheEntry(
+                body=body,
+                media_type=media_type,
+                etag=_etag(body),
+                created_at=time.time(),
+                max_age=settings.RESPONSE_CACHE_MAX_AGE if max_age is None else max_age,
+                stale=settings.RESPONSE_CACHE_STALE if stale is None else stale,
+                generations=generations,
+            )
+
+        async def refresh(
+            key: str, kwargs: Dict[str, Any], generations: Dict[str, int]
+        ) -> None:
+            token = await response_cache.lock(key, _REFRESH_LOCK_TTL)
+            if token is None:
+                return
+            try:
+                # 无法得知标签是否刚失效，刷新量很小，直接读主库
+                async with AsyncExitStack() as stack:
+                    for name in sessions:
+                        kwargs[name] = await stack.enter_async_context(
+                            AsyncSessionLocal()
+                        )
+                    result = await call(kwargs)
+                entry = make_entry(result, generations)
+                if entry is not None:
+                    await response_cache.set(key, entry)
+            except Exception:
+                logger.exception("response cache refresh failed for %s", key)
+            finally:
+                await response_cache.unlock(key, token)
+
+        @functools.wraps(func)
+        async def wrapper(**kwargs: Any) -> Any:
+            if request_param is None:
+                request: Request = kwargs.pop(_REQUEST_PARAM)
+            else:
+                request = kwargs[request_param]
+            if not settings.RESPONSE_CACHE_ENABLED:
+                return await call(kwargs)
+
+            key = _cache_key(request, kwargs["current_user"].id if per_user else None)
+            entry_tags = [tag.format(**kwargs) for tag in tags]
+            route = get_route_template(request.scope)
+            entry, generations, recent = await response_cache.get(key, entry_tags)
+            if entry is not None:
+                state = "HIT" if entry.fresh else "STALE"
+                if not entry.fresh:
+                    task = asyncio.create_task(
+                        refresh(key, dict(kwargs), entry.generations)
+                    )
+                    _refreshing.add(task)
+                    task.add_done_callback(_refreshing.discard)
+                response_cache_requests_total.labels(route, state.lower()).inc()
+                return _response(request, entry, state, per_user)
+
+            response_cache_requests_total.labels(route, "miss").inc()
+            with primary_reads(recent):
+                result = await call(kwargs)
+            entry = make_entry(result, generations or {})
+            if entry is None:
+                return result
+            if generations is not None:
+                await response_cache.set(key, entry)
+            return _response(request, entry, "MISS", per_user)
+
+        wrapper.__signature__ = signature.replace(parameters=params)
+        return wrapper
+
+    return decorator
@@ -1,13 +1,17 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import config, security
 from app.crud.crud_user import user_crud
-from app.db.session import get_db
+from app.crud.loader import Loaders
+from app.db.replica import set_read_your_writes_key
+from app.db.session import get_db, get_db_readonly
 from app.models.f_users import FUsers
 from app.schemas.user import TokenData
+from app.services.rbac_enforcer import rbac_enforcer
+from app.services.token_revocation import token_revocation
 
 settings = config.settings
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
@@ -22,9 +26,7 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
-        )
+        payload = security.decode_access_token(token)
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
@@ -32,15 +34,44 @@ async def get_current_user(
     except (JWTError, ValidationError):
         raise credentials_exception
 
-    user = await user_crud.get_by_username(db, username=token_data.username)
+    if await token_revocation.is_revoked(token):
+        raise credentials_exception
+
+    user = await user_crud.get_by_username_cached(db, username=token_data.username)
     if user is None:
         raise credentials_exception
+    set_read_your_writes_key(f"user:{user.id}")
     return user
 
 
+def get_loaders(db: AsyncSession = Depends(get_db_readonly)) -> Loaders:
+    """请求级 DataLoader，合并列表接口中按 id 关联查询（如附件的上传用户）"""
+    return Loaders(db)
+
+
 async def get_current_active_user(
     current_user: FUsers = Depends(get_current_user),
 ) -> FUsers:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+async def check_permission(
+    request: Request,
+    current_user: FUsers = Depends(get_current_active_user),
+) -> FUsers:
+    """
+    RBAC 鉴权：按 f_sys_casbin_rule 校验当前用户对请求路径与方法的访问权限。
+    超级管理员跳过校验。
+    """
+    if current_user.is_superuser:
+        return current_user
+    await rbac_enforcer.ensure_loaded()
+    if not rbac_enforcer.enforce(
+        current_user.username, request.url.path, request.method
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Permission denied"
+        )
+    return current_user
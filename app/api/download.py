@@ -0,0 +1,89 @@
+"""
+附件下载。
+
+文件不读入 Python：
+- 配置了 DOWNLOAD_ACCEL_REDIRECT 时只返回 `X-Accel-Redirect` 头，由 Nginx 用 sendfile 发送
+  （Range 也由 Nginx 处理）；
+- 否则使用 `FileResponse`：服务器支持 ASGI pathsend 扩展时直接交给服务器发送，
+  Range / 多段 Range（multipart/byteranges）/ If-Range 由 Starlette 处理。
+
+附件内容不可变，ETag 即内容 SHA-256，条件请求（If-None-Match / If-Modified-Since）
+在打开文件之前就返回 304。
+"""
+
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Literal, Optional
+from urllib.parse import quote
+
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from app.core.config import settings
+from app.core.responses import etag_matches
+
+Disposition = Literal["attachment", "inline"]
+
+
+class AttachmentFileResponse(FileResponse):
+    # 无 pathsend 时按块读取发送，块越大事件循环往返越少
+    chunk_size = 256 * 1024
+
+
+def _not_modified(request: Request, etag: str, last_modified: int) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return last_modified <= since
+    return False
+
+
+def _content_disposition(disposition: Disposition, filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"{disposition}; filename*=utf-8''{quoted}"
+    return f'{disposition}; filename="{filename}"'
+
+
+def file_response(
+    request: Request,
+    key: str,
+    path: str,
+    stat_result: os.stat_result,
+    *,
+    media_type: str,
+    filename: str,
+    content_hash: Optional[str] = None,
+    last_modified: Optional[int] = None,
+    disposition: Disposition = "attachment",
+) -> Response:
+    """
+    发送存储中的文件。content_hash 为空（去重之前的存量附件）时用大小与修改时间生成 ETag。
+    """
+    last_modified = last_modified or int(stat_result.st_mtime)
+    if content_hash:
+        etag = f'"{content_hash}"'
+    else:
+        etag = f'"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": f"private, max-age={settings.DOWNLOAD_CACHE_MAX_AGE}",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    headers["Content-Disposition"] = _content_disposition(disposition, filename)
+    if settings.DOWNLOAD_ACCEL_REDIRECT:
+        prefix = settings.DOWNLOAD_ACCEL_REDIRECT.rstrip("/")
+        headers["X-Accel-Redirect"] = f"{prefix}/{quote(key)}"
+        return Response(media_type=media_type, headers=headers)
+    return AttachmentFileResponse(
+        path, media_type=media_type, headers=headers, stat_result=stat_result
+    )
@@ -0,0 +1,166 @@
+"""
+游标（keyset）分页。
+
+游标是签名过的不透明字符串，内容为排序键与上一页最后一行的排序列取值；
+查询条件为 `(created_at, id) > (:a, :b)` 的展开形式，配合 (排序列..., id) 索引，
+任意深度的页面都只扫描 limit + 1 行，不使用 OFFSET / COUNT(*)。
+"""
+
+import base64
+import binascii
+import hashlib
+import hmac
+import json
+import logging
+from typing import Any, List, Optional, Sequence
+
+from fastapi import HTTPException, Query, status
+from sqlalchemy import and_, column, func, or_, select, table
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import Select
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_SIGNATURE_BYTES = 12
+_estimates = TTLCache(maxsize=256, ttl=60)
+_information_schema_tables = table(
+    "TABLES",
+    column("TABLE_SCHEMA"),
+    column("TABLE_NAME"),
+    column("TABLE_ROWS"),
+    schema="information_schema",
+)
+
+
+class CursorParams:
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description="上一页返回的 next_cursor"),
+        limit: int = Query(20, ge=1, le=100),
+        with_total: bool = Query(False, description="返回表行数估算"),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+        self.with_total = with_total
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(payload: bytes) -> bytes:
+    key = settings.SECRET_KEY.encode()
+    return hmac.new(key, payload, hashlib.sha256).digest()[:_SIGNATURE_BYTES]
+
+
+def encode_cursor(sort: str, values: Sequence[Any]) -> str:
+    payload = json.dumps([sort, list(values)], separators=(",", ":")).encode()
+    return f"{_b64encode(payload)}.{_b64encode(_sign(payload))}"
+
+
+def decode_cursor(cursor: str, sort: str) -> List[Any]:
+    invalid = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+    )
+    try:
+        payload_part, signature_part = cursor.split(".", 1)
+        payload = _b64decode(payload_part)
+        signature = _b64decode(signature_part)
+    except (ValueError, binascii.Error):
+        raise invalid
+    if not hmac.compare_digest(signature, _sign(payload)):
+        raise invalid
+    cursor_sort, values = json.loads(payload)
+    # 游标只能用于生成它的排序方式
+    if cursor_sort != sort:
+        raise invalid
+    return values
+
+
+def _after(
+    columns: Sequence[InstrumentedAttribute], values: Sequence[Any], descending: bool
+):
+    # (a, b) > (x, y)  =>  a > x OR (a = x AND b > y)，MySQL 可对其使用范围扫描
+    clauses = []
+    for i, col in enumerate(columns):
+        cmp = col < values[i] if descending else col > values[i]
+        clauses.append(
+            and_(*(columns[j] == values[j] for j in range(i)), cmp) if i else cmp
+        )
+    return or_(*clauses)
+
+
+async def estimate_count(db: AsyncSession, table_name: str) -> Optional[int]:
+    """InnoDB 统计信息中的行数估算（误差可达 ±50%，仅用于展示），缓存 60 秒"""
+    cached = _estimates.get(table_name)
+    if cached is not None:
+        return cached[0]
+    try:
+        result = await db.execute(
+            select(_information_schema_tables.c.TABLE_ROWS).where(
+                _information_schema_tables.c.TABLE_SCHEMA == func.database(),
+                _information_schema_tables.c.TABLE_NAME == table_name,
+            )
+        )
+        estimate = result.scalar_one_or_none()
+    except DBAPIError as e:
+        # 非 MySQL（如测试用的 SQLite）没有 information_schema
+        logger.debug("row estimate unavailable for %s: %s", table_name, e)
+        estimate = None
+    _estimates.set(table_name, (estimate,))
+    return estimate
+
+
+async def paginate(
+    db: AsyncSession,
+    stmt: Select,
+    params: CursorParams,
+    order_by: Sequence[InstrumentedAttribute],
+    *,
+    descending: bool = False,
+) -> dict:
+    """
+    对 stmt 做游标分页。order_by 的最后一列必须唯一（通常为主键 id），保证排序稳定。
+    返回可直接用于 `CursorPage[...]` 的字典。
+    """
+    total_estimate = None
+    if params.with_total:
+        entity = stmt.column_descriptions[0]["entity"]
+        total_estimate = await estimate_count(db, entity.__tablename__)
+
+    sort = ",".join(("-" if descending else "") + col.key for col in order_by)
+    if params.cursor:
+        values = decode_cursor(params.cursor, sort)
+        if len(values) != len(order_by):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+        stmt = stmt.where(_after(order_by, values, descending))
+    stmt = stmt.order_by(
+        *(col.desc() if descending else col.asc() for col in order_by)
+    ).limit(params.limit + 1)
+
+    items = list((await db.execute(stmt)).scalars().all())
+    has_more = len(items) > params.limit
+    del items[params.limit :]
+
+    next_cursor = None
+    if has_more:
+        last = items[-1]
+        next_cursor = encode_cursor(sort, [getattr(last, col.key) for col in order_by])
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "has_more": has_more,
+        "total_estimate": total_estimate,
+    }
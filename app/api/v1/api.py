@@ -1,6 +1,12 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import auth, users
+from app.api.v1.endpoints import admins, attachments, auth, menus, profiles, users
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(users.router, prefix="/users", tags=["users"])
+api_router.include_router(menus.router, prefix="/menus", tags=["menus"])
+api_router.include_router(
+    attachments.router, prefix="/attachments", tags=["attachments"]
+)
+api_router.include_router(admins.router, prefix="/admins", tags=["admins"])
+api_router.include_router(profiles.router, prefix="/profiles", tags=["profiles"])
@@ -0,0 +1,54 @@
+from typing import Any, Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.export import ExportFormat, export_response, exportable_columns
+from app.api.pagination import CursorParams, paginate
+from app.models.f_sys_admin import FSysAdmin
+from app.schemas.admin import Admin, admin_serializer
+from app.schemas.pagination import CursorPage
+
+router = APIRouter()
+
+_EXPORT_COLUMNS = exportable_columns(
+    FSysAdmin, exclude=("password", "salt", "mfa_secret")
+)
+
+_SORTS = {
+    "id": [FSysAdmin.id],
+    "created_at": [FSysAdmin.created_at, FSysAdmin.id],
+}
+
+
+@router.get(
+    "/",
+    response_model=CursorPage[Admin],
+    dependencies=[Depends(deps.check_permission)],
+)
+async def list_admins(
+    db: AsyncSession = Depends(deps.get_db_readonly),
+    page: CursorParams = Depends(),
+    sort: Literal["id", "-id", "created_at", "-created_at"] = Query("-id"),
+) -> Any:
+    """
+    List admins (cursor pagination).
+    """
+    result = await paginate(
+        db,
+        select(FSysAdmin),
+        page,
+        _SORTS[sort.lstrip("-")],
+        descending=sort.startswith("-"),
+    )
+    return admin_serializer.page_response(result)
+
+
+@router.get("/export", dependencies=[Depends(deps.check_permission)])
+async def export_admins(fmt: ExportFormat = Query("ndjson", alias="format")) -> Any:
+    """
+    Export all admins as a streamed NDJSON/CSV download.
+    """
+    return export_response("admins", _EXPORT_COLUMNS, fmt)
@@ -0,0 +1,239 @@
+import asyncio
+import os
+from typing import Any, Literal, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from starlette.requests import ClientDisconnect
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.download import Disposition, file_response
+from app.api.export import ExportFormat, export_response, exportable_columns
+from app.api.pagination import CursorParams, paginate
+from app.core.config import settings
+from app.crud.crud_attachment import attachment_crud
+from app.crud.crud_user import user_crud
+from app.crud.loader import Loaders
+from app.models.f_attachment import FAttachment
+from app.models.f_users import FUsers
+from app.schemas.attachment import (
+    Attachment,
+    UploadCreate,
+    UploadStatus,
+    attachment_serializer,
+)
+from app.schemas.pagination import CursorPage
+from app.services.storage import storage
+from app.services.uploads import UploadError, upload_manager
+
+router = APIRouter()
+
+_EXPORT_COLUMNS = exportable_columns(FAttachment)
+
+_SORTS = {
+    "id": [FAttachment.id],
+    "created_at": [FAttachment.created_at, FAttachment.id],
+}
+
+
+@router.get(
+    "/",
+    response_model=CursorPage[Attachment],
+    dependencies=[Depends(deps.check_permission)],
+)
+async def list_attachments(
+    db: AsyncSession = Depends(deps.get_db_readonly),
+    loaders: Loaders = Depends(deps.get_loaders),
+    page: CursorParams = Depends(),
+    sort: Literal["id", "-id", "created_at", "-created_at"] = Query("-id"),
+    status: int = Query(1, description="1：正常 0：删除"),
+) -> Any:
+    """
+    List attachments (cursor pagination).
+    """
+    result = await paginate(
+        db,
+        select(FAttachment).where(FAttachment.status == status),
+        page,
+        _SORTS[sort.lstrip("-")],
+        descending=sort.startswith("-"),
+    )
+    # 一次 IN 查询取回本页所有上传用户
+    users = await loaders[user_crud].load_many([a.user_id for a in result["items"]])
+    items = [
+        attachment_serializer.build(a, uploader=u.username if u else None)
+        for a, u in zip(result["items"], users)
+    ]
+    return attachment_serializer.page_response(result, items)
+
+
+@router.get("/export", dependencies=[Depends(deps.check_permission)])
+async def export_attachments(
+    fmt: ExportFormat = Query("ndjson", alias="format")
+) -> Any:
+    """
+    Export all attachments as a streamed NDJSON/CSV download.
+    """
+    return export_response("attachments", _EXPORT_COLUMNS, fmt)
+
+
+def _upload_headers(state: dict) -> dict:
+    return {
+        "Upload-Offset": str(state["offset"]),
+        "Upload-Length": str(state["size"]),
+        "Cache-Control": "no-store",
+    }
+
+
+def _upload_http_error(e: UploadError) -> HTTPException:
+    headers = {"Upload-Offset": str(e.offset)} if e.offset is not None else None
+    return HTTPException(status_code=e.status_code, detail=str(e), headers=headers)
+
+
+def _upload_status(state: dict, attachment=None) -> UploadStatus:
+    return UploadStatus(
+        upload_id=state["upload_id"],
+        filename=state["filename"],
+        size=state["size"],
+        offset=state["offset"],
+        completed=attachment is not None,
+        attachment=attachment_serializer.build(attachment) if attachment else None,
+    )
+
+
+@router.post("/uploads", response_model=UploadStatus, status_code=201)
+async def create_upload(
+    upload_in: UploadCreate,
+    response: Response,
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Start a resumable upload; send the content with PATCH /uploads/{upload_id}.
+    If sha256 is given and the caller already has an attachment with that
+    content, the attachment is created immediately (completed=true) and no
+    content needs to be sent.
+    """
+    if upload_in.sha256 and settings.UPLOAD_INSTANT_BY_HASH:
+        attachment = await upload_manager.instant(
+            db, current_user.id, upload_in.filename, upload_in.size, upload_in.sha256
+        )
+        if attachment is not None:
+            state = {**upload_in.model_dump(), "upload_id": None}
+            return _upload_status({**state, "offset": upload_in.size}, attachment)
+    try:
+        state = await upload_manager.create(
+            current_user.id, upload_in.filename, upload_in.size, upload_in.sha256
+        )
+    except UploadError as e:
+        raise _upload_http_error(e)
+    response.headers.update(_upload_headers(state))
+    response.headers["Location"] = f"uploads/{state['upload_id']}"
+    return _upload_status(state)
+
+
+@router.head("/uploads/{upload_id}")
+async def get_upload_offset(
+    upload_id: str,
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Current offset of an upload, for resuming.
+    """
+    try:
+        state = await upload_manager.get(upload_id, current_user.id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return Response(headers=_upload_headers(state))
+
+
+@router.patch("/uploads/{upload_id}", response_model=UploadStatus)
+async def append_upload(
+    upload_id: str,
+    request: Request,
+    response: Response,
+    upload_offset: int = Header(..., ge=0),
+    db: AsyncSession = Depends(deps.get_db),
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Any:
+    """
+    Append the raw request body at Upload-Offset. The attachment is created once
+    the declared size has been received.
+    """
+
+    async def body():
+        # 客户端中断时结束迭代，已收到的部分照常落盘，之后可续传
+        try:
+            async for chunk in request.stream():
+                yield chunk
+        except ClientDisconnect:
+            return
+
+    try:
+        state, attachment = await upload_manager.append(
+            db, upload_id, current_user.id, upload_offset, body()
+        )
+    except UploadError as e:
+        raise _upload_http_error(e)
+    response.headers.update(_upload_headers(state))
+    return _upload_status(state, attachment)
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def abort_upload(
+    upload_id: str,
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Abort an unfinished upload and delete its partial data.
+    """
+    try:
+        await upload_manager.abort(upload_id, current_user.id)
+    except UploadError as e:
+        raise _upload_http_error(e)
+    return Response(status_code=204)
+
+
+def _stat(key: Optional[str]):
+    try:
+        path = storage.local_path(key) if key else None
+        return (path, os.stat(path)) if path else (None, None)
+    except (ValueError, FileNotFoundError, NotADirectoryError):
+        return None, None
+
+
+@router.api_route("/{attachment_id}/download", methods=["GET", "HEAD"])
+async def download_attachment(
+    attachment_id: int,
+    request: Request,
+    disposition: Disposition = Query("attachment", description="inline：浏览器内打开"),
+    db: AsyncSession = Depends(deps.get_db_readonly),
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    Download an attachment. Supports Range / multi-range, If-Range and
+    conditional GET (ETag is the content SHA-256).
+    """
+    attachment = await attachment_crud.get(db, attachment_id)
+    if attachment is None or attachment.status != 1:
+        raise HTTPException(status_code=404, detail="Attachment not found")
+    if attachment.user_id != current_user.id:
+        # 非上传者按 RBAC 校验
+        await deps.check_permission(request, current_user)
+
+    key = storage.key_for_url(attachment.attach_url)
+    path, stat_result = await asyncio.to_thread(_stat, key)
+    if stat_result is None:
+        raise HTTPException(status_code=404, detail="Attachment file not found")
+    return file_response(
+        request,
+        key,
+        path,
+        stat_result,
+        media_type=attachment.attach_mimetype or "application/octet-stream",
+        filename=attachment.attach_origin_name or attachment.attach_name,
+        content_hash=attachment.attach_hash,
+        last_modified=attachment.created_at,
+        disposition=disposition,
+    )
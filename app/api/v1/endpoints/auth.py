@@ -1,8 +1,6 @@
 from datetime import timedelta
 from typing import Any
-from fastapi import APIRouter, Depends, HTTPException, status
-from redis.asyncio import Redis
-from app.db.redis import get_redis
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,16 +8,18 @@ from app.api import deps
 from app.core import security
 from app.core.config import settings
 from app.crud.crud_user import user_crud
-from app.schemas.user import Token
+from app.models.f_users import FUsers
+from app.schemas.user import Token, TokenAdapter
+from app.services.rate_limiter import login_rate_limit
+from app.services.token_store import token_store
 
 router = APIRouter()
 
 
-@router.post("/login", response_model=Token)
+@router.post("/login", response_model=Token, dependencies=[Depends(login_rate_limit)])
 async def login_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(),  # 自动从请求体中提取表单数据
     db: AsyncSession = Depends(deps.get_db),  # 自动从连接池获取一个数据库会话
-    redis: Redis = Depends(get_redis),  # 自动从连接池获取一个 Redis 客户端
 ) -> Any:
     user = await user_crud.authenticate(
         db, username=form_data.username, password=form_data.password
@@ -39,18 +39,35 @@ async def login_access_token(
         subject=user.username, expires_delta=access_token_expires
     )
 
-    # Store token in Redis
-    # Key: token:{access_token} -> user_id
-    await redis.set(
-        f"token:{access_token}",
-        str(user.id),
-        ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-    )
-    # Key: user:{user_id}:token -> access_token (Latest token)
-    await redis.set(
-        f"user:{user.id}:token",
-        access_token,
-        ex=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    # Store token in Redis (single round-trip, atomic)
+    # token:{access_token} -> user_id, user:{user_id}:token -> latest token
+    await token_store.issue(user.id, access_token)
+
+    token = Token.model_construct(access_token=access_token, token_type="bearer")
+    return Response(
+        content=TokenAdapter.dump_json(token), media_type="application/json"
     )
 
-    return {"access_token": access_token, "token_type": "bearer"}
+
+@router.post("/logout")
+async def logout(
+    token: str = Depends(deps.oauth2_scheme),
+    current_user: FUsers = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Revoke the current access token.
+    """
+    # get_current_user 已校验签名与吊销状态，任意字符串不会写入吊销表
+    await token_store.revoke(token)
+    return {"message": "Logged out"}
+
+
+@router.post("/logout/all")
+async def logout_all(
+    current_user: FUsers = Depends(deps.get_current_user),
+) -> Any:
+    """
+    Revoke every session of the current user.
+    """
+    revoked = await token_store.revoke_all(current_user.id)
+    return {"message": "Logged out", "revoked": revoked}
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api import deps
+from app.api.caching import cached
+from app.models.f_sys_admin import FSysAdmin
+from app.models.f_users import FUsers
+from app.services.menu_tree import menu_tree
+from app.services.role_permissions import role_permissions
+
+router = APIRouter()
+
+ADMIN_STATUS_NORMAL = 1
+
+
+@router.get("/")
+# 依赖资源树、角色权限与管理员账号，任一变更即失效
+@cached(tags=["menus", "roles", "admins"])
+async def read_my_menus(
+    db: AsyncSession = Depends(deps.get_db_readonly),
+    current_user: FUsers = Depends(deps.get_current_active_user),
+) -> Response:
+    """
+    当前管理员可见的菜单树（按 sort_order 排序的嵌套 JSON 数组）。
+    登录用户名对应 f_sys_admin.account。
+    """
+    result = await db.execute(
+        select(FSysAdmin.id, FSysAdmin.type).where(
+            FSysAdmin.account == current_user.username,
+            FSysAdmin.status == ADMIN_STATUS_NORMAL,
+        )
+    )
+    admin = result.first()
+    if admin is None:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Not an admin account"
+        )
+    perms = await role_permissions.for_admin(admin.id, db)
+    # 预先序列化好的字节，直接返回，不经过 response_model 校验与 JSON 编码
+    content = await menu_tree.render(perms.bits, admin.type)
+    return Response(content=content, media_type="application/json")
@@ -0,0 +1,34 @@
+import asyncio
+from typing import Any, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse
+
+from app.api import deps
+from app.schemas.profile import ProfileCapture
+from app.services.profiler import profile_store
+
+router = APIRouter(dependencies=[Depends(deps.check_permission)])
+
+
+@router.get("/", response_model=List[ProfileCapture])
+async def list_profiles(
+    limit: int = Query(100, ge=1, le=1000),
+    profile_id: Optional[str] = Query(None, description="响应头 X-Profile-Id 的值"),
+) -> Any:
+    """
+    List recent request profiles (newest first).
+    """
+    return await asyncio.to_thread(profile_store.list, limit, profile_id)
+
+
+@router.get("/{name}")
+async def download_profile(name: str) -> FileResponse:
+    """
+    Download a profile; open it at https://www.speedscope.app or with flamegraph.pl.
+    """
+    path = profile_store.path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "application/json" if name.endswith(".json") else "text/plain"
+    return FileResponse(path, media_type=media_type, filename=name)
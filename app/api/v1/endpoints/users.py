@@ -1,26 +1,54 @@
-from typing import Any
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, Literal
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api import deps
+from app.api.caching import cached
+from app.api.export import ExportFormat, export_response, exportable_columns
+from app.api.pagination import CursorParams, paginate
 from app.crud.crud_user import user_crud
 from app.models.f_users import FUsers
-from app.schemas.user import UserCreate, User as UserSchema
+from app.schemas.pagination import CursorPage
+from app.schemas.user import UserCreate, User as UserSchema, user_serializer
+from app.services.rate_limiter import signup_rate_limit
 
 router = APIRouter()
 
+_EXPORT_COLUMNS = exportable_columns(FUsers, exclude=("hashed_password",))
+
 
 @router.get("/me", response_model=UserSchema)
+@cached(tags=["user:{current_user.id}"])
 async def read_user_me(
     current_user: FUsers = Depends(deps.get_current_active_user),
 ) -> Any:
     """
     Get current user.
     """
-    return current_user
+    return user_serializer.response(current_user)
+
+
+@router.get(
+    "/",
+    response_model=CursorPage[UserSchema],
+    dependencies=[Depends(deps.check_permission)],
+)
+async def list_users(
+    db: AsyncSession = Depends(deps.get_db_readonly),
+    page: CursorParams = Depends(),
+    sort: Literal["id", "-id"] = Query("id"),
+) -> Any:
+    """
+    List users (cursor pagination).
+    """
+    result = await paginate(
+        db, select(FUsers), page, [FUsers.id], descending=sort == "-id"
+    )
+    return user_serializer.page_response(result)
 
 
-@router.post("/", response_model=UserSchema)
+@router.post("/", response_model=UserSchema, dependencies=[Depends(signup_rate_limit)])
 async def create_user(
     *,
     db: AsyncSession = Depends(deps.get_db),
@@ -36,4 +64,12 @@ async def create_user(
             detail="The user with this email already exists in the system.",
         )
     user = await user_crud.create(db, obj_in=user_in)
-    return user
+    return user_serializer.response(user)
+
+
+@router.get("/export", dependencies=[Depends(deps.check_permission)])
+async def export_users(fmt: ExportFormat = Query("ndjson", alias="format")) -> Any:
+    """
+    Export all users as a streamed NDJSON/CSV download.
+    """
+    return export_response("users", _EXPORT_COLUMNS, fmt)
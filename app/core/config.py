@@ -1,5 +1,5 @@
 import os
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 from pydantic import AnyHttpUrl, MySQLDsn, RedisDsn, field_validator, ValidationInfo
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -42,6 +42,26 @@ class Settings(BaseSettings):
             port=values.data.get("MYSQL_PORT"),
         ).unicode_string()
 
+    # Database pool（每个 worker 进程一个连接池）
+    DB_ECHO: bool = False  # 打印全部 SQL（调试用），日常使用下面的慢查询日志
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30  # 等待空闲连接的最长秒数
+    DB_POOL_RECYCLE: int = 1800  # 需小于 MySQL wait_timeout
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100  # 获取连接超过该耗时记录告警
+
+    # Query instrumentation
+    DB_SLOW_QUERY_MS: float = 200  # 超过该耗时的语句写入慢查询日志
+    DB_N_PLUS_ONE_THRESHOLD: int = 10  # 同一语句指纹在一个请求中执行的次数上限
+    SERVER_TIMING_ENABLED: bool = True  # 响应头 Server-Timing（SQL 耗时 / 条数）
+
+    # Read replicas
+    DB_REPLICA_URIS: str = ""  # 逗号分隔的从库 DSN，为空则读写都走主库
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5  # 复制延迟超过该值的从库被摘除
+    DB_REPLICA_CHECK_INTERVAL: float = 5
+    DB_READ_YOUR_WRITES_SECONDS: float = 10  # 写入后该时间内同一用户的读走主库
+
     # Redis
     REDIS_HOST: str = "localhost"
     REDIS_PORT: int = 6379
@@ -62,10 +82,112 @@ class Settings(BaseSettings):
             path=f"{values.data.get('REDIS_DB') or 0}",
         ).unicode_string()
 
+    # Redis connection pool
+    REDIS_MAX_CONNECTIONS: int = 50  # 每个 worker 进程
+    REDIS_POOL_TIMEOUT: float = 5  # 池满时等待空闲连接的秒数
+    REDIS_SOCKET_TIMEOUT: float = 2
+    REDIS_SOCKET_CONNECT_TIMEOUT: float = 2
+    REDIS_HEALTH_CHECK_INTERVAL: int = 30
+    REDIS_RETRY_ATTEMPTS: int = 3
+
+    # Redis client-side cache（服务端失效跟踪，需要 Redis >= 6）
+    REDIS_CLIENT_CACHE_ENABLED: bool = False
+    REDIS_CLIENT_CACHE_PREFIXES: str = "token:"  # 逗号分隔
+    REDIS_CLIENT_CACHE_MAXSIZE: int = 10000
+    REDIS_CLIENT_CACHE_TTL: int = 300  # 本地副本的兜底过期时间
+
     # Security
     SECRET_KEY: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     ALGORITHM: str = "HS256"
+    TOKEN_SINGLE_SESSION: bool = True  # 登录时吊销该用户之前签发的 token
+    JWT_CACHE_ENABLED: bool = True  # 缓存已校验的 JWT claims
+    JWT_CACHE_MAXSIZE: int = 10000
+    JWT_CACHE_TTL: int = 300  # 同时不晚于 token 的 exp
+
+    # Principal cache (get_current_user)
+    PRINCIPAL_CACHE_ENABLED: bool = True
+    PRINCIPAL_CACHE_LOCAL_MAXSIZE: int = 1024
+    PRINCIPAL_CACHE_LOCAL_TTL: int = 5  # 秒，多 worker 下本地缓存的最大陈旧时间
+    PRINCIPAL_CACHE_REDIS_TTL: int = 300
+
+    # Admin permission sets (f_sys_role_auth -> 资源位图)
+    PERMISSION_CACHE_LOCAL_MAXSIZE: int = 4096
+    PERMISSION_CACHE_LOCAL_TTL: int = 60
+    PERMISSION_CACHE_REDIS_TTL: int = 3600
+
+    # JSON responses
+    # 默认响应类与预编译序列化器使用 pydantic-core 编码；关闭时全部走 FastAPI 标准路径
+    FAST_JSON_RESPONSE: bool = True
+    RESPONSE_TRUST_ORM: bool = True  # 数据库读出的对象跳过 response_model 校验
+
+    # Attachment storage & uploads
+    STORAGE_BACKEND: Literal["local"] = "local"
+    STORAGE_LOCAL_ROOT: str = "storage"  # 本地存储根目录
+    STORAGE_BASE_URL: str = "/files"  # attach_url 前缀
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # 每次写盘/哈希的块大小
+    UPLOAD_MAX_SIZE: int = 4 * 1024 * 1024 * 1024
+    UPLOAD_EXPIRE_SECONDS: int = 24 * 3600  # 未完成的上传保留时间
+    # 客户端先提交 SHA-256，自己已上传过相同内容时直接生成附件（秒传）
+    UPLOAD_INSTANT_BY_HASH: bool = False
+    # 下载交给 Nginx 发送（X-Accel-Redirect + sendfile），值为 internal location 前缀，
+    # 如 "/_attachments"；为空时由应用自己发送文件
+    DOWNLOAD_ACCEL_REDIRECT: str = ""
+    DOWNLOAD_CACHE_MAX_AGE: int = 86400  # 附件内容不可变，浏览器缓存时间
+
+    # Exports (流式导出)
+    EXPORT_CHUNK_ROWS: int = 1000  # 每批从服务端游标取出并编码的行数
+
+    # Password hashing pool (bcrypt off the event loop)
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_PENDING: int = 64  # 超过后直接返回 503
+
+    # Rate limiting（Redis GCRA，各 worker 共享配额）
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_LOGIN_WINDOW: int = 60  # 秒
+    RATE_LIMIT_LOGIN_PER_IP: int = 20
+    RATE_LIMIT_LOGIN_PER_USER: int = 5  # 同一用户名，不论来源 IP
+    RATE_LIMIT_LOGIN_PER_ROUTE: int = 3000  # 登录接口总量，保护 bcrypt 线程池
+    RATE_LIMIT_SIGNUP_WINDOW: int = 3600
+    RATE_LIMIT_SIGNUP_PER_IP: int = 10
+    # 配额 * 该比例 >= 2 的规则按批向 Redis 预支令牌，在本进程内放行
+    RATE_LIMIT_LEASE_FRACTION: float = 0.02
+    RATE_LIMIT_LEASE_MAXSIZE: int = 10000
+
+    # Response cache（@cached 路由：进程内 LRU + Redis，CRUD 写入时按标签失效）
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_AGE: int = 60  # 秒，未在 @cached 中指定时的默认值
+    # 过期后仍先返回旧内容、后台刷新的时间窗口
+    RESPONSE_CACHE_STALE: int = 30
+    RESPONSE_CACHE_LOCAL_MAXSIZE: int = 4096
+    # 秒；失效经 pub/sub 推送，本地 TTL 只兜底消息丢失的情况
+    RESPONSE_CACHE_LOCAL_TTL: int = 30
+
+    # Logging
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: Literal["text", "json"] = "text"
+    LOG_QUEUE_SIZE: int = 10000  # 队列满时丢弃，不阻塞事件循环
+    LOG_BATCH_SIZE: int = 64
+    LOG_FLUSH_INTERVAL: float = 1.0
+    ACCESS_LOG_SAMPLE_RATE: float = 1.0  # 0~1，5xx 与慢请求总是记录
+    ACCESS_LOG_SLOW_MS: float = 1000
+
+    # Metrics（Prometheus，GET /metrics）
+    METRICS_ENABLED: bool = True
+    # gunicorn 下各 worker 的 mmap 指标文件目录，master 启动时清空
+    METRICS_MULTIPROC_DIR: str = "/tmp/fastapi-skeleton-metrics"
+
+    # Profiling（按请求的采样分析，结果见 GET /api/v1/profiles/）
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0  # 0~1，随机抽样的请求比例
+    # 请求头 X-Profile 的值等于该口令时分析该请求；为空时不接受请求头触发
+    PROFILING_TOKEN: str = ""
+    PROFILING_INTERVAL_MS: float = 5
+    PROFILING_MAX_SECONDS: float = 30  # 超过后停止采样（长连接 / 大文件下载）
+    PROFILING_FORMAT: Literal["collapsed", "speedscope"] = "speedscope"
+    PROFILING_DIR: str = "profiles"
+    PROFILING_MAX_FILES: int = 200
 
     # Gunicorn
     GUNICORN_BIND: str = "0.0.0.0:8000"
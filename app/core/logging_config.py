@@ -0,0 +1,156 @@
+"""
+日志管道：QueueHandler -> QueueListener(后台线程) -> BatchingStreamHandler。
+
+事件循环中只做 `put_nowait`，格式化与 IO 都在监听线程完成，并按批写出。
+队列满时直接丢弃并计数，绝不阻塞请求。
+"""
+
+import json
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.core.config import settings
+
+# LogRecord 自带属性，JSON 格式化时其余属性视为 extra 结构化字段
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """非阻塞入队；队列满时丢弃日志而不是阻塞事件循环"""
+
+    def __init__(self, q: queue.Queue):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 进程内队列无需序列化：保留 msg/args，格式化推迟到监听线程
+        if record.exc_info:
+            return super().prepare(record)
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class BatchingStreamHandler(logging.StreamHandler):
+    """把格式化后的日志行攒批，一次 write 写出"""
+
+    def __init__(self, stream=None, batch_size: int = 64):
+        super().__init__(stream)
+        self.batch_size = batch_size
+        self._buffer: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            self._buffer.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+            return
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        self.acquire()
+        try:
+            if self._buffer and self.stream:
+                self.stream.write("\n".join(self._buffer) + "\n")
+                self._buffer.clear()
+                self.stream.flush()
+        finally:
+            self.release()
+
+
+class BatchingQueueListener(QueueListener):
+    """队列空闲超过 flush_interval 时刷出未满批的缓冲"""
+
+    def __init__(self, q: queue.Queue, *handlers, flush_interval: float = 1.0):
+        super().__init__(q, *handlers, respect_handler_level=True)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                self._flush_handlers()
+                deadline = time.monotonic() + self.flush_interval
+                continue
+            try:
+                return self.queue.get(timeout=timeout)
+            except queue.Empty:
+                pass
+
+    def _flush_handlers(self) -> None:
+        for handler in self.handlers:
+            handler.flush()
+
+    def stop(self) -> None:
+        super().stop()
+        self._flush_handlers()
+
+
+_queue_handler: Optional[DroppingQueueHandler] = None
+_listener: Optional[BatchingQueueListener] = None
+
+
+def setup_logging() -> None:
+    """安装根 logger 的 QueueHandler（幂等）"""
+    global _queue_handler, _listener
+    if _queue_handler is not None:
+        return
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    stream_handler = BatchingStreamHandler(sys.stderr, settings.LOG_BATCH_SIZE)
+    if settings.LOG_FORMAT == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter(_TEXT_FORMAT))
+
+    _queue_handler = DroppingQueueHandler(log_queue)
+    _listener = BatchingQueueListener(
+        log_queue, stream_handler, flush_interval=settings.LOG_FLUSH_INTERVAL
+    )
+
+    root = logging.getLogger()
+    root.setLevel(settings.LOG_LEVEL)
+    root.addHandler(_queue_handler)
+
+
+def start_log_listener() -> None:
+    setup_logging()
+    if _listener._thread is None:
+        _listener.start()
+
+
+def stop_log_listener() -> None:
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def dropped_log_records() -> int:
+    return _queue_handler.dropped if _queue_handler else 0
@@ -0,0 +1,92 @@
+"""
+Prometheus 指标。
+
+gunicorn 多 worker 下由 gunicorn_conf 设置 PROMETHEUS_MULTIPROC_DIR：每个 worker 把取值写入
+该目录下按 pid 区分的 mmap 文件，/metrics 抓取时由 `MultiProcessCollector` 汇总所有 worker，
+得到整个进程组的直方图（p99 等按路由在服务端计算）。worker 退出后由 master 的 `child_exit`
+钩子清理其 live gauge 文件。单进程运行（uvicorn 直接启动）时使用进程内的默认 registry。
+"""
+
+import os
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+
+# DB / Redis 调用多在毫秒级，桶比 HTTP 默认桶更细
+_CALL_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+)
+
+http_requests_total = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "SQL statement execution time",
+    ["engine", "operation"],
+    buckets=_CALL_BUCKETS,
+)
+redis_command_duration_seconds = Histogram(
+    "redis_command_duration_seconds",
+    "Redis command round-trip time (pipelines count as one PIPELINE call)",
+    ["command"],
+    buckets=_CALL_BUCKETS,
+)
+response_cache_requests_total = Counter(
+    "response_cache_requests_total",
+    "Cached route lookups by result (hit, stale, miss)",
+    ["route", "result"],
+)
+
+
+def observe_redis(command: str, seconds: float) -> None:
+    redis_command_duration_seconds.labels(command).observe(seconds)
+
+
+def multiprocess_enabled() -> bool:
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> bytes:
+    """抓取时汇总；多进程模式下读取目录中所有 worker 的 mmap 文件（阻塞，放到线程池执行）"""
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def mark_process_dead(pid: int) -> None:
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,24 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic_core import to_json
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用 pydantic-core（Rust）直接编码为 JSON 字节。
+
+    可直接编码 pydantic 模型、dataclass、datetime、UUID 等，不需要先经过
+    `jsonable_encoder` 转为 dict，比标准库 `json.dumps` 快数倍。
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match 是否命中 etag（弱比较）"""
+    if if_none_match.strip() == "*":
+        return True
+    tags = (tag.strip() for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in (tag.removeprefix("W/") for tag in tags)
@@ -1,13 +1,19 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Any, Union
 from jose import jwt
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 ALGORITHM = "HS256"
 
+# 已通过签名校验的 claims，按 token 的 SHA-256 摘要缓存
+_claims_cache = TTLCache(maxsize=settings.JWT_CACHE_MAXSIZE, ttl=settings.JWT_CACHE_TTL)
+
 
 def create_access_token(
     subject: Union[str, Any], expires_delta: timedelta = None
@@ -24,9 +30,41 @@ def create_access_token(
     return encoded_jwt
 
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verify and decode a JWT. Verified claims are cached by token digest and
+    never outlive the token's `exp`. The returned dict is shared; don't mutate it.
+    Raises `JWTError` like `jwt.decode`.
+    """
+    if not settings.JWT_CACHE_ENABLED:
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+    key = hashlib.sha256(token.encode()).digest()
+    claims = _claims_cache.get(key)
+    if claims is not None:
+        return claims
+
+    claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    ttl = _claims_cache.ttl
+    exp = claims.get("exp")
+    if isinstance(exp, (int, float)):
+        ttl = min(ttl, exp - time.time())
+    _claims_cache.set(key, claims, ttl)
+    return claims
+
+
+def claims_cache_stats() -> dict:
+    return _claims_cache.stats()
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+
+def token_digest(token: str) -> str:
+    """token 的 SHA-1 摘要，即 revoked_tokens 中的成员"""
+    return hashlib.sha1(token.encode()).hexdigest()
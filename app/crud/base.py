@@ -0,0 +1,175 @@
+from typing import (
+    Any,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+    Union,
+)
+
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, inspect, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.db.base import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+
+# IN (...) 列表过长时分批查询，避免超出 max_allowed_packet / 占位符上限
+IN_CHUNK_SIZE = 1000
+
+
+def _chunks(values: Sequence[Any], size: int) -> Iterable[Sequence[Any]]:
+    for start in range(0, len(values), size):
+        yield values[start : start + size]
+
+
+class CRUDBase(Generic[ModelType]):
+    """
+    通用异步 CRUD。
+
+    写操作提交后调用 `_changed(db, rows)`，子类在其中失效相关缓存；
+    rows 为写入行的列值字典（批量插入未取回主键时不含 id）。
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+        self.pk = inspect(model).primary_key[0]
+        self._columns = [attr.key for attr in inspect(model).column_attrs]
+
+    # ---- 读 ----
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        result = await db.execute(select(self.model).where(self.pk == id))
+        return result.scalars().first()
+
+    async def get_many(
+        self, db: AsyncSession, ids: Iterable[Any]
+    ) -> Dict[Any, ModelType]:
+        """按主键批量查询，返回 {id: obj}，不存在的 id 不在结果中"""
+        ids = list(dict.fromkeys(ids))
+        found: Dict[Any, ModelType] = {}
+        for chunk in _chunks(ids, IN_CHUNK_SIZE):
+            result = await db.execute(select(self.model).where(self.pk.in_(chunk)))
+            for obj in result.scalars():
+                found[getattr(obj, self.pk.key)] = obj
+        return found
+
+    async def list(
+        self,
+        db: AsyncSession,
+        *,
+        after: Optional[Any] = None,
+        limit: int = 100,
+        descending: bool = False,
+        where: Sequence[Any] = (),
+    ) -> List[ModelType]:
+        """
+        按主键的 keyset 分页：传入上一页最后一条的 id 作为 after，
+        不使用 OFFSET，翻到多深都只扫描 limit 行。
+        """
+        stmt = select(self.model).where(*where)
+        if after is not None:
+            stmt = stmt.where(self.pk < after if descending else self.pk > after)
+        stmt = stmt.order_by(self.pk.desc() if descending else self.pk).limit(limit)
+        result = await db.execute(stmt)
+        return list(result.scalars().all())
+
+    # ---- 写 ----
+
+    def _row(self, obj: ModelType) -> Dict[str, Any]:
+        state = obj.__dict__
+        return {key: state[key] for key in self._columns if key in state}
+
+    @staticmethod
+    def _values(obj_in: Union[BaseModel, Dict[str, Any]]) -> Dict[str, Any]:
+        if isinstance(obj_in, dict):
+            return dict(obj_in)
+        return obj_in.model_dump(exclude_unset=True)
+
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        """写入提交后的钩子，默认无操作"""
+
+    async def create(
+        self, db: AsyncSession, obj_in: Union[BaseModel, Dict[str, Any]]
+    ) -> ModelType:
+        db_obj = self.model(**self._values(obj_in))
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        await self._changed(db, [self._row(db_obj)])
+        return db_obj
+
+    async def create_many(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[BaseModel, Dict[str, Any]]],
+        *,
+        return_objects: bool = False,
+    ) -> List[ModelType]:
+        """
+        批量插入。默认走单条 executemany INSERT（驱动会合并为多值 INSERT），
+        不取回自增主键；需要返回对象时 return_objects=True。
+        """
+        rows = [self._values(obj_in) for obj_in in objs_in]
+        if not rows:
+            return []
+        if return_objects:
+            db_objs = [self.model(**row) for row in rows]
+            db.add_all(db_objs)
+            await db.commit()
+            await self._changed(db, [self._row(obj) for obj in db_objs])
+            return db_objs
+        await db.execute(insert(self.model), rows)
+        await db.commit()
+        await self._changed(db, rows)
+        return []
+
+    async def update(
+        self,
+        db: AsyncSession,
+        db_obj: ModelType,
+        obj_in: Union[BaseModel, Dict[str, Any]],
+    ) -> ModelType:
+        db_obj = await db.merge(db_obj)
+        for field, value in self._values(obj_in).items():
+            setattr(db_obj, field, value)
+        await db.commit()
+        await db.refresh(db_obj)
+        await self._changed(db, [self._row(db_obj)])
+        return db_obj
+
+    async def update_many(
+        self, db: AsyncSession, rows: Sequence[Dict[str, Any]]
+    ) -> int:
+        """
+        按主键批量更新，每行必须包含主键，各行可更新不同的列：
+        `[{"id": 1, "status": 2}, {"id": 2, "status": 2}]`
+        """
+        rows = [dict(row) for row in rows]
+        if not rows:
+            return 0
+        await db.execute(update(self.model), rows)
+        await db.commit()
+        await self._changed(db, rows)
+        return len(rows)
+
+    async def remove(
+        self, db: AsyncSession, id: Any, *, commit: bool = True
+    ) -> Optional[ModelType]:
+        """commit=False 时只执行删除，由调用方在同一事务中继续变更、提交并调用 _changed"""
+        db_obj = await self.get(db, id)
+        if db_obj is None:
+            return None
+        row = self._row(db_obj)
+        await db.execute(delete(self.model).where(self.pk == id))
+        if not commit:
+            return db_obj
+        await db.commit()
+        await self._changed(db, [row])
+        return db_obj
@@ -0,0 +1,40 @@
+from typing import Any, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.crud.crud_attachment_blob import attachment_blob_crud
+from app.models.f_attachment import FAttachment
+
+
+class CRUDAttachment(CRUDBase[FAttachment]):
+    async def owns_hash(self, db: AsyncSession, user_id: int, digest: str) -> bool:
+        """用户是否有该内容的正常附件"""
+        result = await db.execute(
+            select(FAttachment.id)
+            .where(
+                FAttachment.attach_hash == digest,
+                FAttachment.user_id == user_id,
+                FAttachment.status == 1,
+            )
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def remove(self, db: AsyncSession, id: Any) -> Optional[FAttachment]:
+        # 附件行删除与引用计数 -1 在同一事务中提交，文件在提交之后删除
+        db_obj = await super().remove(db, id, commit=False)
+        if db_obj is None:
+            return None
+        released = None
+        if db_obj.attach_hash:
+            released = await attachment_blob_crud.release(db, db_obj.attach_hash)
+        await db.commit()
+        await self._changed(db, [self._row(db_obj)])
+        if released is not None:
+            await attachment_blob_crud.delete_file(released)
+        return db_obj
+
+
+attachment_crud = CRUDAttachment(FAttachment)
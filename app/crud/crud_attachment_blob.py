@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.models.f_attachment_blob import FAttachmentBlob
+from app.services.storage import storage
+
+logger = logging.getLogger(__name__)
+
+
+class CRUDAttachmentBlob(CRUDBase[FAttachmentBlob]):
+    """
+    按 SHA-256 去重的附件内容。引用计数与附件行在同一事务中变更：
+    acquire / add 只 flush 不提交，由随后创建附件的 commit 一并提交。
+    """
+
+    async def get_by_hash(
+        self, db: AsyncSession, digest: str
+    ) -> Optional[FAttachmentBlob]:
+        result = await db.execute(
+            select(FAttachmentBlob).where(FAttachmentBlob.attach_hash == digest)
+        )
+        return result.scalars().first()
+
+    async def acquire(self, db: AsyncSession, digest: str) -> Optional[FAttachmentBlob]:
+        """内容已存在时引用计数 +1 并返回，否则返回 None"""
+        # 单条 UPDATE 加行锁，与并发的 acquire / release 串行
+        result = await db.execute(
+            update(FAttachmentBlob)
+            .where(FAttachmentBlob.attach_hash == digest)
+            .values(
+                ref_count=FAttachmentBlob.ref_count + 1, updated_at=int(time.time())
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if not result.rowcount:
+            return None
+        return await self.get_by_hash(db, digest)
+
+    async def add(
+        self, db: AsyncSession, values: Dict[str, Any]
+    ) -> Optional[FAttachmentBlob]:
+        """
+        登记新内容（引用计数为 1）。并发上传了相同内容、唯一索引冲突时返回 None，
+        调用方改为 acquire 已有记录。
+        """
+        now = int(time.time())
+        blob = FAttachmentBlob(**values, ref_count=1, created_at=now, updated_at=now)
+        try:
+            async with db.begin_nested():
+                db.add(blob)
+        except IntegrityError:
+            return None
+        return blob
+
+    async def release(self, db: AsyncSession, digest: str) -> Optional[str]:
+        """
+        引用计数 -1，归零时删除记录。不提交：与附件行的删除在同一事务中，
+        返回记录被删除时的存储路径，调用方提交后用 delete_file 删除文件。
+        """
+        blob = await self.get_by_hash(db, digest)
+        if blob is None:
+            return None
+        await db.execute(
+            update(FAttachmentBlob)
+            .where(FAttachmentBlob.id == blob.id, FAttachmentBlob.ref_count > 0)
+            .values(ref_count=FAttachmentBlob.ref_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        # 条件删除：期间有新的引用（ref_count 又大于 0）时不会删除
+        result = await db.execute(
+            delete(FAttachmentBlob)
+            .where(FAttachmentBlob.id == blob.id, FAttachmentBlob.ref_count <= 0)
+            .execution_options(synchronize_session=False)
+        )
+        return blob.storage_key if result.rowcount else None
+
+    async def delete_file(self, storage_key: str) -> None:
+        # 每个 blob 的存储路径唯一，同样内容再次上传会写到新的路径，这里可以直接删除
+        await asyncio.to_thread(storage.delete, storage_key)
+        logger.info("attachment blob %s deleted", storage_key)
+
+
+attachment_blob_crud = CRUDAttachmentBlob(FAttachmentBlob)
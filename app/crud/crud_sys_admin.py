@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.models.f_sys_admin import FSysAdmin
+from app.services.response_cache import response_cache
+from app.services.role_permissions import role_permissions
+
+
+class CRUDSysAdmin(CRUDBase[FSysAdmin]):
+    async def get_by_account(
+        self, db: AsyncSession, account: str
+    ) -> Optional[FSysAdmin]:
+        result = await db.execute(select(FSysAdmin).where(FSysAdmin.account == account))
+        return result.scalars().first()
+
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        # role_ids 可能变化，丢弃已缓存的权限集（新建的管理员没有缓存）
+        for row in rows:
+            if "id" in row:
+                await role_permissions.invalidate_admin(row["id"])
+        await response_cache.invalidate("admins")
+
+
+sys_admin_crud = CRUDSysAdmin(FSysAdmin)
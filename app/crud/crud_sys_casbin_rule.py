@@ -0,0 +1,20 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.f_sys_casbin_rule import FSysCasbinRule
+from app.services.rbac_enforcer import rbac_enforcer
+
+
+class CRUDSysCasbinRule(CRUDBase[FSysCasbinRule]):
+    """
+    通用读写。直接按行修改规则后所有 worker 全量重新加载策略；
+    增删规则优先使用 `rbac_enforcer.add_rules/remove_rules`（增量同步）。
+    """
+
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        await rbac_enforcer.request_reload()
+
+
+sys_casbin_rule_crud = CRUDSysCasbinRule(FSysCasbinRule)
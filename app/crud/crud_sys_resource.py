@@ -0,0 +1,20 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.f_sys_resource import FSysResource
+from app.services.menu_tree import menu_tree
+from app.services.response_cache import response_cache
+
+
+class CRUDSysResource(CRUDBase[FSysResource]):
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        if all("id" in row for row in rows):
+            await menu_tree.invalidate(row["id"] for row in rows)
+        else:
+            await menu_tree.invalidate_all()
+        await response_cache.invalidate("menus")
+
+
+sys_resource_crud = CRUDSysResource(FSysResource)
@@ -0,0 +1,20 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+from app.models.f_sys_role import FSysRole
+from app.services.response_cache import response_cache
+from app.services.role_permissions import role_permissions
+
+
+class CRUDSysRole(CRUDBase[FSysRole]):
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        # 角色停用/启用会改变其资源位图
+        role_ids = [row["id"] for row in rows if "id" in row]
+        if role_ids:
+            await role_permissions.invalidate_roles(role_ids)
+            await response_cache.invalidate("roles")
+
+
+sys_role_crud = CRUDSysRole(FSysRole)
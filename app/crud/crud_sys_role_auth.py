@@ -0,0 +1,27 @@
+from typing import Any, Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.crud.base import CRUDBase
+from app.models.f_sys_role_auth import FSysRoleAuth
+from app.services.response_cache import response_cache
+from app.services.role_permissions import role_permissions
+
+
+class CRUDSysRoleAuth(CRUDBase[FSysRoleAuth]):
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        role_ids = {row["role_id"] for row in rows if "role_id" in row}
+        # 按主键批量更新时行内可能没有 role_id，回表查询
+        ids = [row["id"] for row in rows if "role_id" not in row and "id" in row]
+        if ids:
+            result = await db.execute(
+                select(FSysRoleAuth.role_id).where(FSysRoleAuth.id.in_(ids))
+            )
+            role_ids.update(result.scalars())
+        if role_ids:
+            await role_permissions.invalidate_roles(role_ids)
+            await response_cache.invalidate("roles")
+
+
+sys_role_auth_crud = CRUDSysRoleAuth(FSysRoleAuth)
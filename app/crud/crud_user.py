@@ -1,16 +1,16 @@
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from app.core.security import get_password_hash, verify_password
+from app.core.config import settings
+from app.crud.base import CRUDBase
 from app.models.f_users import FUsers
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, UserUpdate
+from app.services.password_hasher import password_hasher
+from app.services.principal_cache import principal_cache
+from app.services.response_cache import response_cache
 
 
-class CRUDUser:
-    async def get(self, db: AsyncSession, id: int) -> Optional[FUsers]:
-        result = await db.execute(select(FUsers).filter(FUsers.id == id))
-        return result.scalars().first()
-
+class CRUDUser(CRUDBase[FUsers]):
     async def get_by_email(self, db: AsyncSession, email: str) -> Optional[FUsers]:
         result = await db.execute(select(FUsers).filter(FUsers.email == email))
         return result.scalars().first()
@@ -21,28 +21,120 @@ class CRUDUser:
         result = await db.execute(select(FUsers).filter(FUsers.username == username))
         return result.scalars().first()
 
+    async def get_by_username_cached(
+        self, db: AsyncSession, username: str
+    ) -> Optional[FUsers]:
+        """
+        Cache-aside lookup used by authentication.
+        The returned object may be detached and lacks `hashed_password`.
+        """
+        if not settings.PRINCIPAL_CACHE_ENABLED:
+            return await self.get_by_username(db, username=username)
+        user = await principal_cache.get_by_username(username)
+        if user is None:
+            user = await self.get_by_username(db, username=username)
+            if user is not None:
+                await principal_cache.set(user)
+        return user
+
     async def create(self, db: AsyncSession, obj_in: UserCreate) -> FUsers:
         db_obj = FUsers(
             email=obj_in.email,
             username=obj_in.username,
-            hashed_password=get_password_hash(obj_in.password),
+            hashed_password=await password_hasher.hash(obj_in.password),
             is_active=obj_in.is_active,
             is_superuser=obj_in.is_superuser,
         )
         db.add(db_obj)
         await db.commit()
         await db.refresh(db_obj)
+        await self._changed(db, [self._row(db_obj)])
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        db_obj: FUsers,
+        obj_in: Union[UserUpdate, Dict[str, Any]],
+    ) -> FUsers:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        password = update_data.pop("password", None)
+        if password:
+            update_data["hashed_password"] = await password_hasher.hash(password)
+
+        old_username = db_obj.username
+        db_obj = await db.merge(db_obj)
+        for field, value in update_data.items():
+            setattr(db_obj, field, value)
+        await db.commit()
+        await db.refresh(db_obj)
+
+        await principal_cache.invalidate(db_obj.id, old_username)
+        await self._changed(db, [self._row(db_obj)])
         return db_obj
 
+    async def create_many(
+        self,
+        db: AsyncSession,
+        objs_in: Sequence[Union[UserCreate, Dict[str, Any]]],
+        *,
+        return_objects: bool = False,
+    ) -> List[FUsers]:
+        """批量创建用户，password 与 create() 一样哈希后写入 hashed_password"""
+        rows = []
+        for obj_in in objs_in:
+            values = (
+                obj_in.model_dump() if isinstance(obj_in, UserCreate) else dict(obj_in)
+            )
+            password = values.pop("password", None)
+            if password:
+                values["hashed_password"] = await password_hasher.hash(password)
+            rows.append(values)
+        return await super().create_many(db, rows, return_objects=return_objects)
+
+    async def update_many(
+        self, db: AsyncSession, rows: Sequence[Dict[str, Any]]
+    ) -> int:
+        # 改名的用户，旧用户名下的 principal 缓存也要失效
+        renamed = [row["id"] for row in rows if "username" in row]
+        old_names = await self._usernames(db, renamed) if renamed else {}
+        count = await super().update_many(db, rows)
+        for user_id, username in old_names.items():
+            await principal_cache.invalidate(user_id, username)
+        return count
+
+    async def _usernames(self, db: AsyncSession, ids: Iterable[int]) -> Dict[int, str]:
+        result = await db.execute(
+            select(FUsers.id, FUsers.username).where(FUsers.id.in_(list(ids)))
+        )
+        return dict(result.all())
+
+    async def _changed(self, db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+        # update_many 等只含部分列的行没有 username，回表查询，
+        # 否则 get_current_user 读取的 principal:name:{username} 不会失效
+        missing = [row["id"] for row in rows if "id" in row and "username" not in row]
+        names = await self._usernames(db, missing) if missing else {}
+        for row in rows:
+            if "id" in row:
+                await principal_cache.invalidate(
+                    row["id"], row.get("username") or names.get(row["id"])
+                )
+        await response_cache.invalidate(
+            *(f"user:{row['id']}" for row in rows if "id" in row)
+        )
+
     async def authenticate(
         self, db: AsyncSession, username: str, password: str
     ) -> Optional[FUsers]:
         user = await self.get_by_username(db, username=username)
         if not user:
             return None
-        if not verify_password(password, user.hashed_password):
+        if not await password_hasher.verify(password, user.hashed_password):
             return None
         return user
 
 
-user_crud = CRUDUser()
+user_crud = CRUDUser(FUsers)
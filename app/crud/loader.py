@@ -0,0 +1,109 @@
+import asyncio
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud.base import CRUDBase
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchFn = Callable[[List[K]], Awaitable[Mapping[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """
+    合并同一轮事件循环内的 load(key) 调用，批量查询一次。
+
+    `await asyncio.gather(*(loader.load(i) for i in user_ids))` 只产生一条
+    `WHERE id IN (...)` 查询；同一个 key 在 loader 生命周期内只查询一次。
+    loader 按请求创建，请求结束即丢弃，不存在跨请求的陈旧数据。
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = 1000):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        # 待查询的 (key, future)；clear(key) 之后已发出的 future 仍由这里完成
+        self._queue: List[Tuple[K, asyncio.Future]] = []
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self._futures[key] = loop.create_future()
+            self._queue.append((key, future))
+            if len(self._queue) == 1:
+                # 当前 tick 内的其它 load() 都会进入同一批
+                loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: List[K]) -> List[Optional[V]]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """写入已知结果（例如列表查询已取到的对象）"""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def clear(self, key: K) -> None:
+        self._futures.pop(key, None)
+
+    def _dispatch(self) -> None:
+        pending, self._queue = self._queue, []
+        for start in range(0, len(pending), self._max_batch_size):
+            batch = pending[start : start + self._max_batch_size]
+            asyncio.get_running_loop().create_task(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[K, asyncio.Future]]) -> None:
+        try:
+            results = await self._batch_fn([key for key, _ in batch])
+        except Exception as e:
+            for key, future in batch:
+                # 失败的 key 不缓存，下次 load 时重试（期间可能已被 clear 或重新 load）
+                if self._futures.get(key) is future:
+                    del self._futures[key]
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for key, future in batch:
+            if not future.done():
+                future.set_result(results.get(key))
+
+
+class Loaders:
+    """
+    单个请求内的 DataLoader 集合，按 CRUD 对象各建一个 loader。
+
+    同一个 AsyncSession 不能并发执行查询，各 loader 的批量查询在这里串行化。
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._lock = asyncio.Lock()
+        self._loaders: Dict[int, DataLoader] = {}
+
+    def __getitem__(self, crud: CRUDBase) -> DataLoader:
+        loader = self._loaders.get(id(crud))
+        if loader is None:
+
+            async def batch(ids: List[Any]) -> Mapping[Any, Any]:
+                async with self._lock:
+                    return await crud.get_many(self.db, ids)
+
+            loader = self._loaders[id(crud)] = DataLoader(batch)
+        return loader
@@ -0,0 +1,143 @@
+"""
+SQLAlchemy 连接池监控。
+
+通过连接池事件统计连接建立/失效/归还，并用 `InstrumentedAsyncQueuePool`
+记录每次 checkout 的等待时间，用于评估 N 个 worker 下的 MySQL 连接预算与池饥饿。
+"""
+
+import logging
+import time
+from typing import Dict
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    def __init__(self, name: str, slow_checkout_ms: float = 100):
+        self.name = name
+        self.slow_checkout_seconds = slow_checkout_ms / 1000
+        self.pool: Pool = None
+
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.in_use = 0
+        self.in_use_max = 0
+        self.checkout_wait_seconds_total = 0.0
+        self.checkout_wait_seconds_max = 0.0
+
+    def observe_checkout_wait(self, seconds: float) -> None:
+        self.checkout_wait_seconds_total += seconds
+        if seconds > self.checkout_wait_seconds_max:
+            self.checkout_wait_seconds_max = seconds
+        if seconds >= self.slow_checkout_seconds:
+            logger.warning(
+                "db pool %s: waited %.1fms for a connection (%s)",
+                self.name,
+                seconds * 1000,
+                self.pool.status() if self.pool is not None else "",
+            )
+
+    def attach(self, engine: AsyncEngine) -> "PoolMetrics":
+        sync_engine = engine.sync_engine
+        self.pool = sync_engine.pool
+        if isinstance(self.pool, InstrumentedAsyncQueuePool):
+            self.pool.metrics = self
+
+        @event.listens_for(sync_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            self.connects += 1
+
+        @event.listens_for(sync_engine, "checkout")
+        def on_checkout(dbapi_connection, connection_record, connection_proxy):
+            self.checkouts += 1
+            self.in_use += 1
+            if self.in_use > self.in_use_max:
+                self.in_use_max = self.in_use
+
+        @event.listens_for(sync_engine, "checkin")
+        def on_checkin(dbapi_connection, connection_record):
+            self.checkins += 1
+            self.in_use = max(self.in_use - 1, 0)
+
+        @event.listens_for(sync_engine, "invalidate")
+        def on_invalidate(dbapi_connection, connection_record, exception):
+            self.invalidations += 1
+
+        @event.listens_for(sync_engine, "soft_invalidate")
+        def on_soft_invalidate(dbapi_connection, connection_record, exception):
+            self.soft_invalidations += 1
+
+        return self
+
+    def snapshot(self) -> dict:
+        pool = self.pool
+        data = {
+            "name": self.name,
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "checkins": self.checkins,
+            "invalidations": self.invalidations,
+            "soft_invalidations": self.soft_invalidations,
+            "timeouts": self.timeouts,
+            "in_use": self.in_use,
+            "in_use_max": self.in_use_max,
+            "checkout_wait_seconds_total": self.checkout_wait_seconds_total,
+            "checkout_wait_seconds_max": self.checkout_wait_seconds_max,
+        }
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            data.update(
+                pool_size=pool.size(),
+                checked_in=pool.checkedin(),
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+            )
+        return data
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """在 `_do_get` 外计时，得到真实的 checkout 等待时间（含池满时的排队）"""
+
+    metrics: PoolMetrics = None
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.timeouts += 1
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_checkout_wait(time.perf_counter() - start)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        if self.metrics is not None:
+            self.metrics.pool = pool
+        return pool
+
+
+pool_metrics: Dict[str, PoolMetrics] = {}
+
+
+def instrument_engine(
+    name: str, engine: AsyncEngine, slow_checkout_ms: float = 100
+) -> PoolMetrics:
+    metrics = PoolMetrics(name, slow_checkout_ms=slow_checkout_ms).attach(engine)
+    pool_metrics[name] = metrics
+    return metrics
+
+
+def get_pool_stats() -> list[dict]:
+    return [metrics.snapshot() for metrics in pool_metrics.values()]
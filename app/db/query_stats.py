@@ -0,0 +1,136 @@
+"""
+SQL 语句级监控。
+
+通过 `before_cursor_execute` / `after_cursor_execute` 事件记录每条语句的耗时与行数：
+- 汇总到 Prometheus 直方图 `db_query_duration_seconds`；
+- 超过 DB_SLOW_QUERY_MS 的语句写入慢查询日志（logger `app.db.slow`），只记录归一化后的
+  语句指纹，不记录参数；
+- 请求期间（`QueryStatsMiddleware` 设置上下文）累计语句数、耗时、行数与各指纹的执行次数，
+  用于 `Server-Timing` 响应头和 N+1 告警。
+
+SQLAlchemy 在 greenlet 中执行同步代码时沿用调用方协程的 contextvars，事件回调里可以直接
+取到当前请求的统计对象。
+"""
+
+import hashlib
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+from app.core.metrics import db_query_duration_seconds
+
+slow_logger = logging.getLogger("app.db.slow")
+
+_SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "REPLACE"}
+_START_KEY = "query_stats_start"
+
+# 归一化：字符串 / 数字字面量 -> ?，占位符统一为 ?，IN (?, ?, ...) -> IN (...)，空白折叠
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_RE = re.compile(r"%\(\w+\)s|%s|:\w+|\?")
+_IN_LIST_RE = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+_VALUES_RE = re.compile(r"\bVALUES\s*(\([^()]*\))(?:\s*,\s*\([^()]*\))+", re.IGNORECASE)
+_SPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> Tuple[str, str]:
+    """返回 (指纹 id, 归一化语句)；同一结构、不同参数的语句指纹相同"""
+    normalized = _STRING_RE.sub("?", statement)
+    normalized = _PLACEHOLDER_RE.sub("?", normalized)
+    normalized = _NUMBER_RE.sub("?", normalized)
+    normalized = _IN_LIST_RE.sub("IN (...)", normalized)
+    normalized = _VALUES_RE.sub(r"VALUES \1, ...", normalized)
+    normalized = _SPACE_RE.sub(" ", normalized).strip()
+    digest = hashlib.sha1(normalized.encode()).hexdigest()[:12]
+    return digest, normalized
+
+
+def _sql_operation(statement: str) -> str:
+    word = statement.lstrip()[:7].upper().split(None, 1)
+    operation = word[0] if word else ""
+    return operation if operation in _SQL_OPERATIONS else "OTHER"
+
+
+@dataclass
+class RequestQueryStats:
+    count: int = 0
+    seconds: float = 0.0
+    rows: int = 0
+    fingerprints: Counter = field(default_factory=Counter)
+    statements: dict = field(default_factory=dict)  # 指纹 -> 归一化语句
+
+    def repeated(self, threshold: int) -> list:
+        """执行次数达到 threshold 的 (指纹, 次数, 语句)，疑似 N+1"""
+        return [
+            (fp, count, self.statements[fp])
+            for fp, count in self.fingerprints.most_common()
+            if count >= threshold
+        ]
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar(
+    "request_query_stats", default=None
+)
+
+
+def begin_request() -> RequestQueryStats:
+    stats = RequestQueryStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def instrument_queries(name: str, engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    slow_seconds = settings.DB_SLOW_QUERY_MS / 1000
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info[_START_KEY] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        start = conn.info.pop(_START_KEY, None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        db_query_duration_seconds.labels(name, _sql_operation(statement)).observe(
+            elapsed
+        )
+        # 无缓冲游标（stream）上 SELECT 的 rowcount 为 -1
+        rows = max(getattr(cursor, "rowcount", -1), 0)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            fp, normalized = fingerprint(statement)
+            stats.count += 1
+            stats.seconds += elapsed
+            stats.rows += rows
+            stats.fingerprints[fp] += 1
+            stats.statements.setdefault(fp, normalized)
+
+        if elapsed >= slow_seconds:
+            fp, normalized = fingerprint(statement)
+            slow_logger.warning(
+                "slow query %.1fms rows=%d engine=%s fingerprint=%s: %s",
+                elapsed * 1000,
+                rows,
+                name,
+                fp,
+                normalized,
+                extra={
+                    "latency_ms": elapsed * 1000,
+                    "rows": rows,
+                    "engine": name,
+                    "fingerprint": fp,
+                },
+            )
@@ -1,22 +1,293 @@
+import asyncio
+import logging
+import secrets
+import time
+from typing import Any, Optional, Sequence
+
 import redis.asyncio as redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import observe_redis
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+_INVALIDATE_CHANNEL = "__redis__:invalidate"
+
+# 锁的值为持有者的随机令牌，令牌一致时才续期/删除：
+# 锁过期后被其他请求重新获得时，原持有者不会误删或续上别人的锁
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_EXTEND_LOCK_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+class ClientSideCache:
+    """
+    基于服务端失效通知（CLIENT TRACKING BCAST + REDIRECT）的本地读缓存。
+
+    一条连接订阅 `__redis__:invalidate`，另一条连接以 BCAST 模式开启跟踪并把
+    通知重定向到订阅连接：任意客户端修改匹配前缀的键，本地副本立即失效。
+    跟踪连接断开期间缓存停用，所有读取直接访问 Redis。
+    """
+
+    def __init__(
+        self,
+        pool: redis.ConnectionPool,
+        prefixes: Sequence[str],
+        maxsize: int,
+        ttl: float,
+        ping_interval: float = 5.0,
+    ):
+        self._pool = pool
+        self.prefixes = tuple(prefixes)
+        self.ping_interval = ping_interval
+        self.active = False
+        self.invalidations = 0
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        # key -> 读取期间是否收到失效通知
+        self._inflight: dict[str, bool] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def matches(self, key: str) -> bool:
+        return key.startswith(self.prefixes)
+
+    async def get(self, client: redis.Redis, key: str) -> Any:
+        if not self.active or not self.matches(key) or key in self._inflight:
+            return await client.get(key)
+
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        self._inflight[key] = False
+        try:
+            value = await client.get(key)
+        finally:
+            invalidated = self._inflight.pop(key)
+        # 不存在的键也缓存（None），之后的写入同样会触发失效通知
+        if self.active and not invalidated:
+            self._cache.set(key, value)
+        return value
+
+    def _invalidate(self, keys: Optional[list]) -> None:
+        if keys is None:
+            # FLUSHALL / FLUSHDB 或跟踪重定向中断
+            self._cache.clear()
+            for key in self._inflight:
+                self._inflight[key] = True
+            return
+        for key in keys:
+            self.invalidations += 1
+            self._cache.pop(key)
+            if key in self._inflight:
+                self._inflight[key] = True
+
+    def _deactivate(self) -> None:
+        self.active = False
+        self._invalidate(None)
+
+    async def _listen(self) -> None:
+        listener = self._pool.connection_class(**self._pool.connection_kwargs)
+        tracker = self._pool.connection_class(**self._pool.connection_kwargs)
+        try:
+            await listener.connect()
+            await tracker.connect()
+
+            await listener.send_command("CLIENT", "ID")
+            client_id = await listener.read_response()
+            await listener.send_command("SUBSCRIBE", _INVALIDATE_CHANNEL)
+            await listener.read_response()
+
+            args = ["CLIENT", "TRACKING", "ON", "REDIRECT", client_id, "BCAST"]
+            for prefix in self.prefixes:
+                args += ["PREFIX", prefix]
+            await tracker.send_command(*args)
+            await tracker.read_response()
+
+            self._cache.clear()
+            self.active = True
+            while True:
+                message = await listener.read_response(timeout=self.ping_interval)
+                if message is None:
+                    # 跟踪状态挂在 tracker 连接上，定期探活
+                    await tracker.send_command("PING")
+                    await tracker.read_response()
+                    continue
+                if message[0] in ("message", b"message"):
+                    self._invalidate(message[2])
+        finally:
+            self._deactivate()
+            await listener.disconnect()
+            await tracker.disconnect()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("redis client-side cache disabled: %s", e)
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "invalidations": self.invalidations,
+            **self._cache.stats(),
+        }
+
+
+class InstrumentedPipeline(redis.client.Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            observe_redis("PIPELINE", time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    """记录每条命令（含 Lua 脚本的 EVALSHA）的往返耗时"""
+
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            observe_redis(str(args[0]).upper(), time.perf_counter() - start)
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: Optional[str] = None
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
 
 
 class RedisClient:
     _client: redis.Redis = None
+    _pool: redis.BlockingConnectionPool = None
+    cache: Optional[ClientSideCache] = None
 
     @classmethod
     def get_client(cls) -> redis.Redis:
         if cls._client is None:
-            cls._client = redis.from_url(
-                settings.REDIS_URI, encoding="utf-8", decode_responses=True
+            # 连接池满时阻塞等待 REDIS_POOL_TIMEOUT 秒，而不是无限创建连接
+            cls._pool = redis.BlockingConnectionPool.from_url(
+                settings.REDIS_URI,
+                max_connections=settings.REDIS_MAX_CONNECTIONS,
+                timeout=settings.REDIS_POOL_TIMEOUT,
+                socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+                health_check_interval=settings.REDIS_HEALTH_CHECK_INTERVAL,
+                retry=Retry(ExponentialBackoff(), settings.REDIS_RETRY_ATTEMPTS),
+                retry_on_error=[ConnectionError, TimeoutError],
+                encoding="utf-8",
+                decode_responses=True,
             )
+            cls._client = InstrumentedRedis(connection_pool=cls._pool)
         return cls._client
 
+    @classmethod
+    def start_cache(cls) -> None:
+        if not settings.REDIS_CLIENT_CACHE_ENABLED or cls.cache is not None:
+            return
+        cls.get_client()
+        if cls._pool is None:
+            return
+        cls.cache = ClientSideCache(
+            cls._pool,
+            prefixes=[
+                p.strip()
+                for p in settings.REDIS_CLIENT_CACHE_PREFIXES.split(",")
+                if p.strip()
+            ],
+            maxsize=settings.REDIS_CLIENT_CACHE_MAXSIZE,
+            ttl=settings.REDIS_CLIENT_CACHE_TTL,
+        )
+        cls.cache.start()
+
+    @classmethod
+    async def cached_get(cls, key: str) -> Any:
+        """GET，匹配 REDIS_CLIENT_CACHE_PREFIXES 的键优先读本地失效跟踪缓存"""
+        client = cls.get_client()
+        if cls.cache is None:
+            return await client.get(key)
+        return await cls.cache.get(client, key)
+
+    @classmethod
+    def pool_stats(cls) -> dict:
+        pool = cls._pool
+        if pool is None:
+            return {}
+        available = len(getattr(pool, "_available_connections", []))
+        in_use = len(getattr(pool, "_in_use_connections", []))
+        data = {
+            "max_connections": pool.max_connections,
+            "available": available,
+            "in_use": in_use,
+        }
+        if cls.cache is not None:
+            data["client_cache"] = cls.cache.stats()
+        return data
+
     @classmethod
     async def close(cls):
+        if cls.cache:
+            await cls.cache.stop()
+            cls.cache = None
         if cls._client:
-            await cls._client.close()
+            await cls._client.aclose()
+            cls._client = None
+        if cls._pool:
+            await cls._pool.disconnect()
+            cls._pool = None
+
+
+async def acquire_lock(key: str, ttl: int) -> Optional[str]:
+    """SET NX 加锁，成功时返回释放/续期用的令牌，已被占用时返回 None"""
+    token = secrets.token_hex(16)
+    if await RedisClient.get_client().set(key, token, nx=True, ex=ttl):
+        return token
+    return None
+
+
+async def extend_lock(key: str, token: str, ttl: int) -> bool:
+    """仍持有锁时把过期时间重置为 ttl 秒，锁已丢失时返回 False"""
+    client = RedisClient.get_client()
+    return bool(await client.eval(_EXTEND_LOCK_SCRIPT, 1, key, token, ttl))
+
+
+async def release_lock(key: str, token: str) -> bool:
+    client = RedisClient.get_client()
+    return bool(await client.eval(_RELEASE_LOCK_SCRIPT, 1, key, token))
 
 
 async def get_redis() -> redis.Redis:
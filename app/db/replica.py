@@ -0,0 +1,204 @@
+"""
+主从读写分离。
+
+`RoutingSession` 在只读会话（`info["readonly"]`）中把纯 SELECT 路由到健康的从库，
+写操作、`FOR UPDATE`、flush 以及之后的所有语句都走主库。
+`ReplicaRouter` 定期检查从库复制延迟，延迟超限或出错的从库被摘除，恢复后自动加回。
+
+Read-your-writes：提交过写操作的请求方（由 `set_read_your_writes_key` 标识，
+通常是当前用户）在 DB_READ_YOUR_WRITES_SECONDS 内的读请求继续走主库。
+该窗口记录在进程内，跨 worker 的一致性依赖窗口时长大于复制延迟上限。
+`primary_reads()` 块内的读同样走主库（如重新生成刚失效的缓存）。
+"""
+
+import asyncio
+import itertools
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.selectable import Select
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+_read_your_writes_key: ContextVar[Optional[str]] = ContextVar(
+    "read_your_writes_key", default=None
+)
+
+
+_primary_reads: ContextVar[bool] = ContextVar("primary_reads", default=False)
+
+
+def set_read_your_writes_key(key: Optional[str]) -> None:
+    """标识当前请求的写入方（如 `user:1`），用于 read-your-writes 窗口"""
+    _read_your_writes_key.set(key)
+
+
+@contextmanager
+def primary_reads(enabled: bool = True) -> Iterator[None]:
+    """块内只读会话的查询也走主库"""
+    token = _primary_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+class Replica:
+    def __init__(self, name: str, engine: AsyncEngine):
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        replicas: List[Replica],
+        max_lag_seconds: float,
+        check_interval: float,
+        read_your_writes_seconds: float,
+    ):
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self._round_robin = itertools.cycle(replicas) if replicas else None
+        self._recent_writers = TTLCache(maxsize=10000, ttl=read_your_writes_seconds)
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """轮询选择一个健康从库；没有可用从库时返回 None（调用方回落主库）"""
+        for _ in range(len(self.replicas)):
+            replica = next(self._round_robin)
+            if replica.healthy:
+                return replica.engine
+        return None
+
+    def note_write(self, key: Optional[str]) -> None:
+        if key is not None:
+            self._recent_writers.set(key, True)
+
+    def recently_wrote(self, key: Optional[str]) -> bool:
+        return key is not None and self._recent_writers.get(key, False)
+
+    async def _check(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                try:
+                    result = await conn.execute(text("SHOW REPLICA STATUS"))
+                except DBAPIError:
+                    # MySQL < 8.0.22
+                    result = await conn.execute(text("SHOW SLAVE STATUS"))
+                row = result.mappings().first()
+        except Exception as e:
+            replica.lag = None
+            replica.last_error = str(e)
+            self._set_health(replica, False)
+            return
+
+        replica.last_error = None
+        if row is None:
+            # 不是从库（例如本地开发直接指向主库）
+            replica.lag = 0.0
+        else:
+            lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+            replica.lag = float(lag) if lag is not None else None
+        self._set_health(
+            replica, replica.lag is not None and replica.lag <= self.max_lag_seconds
+        )
+
+    def _set_health(self, replica: Replica, healthy: bool) -> None:
+        if replica.healthy != healthy:
+            logger.warning(
+                "db replica %s %s (lag=%s, error=%s)",
+                replica.name,
+                "restored" if healthy else "ejected",
+                replica.lag,
+                replica.last_error,
+            )
+        replica.healthy = healthy
+
+    async def check_replicas(self) -> None:
+        await asyncio.gather(*(self._check(replica) for replica in self.replicas))
+
+    async def _run(self) -> None:
+        while True:
+            await self.check_replicas()
+            await asyncio.sleep(self.check_interval)
+
+    def start(self) -> None:
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> list[dict]:
+        return [
+            {
+                "name": replica.name,
+                "healthy": replica.healthy,
+                "lag": replica.lag,
+                "last_error": replica.last_error,
+            }
+            for replica in self.replicas
+        ]
+
+
+class RoutingSession(Session):
+    """
+    `info["router"]` 为 ReplicaRouter，`info["readonly"]` 为 True 时启用从库路由。
+    会话一旦写入即固定在主库，保证同一工作单元内读到自己的写入。
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        is_read = (
+            not self._flushing
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None
+        )
+        if not is_read:
+            self.info["wrote"] = True
+
+        router: Optional[ReplicaRouter] = self.info.get("router")
+        if (
+            not is_read
+            or router is None
+            or not self.info.get("readonly")
+            or self.info.get("wrote")
+            or _primary_reads.get()
+            or router.recently_wrote(_read_your_writes_key.get())
+        ):
+            return super().get_bind(mapper=mapper, clause=clause, **kw)
+
+        # 同一会话内固定使用同一个从库
+        replica = self.info.get("replica")
+        if replica is None:
+            replica = router.pick()
+            if replica is None:
+                return super().get_bind(mapper=mapper, clause=clause, **kw)
+            self.info["replica"] = replica
+        return replica.sync_engine
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: Session) -> None:
+    if session.info.get("wrote"):
+        router: Optional[ReplicaRouter] = session.info.get("router")
+        if router is not None:
+            router.note_write(_read_your_writes_key.get())
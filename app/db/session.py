@@ -1,20 +1,67 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool_metrics import InstrumentedAsyncQueuePool, instrument_engine
+from app.db.query_stats import instrument_queries
+from app.db.replica import Replica, ReplicaRouter, RoutingSession
 
-engine = create_async_engine(
-    settings.SQLALCHEMY_DATABASE_URI,
-    echo=True,  # Set to False in production
-    future=True,
+
+def create_engine(url: str):
+    """
+    按 Settings 中的连接池参数创建异步引擎。
+    每个 gunicorn worker 独立持有一个连接池，
+    MySQL 侧最大连接数约为 GUNICORN_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW)。
+    """
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI)
+instrument_engine("primary", engine, settings.DB_POOL_SLOW_CHECKOUT_MS)
+instrument_queries("primary", engine)
+
+replicas = []
+for index, uri in enumerate(filter(None, settings.DB_REPLICA_URIS.split(","))):
+    name = f"replica{index}"
+    replica_engine = create_engine(uri.strip())
+    instrument_engine(name, replica_engine, settings.DB_POOL_SLOW_CHECKOUT_MS)
+    instrument_queries(name, replica_engine)
+    replicas.append(Replica(name, replica_engine))
+
+replica_router = ReplicaRouter(
+    replicas,
+    max_lag_seconds=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.DB_REPLICA_CHECK_INTERVAL,
+    read_your_writes_seconds=settings.DB_READ_YOUR_WRITES_SECONDS,
 )
 
 AsyncSessionLocal = sessionmaker(
     bind=engine,  # 绑定数据库引擎
     class_=AsyncSession,  # 指定异步会话类
+    sync_session_class=RoutingSession,  # 记录写入，用于 read-your-writes
+    info={"router": replica_router},
     expire_on_commit=False,  # 提交后不立即过期会话中的对象
     autoflush=False,  # 提交前不自动刷新
 )
 
+# 只读会话：SELECT 路由到从库，发生写入后自动回到主库
+AsyncReadSessionLocal = sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    sync_session_class=RoutingSession,
+    info={"router": replica_router, "readonly": True},
+    expire_on_commit=False,
+    autoflush=False,
+)
+
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -22,3 +69,11 @@ async def get_db():
             yield session
         finally:
             await session.close()
+
+
+async def get_db_readonly():
+    async with AsyncReadSessionLocal() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
@@ -1,4 +1,6 @@
 import os
+import shutil
+
 from app.core.config import settings
 
 # Gunicorn config variables
@@ -6,6 +8,10 @@ bind = settings.GUNICORN_BIND
 workers = settings.GUNICORN_WORKERS
 worker_class = settings.GUNICORN_WORKER_CLASS
 
+# 多进程指标：必须在 worker 导入 prometheus_client 之前设置，fork 后由 worker 继承
+if settings.METRICS_ENABLED:
+    os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", settings.METRICS_MULTIPROC_DIR)
+
 
 def on_starting(server):
     """
@@ -13,6 +19,11 @@ def on_starting(server):
     只执行一次，用于打印环境信息
     """
     env = os.getenv("APP_ENV", "development")
+    metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        # 上次运行遗留的 worker 文件会被计入汇总结果
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir, exist_ok=True)
     print("=" * 60)
     print(f"🚀 Starting {settings.PROJECT_NAME}")
     print("=" * 60)
@@ -22,6 +33,24 @@ def on_starting(server):
     print(
         f"🗄️ Database: {settings.MYSQL_HOST}:{settings.MYSQL_PORT}/{settings.MYSQL_DB}"
     )
+    max_db_connections = settings.GUNICORN_WORKERS * (
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    )
+    print(
+        f"🔌 DB Pool: size={settings.DB_POOL_SIZE} overflow={settings.DB_MAX_OVERFLOW} "
+        f"(max {max_db_connections} MySQL connections across workers)"
+    )
     print(f"💾 Redis: {settings.REDIS_HOST}:{settings.REDIS_PORT}/{settings.REDIS_DB}")
     print(f"👷 Workers: {settings.GUNICORN_WORKERS}")
     print("=" * 60)
+
+
+def child_exit(server, worker):
+    """
+    worker 退出后执行（Master 进程）
+    清理该 worker 的 live gauge 文件；计数器与直方图文件保留，重启后总数不回退
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from app.core.metrics import mark_process_dead
+
+        mark_process_dead(worker.pid)
@@ -1,28 +1,58 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.datastructures import Default
+from fastapi.responses import JSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST
 
+from app.api.caching import cached
 from app.api.v1.api import api_router
 from app.core.config import settings
+from app.core.logging_config import setup_logging, start_log_listener, stop_log_listener
+from app.core.metrics import render_metrics
+from app.core.responses import FastJSONResponse
 from app.db.redis import RedisClient
+from app.db.session import replica_router
 from app.middleware.logger_middleware import LoggerMiddleware
+from app.middleware.metrics_middleware import MetricsMiddleware
+from app.middleware.profiling_middleware import ProfilingMiddleware
+from app.middleware.query_stats_middleware import QueryStatsMiddleware
+from app.middleware.rate_limit_middleware import RateLimitHeadersMiddleware
+from app.services.password_hasher import PasswordHasherBusy, password_hasher
+from app.services.pubsub import subscriber
+from app.services.token_store import TokenStoreBusy
+
+setup_logging()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    start_log_listener()
     # Startup: Initialize Redis or other connections if needed explicitly
     # But we use RedisClient.get_client() lazy loading usually,
     # or we can initialize it here.
     _ = RedisClient.get_client()
+    RedisClient.start_cache()
+    subscriber.start()
+    replica_router.start()
     yield
     # Shutdown
+    await replica_router.stop()
+    await subscriber.stop()
     await RedisClient.close()
+    password_hasher.shutdown()
+    stop_log_listener()
 
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     lifespan=lifespan,
+    # 以 Default() 包装：带 response_model 的路由仍走 FastAPI 自身的 JSON 直出路径
+    default_response_class=Default(
+        FastJSONResponse if settings.FAST_JSON_RESPONSE else JSONResponse
+    ),
 )
 
 # Set all CORS enabled origins
@@ -37,12 +67,41 @@ if settings.BACKEND_CORS_ORIGINS:
         allow_headers=["*"],
     )
 
+app.add_middleware(RateLimitHeadersMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
 app.add_middleware(LoggerMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request: Request, exc: PasswordHasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Server is busy, please retry later"},
+        headers={"Retry-After": "1"},
+    )
+
+
+@app.exception_handler(TokenStoreBusy)
+async def token_store_busy_handler(request: Request, exc: TokenStoreBusy):
+    # 同一账号的并发登录/登出冲突，客户端稍后重试即可
+    return JSONResponse(
+        status_code=503,
+        content={
+            "detail": "Sessions are being changed concurrently, please retry later"
+        },
+        headers={"Retry-After": "1"},
+    )
+
 
 app.include_router(api_router, prefix=settings.API_V1_STR)
 
 
 @app.get("/")
+@cached(max_age=300, per_user=False)
 def root():
     return {"message": "Welcome to FastAPI Skeleton"}
 
@@ -53,6 +112,15 @@ def health():
     return {"status": "healthy"}
 
 
+if settings.METRICS_ENABLED:
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Prometheus 抓取端点（gunicorn 下为所有 worker 的汇总）"""
+        content = await asyncio.to_thread(render_metrics)
+        return Response(content=content, media_type=CONTENT_TYPE_LATEST)
+
+
 def start():
     """Entry point for running the application via script"""
     import uvicorn
@@ -1,22 +1,80 @@
-import time
 import logging
-from starlette.middleware.base import BaseHTTPMiddleware
-from fastapi import Request
+import random
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.middleware.utils import get_route_template
+
+logger = logging.getLogger("app.access")
+
 
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+class LoggerMiddleware:
+    """
+    纯 ASGI 访问日志中间件。
 
+    不经过 BaseHTTPMiddleware（无额外 task / 内存流，流式响应不受影响），
+    响应完全发送后记录 method、路由模板、状态码、字节数和耗时。
+    日志按 ACCESS_LOG_SAMPLE_RATE 采样，5xx 与慢请求总是记录。
+    """
 
-class LoggerMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response = await call_next(request)
-        process_time = time.time() - start_time
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.ACCESS_LOG_SAMPLE_RATE,
+        slow_ms: float = settings.ACCESS_LOG_SLOW_MS,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ns = int(slow_ms * 1_000_000)
 
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+        status_code = 500
+        body_bytes = 0
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, body_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed_ns = time.perf_counter_ns() - start
+            if (
+                status_code >= 500
+                or elapsed_ns >= self.slow_ns
+                or self.sample_rate >= 1.0
+                or random.random() < self.sample_rate
+            ):
+                self._log(scope, status_code, body_bytes, elapsed_ns)
+
+    @staticmethod
+    def _log(scope: Scope, status_code: int, body_bytes: int, elapsed_ns: int) -> None:
+        path = get_route_template(scope)
+        latency_ms = elapsed_ns / 1_000_000
+        # 参数在日志线程中才格式化
         logger.info(
-            f"Method: {request.method} Path: {request.url.path} "
-            f"Status: {response.status_code} "
-            f"Process Time: {process_time:.4f}s"
+            "%s %s %d %dB %.2fms",
+            scope["method"],
+            path,
+            status_code,
+            body_bytes,
+            latency_ms,
+            extra={
+                "method": scope["method"],
+                "route": path,
+                "status": status_code,
+                "bytes": body_bytes,
+                "latency_ms": latency_ms,
+            },
         )
-
-        return response
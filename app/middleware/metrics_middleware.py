@@ -0,0 +1,53 @@
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+)
+from app.middleware.utils import get_route_template
+
+# 未命中路由的请求（扫描、404）合并为一个标签，避免标签基数随任意 path 增长
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """
+    纯 ASGI 的 Prometheus 指标中间件：按路由模板统计请求数、延迟直方图，
+    按 method 统计进行中的请求数。耗时计到响应完全发送为止。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = (
+                get_route_template(scope)
+                if scope.get("route") is not None
+                else UNMATCHED_ROUTE
+            )
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            http_requests_total.labels(method, route, status_code).inc()
@@ -0,0 +1,85 @@
+import asyncio
+import hmac
+import logging
+import random
+import sys
+import threading
+import time
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.middleware.utils import get_route_template
+from app.services.profiler import Capture, ProfileStore, Sampler, profile_store, sampler
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    """
+    按请求的采样分析（PROFILING_ENABLED 开启时注册）。
+
+    请求头 `X-Profile: <PROFILING_TOKEN>` 或按 PROFILING_SAMPLE_RATE 随机选中的请求会被采样，
+    响应带上 `X-Profile-Id`（结果文件名）；未选中的请求只多一次随机数判断。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = settings.PROFILING_SAMPLE_RATE,
+        token: str = settings.PROFILING_TOKEN,
+        fmt: str = settings.PROFILING_FORMAT,
+        profiler: Sampler = sampler,
+        store: ProfileStore = profile_store,
+    ):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.token = token.encode()
+        self.fmt = fmt
+        self.sampler = profiler
+        self.store = store
+
+    def _selected(self, scope: Scope) -> bool:
+        if self.token:
+            value = Headers(scope=scope).get("x-profile")
+            if value is not None and hmac.compare_digest(value.encode(), self.token):
+                return True
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._selected(scope):
+            await self.app(scope, receive, send)
+            return
+
+        capture = Capture(
+            asyncio.current_task(), sys._getframe(), threading.get_ident()
+        )
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", capture.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        self.sampler.start(capture)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.sampler.stop(capture)
+            duration_ms = (time.perf_counter() - capture.started) * 1000
+            # 快于一个采样间隔的请求没有样本，不生成文件
+            if capture.samples:
+                try:
+                    name = await asyncio.to_thread(
+                        self.store.save,
+                        capture,
+                        scope["method"],
+                        get_route_template(scope),
+                        duration_ms,
+                        self.fmt,
+                    )
+                    logger.info("request profile saved: %s", name)
+                except OSError as e:
+                    logger.warning("failed to save profile %s: %s", capture.id, e)
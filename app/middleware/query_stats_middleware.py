@@ -0,0 +1,74 @@
+import logging
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.query_stats import begin_request
+from app.middleware.utils import get_route_template
+
+logger = logging.getLogger("app.db.n_plus_one")
+
+
+class QueryStatsMiddleware:
+    """
+    纯 ASGI 中间件：为每个请求开启 SQL 统计。
+
+    响应头 `Server-Timing` 给出响应开始发送前的 SQL 耗时 / 条数 / 行数和总耗时
+    （浏览器开发者工具的 Timing 面板可直接查看）；请求结束后同一语句指纹执行次数
+    达到 DB_N_PLUS_ONE_THRESHOLD 时记录 N+1 告警。
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        server_timing: bool = settings.SERVER_TIMING_ENABLED,
+        n_plus_one_threshold: int = settings.DB_N_PLUS_ONE_THRESHOLD,
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        stats = begin_request()
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start" and self.server_timing:
+                total_ms = (time.perf_counter() - start) * 1000
+                value = (
+                    f'db;dur={stats.seconds * 1000:.2f};desc="{stats.count} queries, '
+                    f'{stats.rows} rows", app;dur={total_ms:.2f}'
+                )
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", value.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if stats.count >= self.n_plus_one_threshold:
+                self._check_repeated(scope, stats)
+
+    def _check_repeated(self, scope: Scope, stats) -> None:
+        route = get_route_template(scope)
+        for fp, count, statement in stats.repeated(self.n_plus_one_threshold):
+            logger.warning(
+                "possible N+1: %s %s ran fingerprint %s %d times: %s",
+                scope["method"],
+                route,
+                fp,
+                count,
+                statement,
+                extra={
+                    "method": scope["method"],
+                    "route": route,
+                    "fingerprint": fp,
+                    "count": count,
+                },
+            )
@@ -0,0 +1,32 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class RateLimitHeadersMiddleware:
+    """
+    把限流依赖的判定结果（request.state.rate_limit）写入 RateLimit-* 响应头。
+
+    端点直接返回 Response 对象时 FastAPI 不会合并依赖设置的响应头，所以在 ASGI 层添加。
+    429 响应的头由 HTTPException 自带。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                result = scope.get("state", {}).get("rate_limit")
+                if result is not None:
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (name.lower().encode(), value.encode())
+                        for name, value in result.headers().items()
+                    ]
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
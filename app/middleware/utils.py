@@ -0,0 +1,25 @@
+from starlette.types import Scope
+
+
+def get_route_template(scope: Scope) -> str:
+    """
+    返回请求命中的路由模板（如 /api/v1/users/{id}），未命中路由时返回原始 path。
+
+    必须在下游应用处理完请求后调用。FastAPI 的 `scope["route"]` 可能只包含
+    子路由器内的相对路径，这里用路由正则反推出 include 时的前缀。
+    """
+    path = scope["path"]
+    route = scope.get("route")
+    route_path = getattr(route, "path", None)
+    path_regex = getattr(route, "path_regex", None)
+    if not route_path or path_regex is None:
+        return path
+    if path_regex.match(path):
+        return route_path
+
+    index = path.find("/", 1)
+    while index != -1:
+        if path_regex.match(path[index:]):
+            return path[:index] + route_path
+        index = path.find("/", index + 1)
+    return route_path
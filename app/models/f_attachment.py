@@ -1,4 +1,4 @@
-from sqlalchemy import text
+from sqlalchemy import Index, text
 from sqlalchemy.dialects.mysql import BIGINT, INTEGER, TINYINT, VARCHAR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 from app.db.base import Base
@@ -6,7 +6,11 @@ from app.db.base import Base
 
 class FAttachment(Base):
     __tablename__ = "f_attachment"
-    __table_args__ = {"comment": "附件表"}
+    __table_args__ = (
+        Index("created_at_index", "created_at"),
+        Index("attach_hash_index", "attach_hash"),
+        {"comment": "附件表"},
+    )
 
     id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
     user_id: Mapped[int] = mapped_column(
@@ -36,6 +40,12 @@ class FAttachment(Base):
     attach_size: Mapped[str] = mapped_column(
         VARCHAR(32), nullable=False, server_default=text("''"), comment="附件大小"
     )
+    attach_hash: Mapped[str] = mapped_column(
+        VARCHAR(64),
+        nullable=False,
+        server_default=text("''"),
+        comment="内容 SHA-256，对应 f_attachment_blob.attach_hash",
+    )
     status: Mapped[int] = mapped_column(
         TINYINT, nullable=False, comment="状态 1：正常 0：删除"
     )
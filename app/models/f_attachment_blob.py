@@ -0,0 +1,41 @@
+from sqlalchemy import Index, text
+from sqlalchemy.dialects.mysql import BIGINT, CHAR, INTEGER, VARCHAR
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class FAttachmentBlob(Base):
+    __tablename__ = "f_attachment_blob"
+    __table_args__ = (
+        Index("attach_hash_index", "attach_hash", unique=True),
+        {"comment": "附件内容表（按内容哈希去重）"},
+    )
+
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    attach_hash: Mapped[str] = mapped_column(
+        CHAR(64), nullable=False, comment="内容 SHA-256（十六进制）"
+    )
+    storage_key: Mapped[str] = mapped_column(
+        VARCHAR(255), nullable=False, comment="存储路径"
+    )
+    attach_size: Mapped[int] = mapped_column(
+        BIGINT, nullable=False, server_default=text("'0'"), comment="内容字节数"
+    )
+    attach_mimetype: Mapped[str] = mapped_column(
+        VARCHAR(128), nullable=False, server_default=text("''"), comment="mime类型"
+    )
+    attach_extension: Mapped[str] = mapped_column(
+        VARCHAR(16), nullable=False, server_default=text("''"), comment="后缀名"
+    )
+    ref_count: Mapped[int] = mapped_column(
+        INTEGER,
+        nullable=False,
+        server_default=text("'0'"),
+        comment="引用该内容的附件数",
+    )
+    created_at: Mapped[int] = mapped_column(
+        INTEGER, nullable=False, server_default=text("'0'")
+    )
+    updated_at: Mapped[int] = mapped_column(
+        INTEGER, nullable=False, server_default=text("'0'")
+    )
@@ -9,6 +9,7 @@ class FSysAdmin(Base):
     __table_args__ = (
         Index("account_index", "account", unique=True),
         Index("dept_id_index", "dept_id"),
+        Index("created_at_index", "created_at"),
         {"comment": "后台管理员表"},
     )
 
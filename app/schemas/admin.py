@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+
+from app.schemas.serializer import ModelSerializer
+
+
+# 不包含 password / salt / mfa_secret
+class Admin(BaseModel):
+    id: int
+    uuid: str
+    dept_id: int
+    nick_name: str
+    real_name: str
+    desc: str
+    gender: int
+    account: str
+    phone: str
+    email: str
+    avatar: str
+    role_ids: str
+    type: int
+    is_main: int
+    is_auth: int
+    status: int
+    created_by: str
+    created_at: int
+    updated_by: str
+    updated_at: int
+
+    class Config:
+        from_attributes = True
+
+
+admin_serializer = ModelSerializer(Admin)
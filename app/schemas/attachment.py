@@ -0,0 +1,45 @@
+from typing import Optional
+from pydantic import BaseModel, Field
+
+from app.schemas.serializer import ModelSerializer
+
+
+class Attachment(BaseModel):
+    id: int
+    user_id: int
+    attach_name: str
+    attach_origin_name: str
+    attach_url: str
+    attach_type: int
+    attach_mimetype: str
+    attach_extension: str
+    attach_size: str
+    status: int
+    created_at: int
+    updated_at: int
+    uploader: Optional[str] = None  # 上传用户的用户名
+
+    class Config:
+        from_attributes = True
+
+
+class UploadCreate(BaseModel):
+    filename: str = Field(..., min_length=1, max_length=255)
+    size: int = Field(..., ge=0, description="文件总字节数")
+    sha256: Optional[str] = Field(
+        None,
+        pattern="^[0-9a-f]{64}$",
+        description="内容 SHA-256，已上传过相同内容时秒传",
+    )
+
+
+class UploadStatus(BaseModel):
+    upload_id: Optional[str] = None  # 秒传时没有上传会话
+    filename: str
+    size: int
+    offset: int
+    completed: bool = False
+    attachment: Optional[Attachment] = None
+
+
+attachment_serializer = ModelSerializer(Attachment)
@@ -0,0 +1,13 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    # 下一页的不透明游标，原样传回 `cursor` 参数；为空表示没有更多数据
+    next_cursor: Optional[str] = None
+    has_more: bool = False
+    # 表行数估算（information_schema），仅在 with_total=true 时返回
+    total_estimate: Optional[int] = None
@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+
+
+class ProfileCapture(BaseModel):
+    name: str  # 文件名，用于下载
+    created_at: str
+    duration_ms: int
+    method: str
+    route: str  # 路由模板，非字母数字字符替换为 _
+    format: str  # collapsed / speedscope
+    size: int
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,79 @@
+"""
+response_model 的预编译序列化器。
+
+FastAPI 默认会先用 response_model 校验端点返回的 ORM 对象，再序列化。
+数据库读出的数据类型已确定，`RESPONSE_TRUST_ORM` 开启时这里改为 `model_construct`
+（不校验，仅对 TINYINT -> bool 这类字段做预先确定的转换），
+再用模块导入时构建好的 TypeAdapter 直接编码为 JSON 字节返回。
+`FAST_JSON_RESPONSE` 关闭时只构造模型，由 FastAPI 按 response_model 校验、编码。
+"""
+
+import typing
+from typing import Any, Callable, Dict, Generic, List, Optional, Type, TypeVar, Union
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.config import settings
+from app.schemas.pagination import CursorPage
+
+T = TypeVar("T", bound=BaseModel)
+
+
+def _to_bool(value: Any) -> Any:
+    return value if value is None else bool(value)
+
+
+def _coercer(annotation: Any) -> Optional[Callable[[Any], Any]]:
+    if annotation is bool or (
+        typing.get_origin(annotation) is typing.Union
+        and bool in typing.get_args(annotation)
+    ):
+        return _to_bool
+    return None
+
+
+class ModelSerializer(Generic[T]):
+    def __init__(self, schema: Type[T], adapter: Optional[TypeAdapter] = None):
+        self.schema = schema
+        self.adapter = adapter or TypeAdapter(schema)
+        self.page_schema = CursorPage[schema]
+        self.page_adapter = TypeAdapter(self.page_schema)
+        self._fields = [
+            (name, _coercer(field.annotation))
+            for name, field in schema.model_fields.items()
+        ]
+
+    def build(self, obj: Any, **extra: Any) -> T:
+        """由 ORM 对象（及额外字段）构造 schema 实例"""
+        values: Dict[str, Any] = {}
+        for name, coerce in self._fields:
+            if name in extra:
+                values[name] = extra[name]
+            elif hasattr(obj, name):
+                value = getattr(obj, name)
+                values[name] = coerce(value) if coerce else value
+        if settings.RESPONSE_TRUST_ORM:
+            return self.schema.model_construct(**values)
+        return self.adapter.validate_python(values)
+
+    def response(self, obj: Any, **extra: Any) -> Union[Response, T]:
+        model = self.build(obj, **extra)
+        if not settings.FAST_JSON_RESPONSE:
+            # 关闭时交回 FastAPI 按 response_model 校验并编码
+            return model
+        return Response(
+            content=self.adapter.dump_json(model), media_type="application/json"
+        )
+
+    def page_response(
+        self, page: dict, items: Optional[List[T]] = None
+    ) -> Union[Response, BaseModel]:
+        """`paginate()` 的结果；items 已构造好时直接传入"""
+        if items is None:
+            items = [self.build(obj) for obj in page["items"]]
+        model = self.page_schema.model_construct(**{**page, "items": items})
+        if not settings.FAST_JSON_RESPONSE:
+            return model
+        content = self.page_adapter.dump_json(model)
+        return Response(content=content, media_type="application/json")
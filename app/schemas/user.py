@@ -1,5 +1,7 @@
 from typing import Optional
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, TypeAdapter
+
+from app.schemas.serializer import ModelSerializer
 
 
 # Common Schemas
@@ -41,3 +43,9 @@ class User(UserInDBBase):
 
 class UserInDB(UserInDBBase):
     hashed_password: str
+
+
+# 预编译的校验/序列化器，模块导入时构建一次
+TokenAdapter = TypeAdapter(Token)
+UserAdapter = TypeAdapter(User)
+user_serializer = ModelSerializer(User, UserAdapter)
@@ -0,0 +1,284 @@
+"""
+后台菜单树（f_sys_resource）。
+
+整张资源表一次查询、O(n) 建成内存森林（子节点按 sort_order, id 有序），
+按（权限集, res_type）缓存序列化好的 JSON 字节：
+- 片段缓存：每个顶级菜单一份，键中带该顶级菜单的版本号
+- 整体缓存：片段拼接结果，键中带森林版本号
+资源变更时只重新加载变更的行、移动/更新对应节点，并递增受影响顶级菜单的版本号，
+其余顶级菜单的片段继续复用。变更通过 `menu:invalidate` 频道通知所有 worker。
+"""
+
+import asyncio
+import bisect
+import json
+import logging
+import uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.core.cache import TTLCache
+from app.db.redis import RedisClient
+from app.db.session import AsyncSessionLocal
+from app.models.f_sys_resource import FSysResource
+from app.services.pubsub import subscriber
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "menu:invalidate"
+
+STATUS_NORMAL = 1
+RES_TYPE_COMMON = 4  # 通用型资源对所有端可见
+RESOURCE_TYPE_ACTION = 3  # 操作（按钮）不进入菜单
+
+ROOT_ID = 0
+
+
+class _Node:
+    __slots__ = (
+        "id",
+        "parent_id",
+        "sort_key",
+        "status",
+        "res_type",
+        "resource_type",
+        "prefix",
+        "children",
+    )
+
+    def __init__(self, id: int):
+        self.id = id
+        self.parent_id = ROOT_ID
+        self.sort_key: Tuple[int, int] = (0, id)
+        self.status = 0
+        self.res_type = 0
+        self.resource_type = 0
+        # 节点自身字段序列化后的 JSON（去掉结尾的 `}`），children 在输出时拼接
+        self.prefix = b""
+        self.children: List["_Node"] = []
+
+    def update(self, row: FSysResource) -> None:
+        self.parent_id = row.parent_id
+        self.sort_key = (row.sort_order, row.id)
+        self.status = row.status
+        self.res_type = row.res_type
+        self.resource_type = row.resource_type
+        data = {
+            "id": row.id,
+            "parent_id": row.parent_id,
+            "name": row.name,
+            "alias": row.alias,
+            "path": row.f_url,
+            "component": row.comp_path,
+            "redirect": row.redirect,
+            "icon": row.c_icon or row.icon,
+            "type": row.resource_type,
+            "hidden": bool(row.is_hidden),
+            "keep_alive": bool(row.is_cache),
+            "external": bool(row.is_external),
+            "always_show": bool(row.always_show),
+            "breadcrumb": bool(row.breadcrumb_show),
+            "affix": bool(row.is_affix),
+            "sort_order": row.sort_order,
+        }
+        self.prefix = json.dumps(
+            data, ensure_ascii=False, separators=(",", ":")
+        ).encode()[:-1]
+
+    def visible(self, bits: int, res_type: int) -> bool:
+        return (
+            self.status == STATUS_NORMAL
+            and self.resource_type != RESOURCE_TYPE_ACTION
+            and self.res_type in (res_type, RES_TYPE_COMMON)
+            and bits >> self.id & 1
+        )
+
+
+def _serialize(node: _Node, bits: int, res_type: int) -> bytes:
+    children = [
+        _serialize(child, bits, res_type)
+        for child in node.children
+        if child.visible(bits, res_type)
+    ]
+    return node.prefix + b',"children":[' + b",".join(children) + b"]}"
+
+
+class MenuTree:
+    def __init__(self, maxsize: int = 4096):
+        self._nodes: Dict[int, _Node] = {ROOT_ID: _Node(ROOT_ID)}
+        self._root_versions: Dict[int, int] = {}
+        self._version = 0
+        self._fragments = TTLCache(maxsize=maxsize, ttl=24 * 3600)
+        self._blobs = TTLCache(maxsize=maxsize // 4 or 1, ttl=24 * 3600)
+        self._lock = asyncio.Lock()
+        self._origin = uuid.uuid4().hex
+        self.loaded = False
+
+    # ---- 构建 ----
+
+    def _node(self, id: int) -> _Node:
+        node = self._nodes.get(id)
+        if node is None:
+            node = self._nodes[id] = _Node(id)
+        return node
+
+    def _build(self, rows: Iterable[FSysResource]) -> None:
+        self._nodes = {ROOT_ID: _Node(ROOT_ID)}
+        # rows 已按 (sort_order, id) 排序，直接追加即保持子节点有序
+        for row in rows:
+            node = self._node(row.id)
+            node.update(row)
+            self._node(node.parent_id).children.append(node)
+        self._root_versions = {}
+        self._fragments.clear()
+        self._blobs.clear()
+        self._version += 1
+        self.loaded = True
+
+    async def _load_all(self) -> None:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(FSysResource).order_by(FSysResource.sort_order, FSysResource.id)
+            )
+            self._build(result.scalars().all())
+        logger.info("menu tree loaded: %d resources", len(self._nodes) - 1)
+
+    async def ensure_loaded(self) -> None:
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self._load_all()
+
+    # ---- 增量更新 ----
+
+    def _top_level(self, node: _Node) -> Optional[int]:
+        """节点所在顶级菜单的 id；已脱离森林（父节点不存在或成环）时返回 None"""
+        seen = set()
+        while node.parent_id != ROOT_ID:
+            if node.id in seen:
+                return None
+            seen.add(node.id)
+            parent = self._nodes.get(node.parent_id)
+            if parent is None:
+                return None
+            node = parent
+        return node.id
+
+    def _touch(self, top_level: Optional[int]) -> None:
+        if top_level is not None:
+            self._root_versions[top_level] = self._root_versions.get(top_level, 0) + 1
+
+    def _detach(self, node: _Node) -> None:
+        parent = self._nodes.get(node.parent_id)
+        if parent is not None and node in parent.children:
+            parent.children.remove(node)
+
+    def _apply(self, resource_id: int, row: Optional[FSysResource]) -> None:
+        node = self._nodes.get(resource_id)
+        if node is not None:
+            self._touch(self._top_level(node))
+            self._detach(node)
+        if row is None:
+            # 已删除：子节点保留在索引中，但不再可达
+            if node is not None:
+                self._nodes.pop(resource_id, None)
+            return
+        node = self._node(resource_id)
+        node.update(row)
+        siblings = self._node(node.parent_id).children
+        keys = [child.sort_key for child in siblings]
+        siblings.insert(bisect.bisect(keys, node.sort_key), node)
+        self._touch(self._top_level(node))
+
+    async def refresh(self, resource_ids: List[int]) -> None:
+        """重新加载指定资源行并更新对应子树"""
+        async with self._lock:
+            if not self.loaded:
+                return
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(FSysResource).where(FSysResource.id.in_(resource_ids))
+                )
+                rows = {row.id: row for row in result.scalars().all()}
+            for resource_id in resource_ids:
+                self._apply(resource_id, rows.get(resource_id))
+            self._version += 1
+
+    # ---- 输出 ----
+
+    def _fragment(self, top: _Node, bits: int, res_type: int) -> bytes:
+        key = (top.id, self._root_versions.get(top.id, 0), bits, res_type)
+        fragment = self._fragments.get(key)
+        if fragment is None:
+            fragment = _serialize(top, bits, res_type)
+            self._fragments.set(key, fragment)
+        return fragment
+
+    async def render(self, bits: int, res_type: int) -> bytes:
+        """权限集 bits 可见的菜单森林，JSON 数组字节"""
+        await self.ensure_loaded()
+        key = (self._version, bits, res_type)
+        blob = self._blobs.get(key)
+        if blob is None:
+            blob = (
+                b"["
+                + b",".join(
+                    self._fragment(top, bits, res_type)
+                    for top in self._nodes[ROOT_ID].children
+                    if top.visible(bits, res_type)
+                )
+                + b"]"
+            )
+            self._blobs.set(key, blob)
+        return blob
+
+    # ---- 同步 ----
+
+    async def invalidate(self, resource_ids: Iterable[int]) -> None:
+        """资源增删改后调用"""
+        ids = sorted(set(resource_ids))
+        await self.refresh(ids)
+        await RedisClient.get_client().publish(
+            INVALIDATE_CHANNEL, json.dumps({"ids": ids, "origin": self._origin})
+        )
+
+    async def invalidate_all(self) -> None:
+        """变更的资源 id 未知时（如批量插入），所有 worker 全量重建"""
+        await self.resync()
+        await RedisClient.get_client().publish(
+            INVALIDATE_CHANNEL, json.dumps({"ids": None, "origin": self._origin})
+        )
+
+    def on_message(self, data: str) -> None:
+        message = json.loads(data)
+        # 本进程发出的变更已在 invalidate() 中应用
+        if message.get("origin") == self._origin:
+            return
+        if message.get("ids") is None:
+            task = self.resync()
+        else:
+            task = self.refresh(message["ids"])
+        asyncio.get_running_loop().create_task(task)
+
+    async def resync(self) -> None:
+        try:
+            async with self._lock:
+                await self._load_all()
+        except Exception:
+            logger.exception("menu tree reload failed")
+            self.loaded = False
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "resources": len(self._nodes) - 1,
+            "version": self._version,
+            "fragments": self._fragments.stats(),
+            "blobs": self._blobs.stats(),
+        }
+
+
+menu_tree = MenuTree()
+subscriber.subscribe(INVALIDATE_CHANNEL, menu_tree.on_message, resync=menu_tree.resync)
@@ -0,0 +1,113 @@
+"""
+异步密码哈希服务。
+
+bcrypt 单次计算约 100~300ms，直接在协程中调用会阻塞整个事件循环。
+这里把 `verify_password` / `get_password_hash` 提交到有界的线程池或进程池执行，
+排队任务数超过上限时抛出 `PasswordHasherBusy`（由 app.main 转换为 503）。
+"""
+
+import asyncio
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+
+class PasswordHasherBusy(Exception):
+    """哈希队列已满，请求应被拒绝而不是继续排队"""
+
+
+def _timed(fn: Callable, *args: Any) -> tuple[Any, float]:
+    # 在 worker 中执行，单独统计纯哈希耗时（不含排队时间）
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+class PasswordHasher:
+    def __init__(self, executor_type: str, max_workers: int, max_pending: int):
+        self.executor_type = executor_type
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+
+        # metrics
+        self._pending = 0
+        self.max_pending_seen = 0
+        self.completed = 0
+        self.rejected = 0
+        self.hash_seconds_total = 0.0
+        self.hash_seconds_max = 0.0
+        self.wait_seconds_total = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="pwd-hash"
+                )
+        return self._executor
+
+    async def _run(self, fn: Callable, *args: Any) -> Any:
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        self._pending += 1
+        self.max_pending_seen = max(self.max_pending_seen, self._pending)
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, hash_seconds = await loop.run_in_executor(
+                self._get_executor(), _timed, fn, *args
+            )
+        finally:
+            self._pending -= 1
+
+        elapsed = time.perf_counter() - start
+        self.completed += 1
+        self.hash_seconds_total += hash_seconds
+        self.hash_seconds_max = max(self.hash_seconds_max, hash_seconds)
+        self.wait_seconds_total += max(elapsed - hash_seconds, 0.0)
+        return result
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._pending
+
+    def stats(self) -> dict:
+        completed = self.completed or 1
+        return {
+            "executor": self.executor_type,
+            "workers": self.max_workers,
+            "queue_depth": self._pending,
+            "queue_limit": self.max_pending,
+            "queue_depth_max": self.max_pending_seen,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "hash_seconds_avg": self.hash_seconds_total / completed,
+            "hash_seconds_max": self.hash_seconds_max,
+            "wait_seconds_avg": self.wait_seconds_total / completed,
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    executor_type=settings.PASSWORD_HASH_EXECUTOR,
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
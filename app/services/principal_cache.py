@@ -0,0 +1,107 @@
+"""
+认证用户（principal）缓存。
+
+两级缓存：进程内 LRU（短 TTL）在前，Redis 中序列化的用户行在后。
+`get_current_user` 对热用户不再访问 MySQL；用户通过 `CRUDUser` 修改时失效。
+"""
+
+import json
+import logging
+from typing import Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import inspect
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.models.f_users import FUsers
+
+logger = logging.getLogger(__name__)
+
+# 密码哈希不进入缓存，只在登录校验时从数据库读取
+_EXCLUDED_COLUMNS = {"hashed_password"}
+_COLUMNS = [
+    attr.key
+    for attr in inspect(FUsers).column_attrs
+    if attr.key not in _EXCLUDED_COLUMNS
+]
+
+
+def _id_key(user_id: int) -> str:
+    return f"principal:id:{user_id}"
+
+
+def _name_key(username: str) -> str:
+    return f"principal:name:{username}"
+
+
+class PrincipalCache:
+    def __init__(self, local_maxsize: int, local_ttl: float, redis_ttl: int):
+        self.redis_ttl = redis_ttl
+        self._local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+
+    @staticmethod
+    def _dump(user: FUsers) -> dict:
+        return {key: getattr(user, key) for key in _COLUMNS}
+
+    @staticmethod
+    def _load(data: dict) -> FUsers:
+        # 构造一个 detached 对象：可直接用于 response_model，
+        # 如需修改可 `db.add()` 重新关联到会话（未缓存的列会按需加载）
+        user = FUsers(**data)
+        make_transient_to_detached(user)
+        return user
+
+    async def get_by_username(self, username: str) -> Optional[FUsers]:
+        return await self._get(_name_key(username))
+
+    async def get(self, user_id: int) -> Optional[FUsers]:
+        return await self._get(_id_key(user_id))
+
+    async def _get(self, key: str) -> Optional[FUsers]:
+        data = self._local.get(key)
+        if data is None:
+            try:
+                raw = await RedisClient.get_client().get(key)
+            except RedisError as e:
+                logger.warning("principal cache read failed: %s", e)
+                return None
+            if raw is None:
+                return None
+            data = json.loads(raw)
+            self._local.set(key, data)
+        return self._load(data)
+
+    async def set(self, user: FUsers) -> None:
+        data = self._dump(user)
+        raw = json.dumps(data, separators=(",", ":"))
+        keys = (_id_key(user.id), _name_key(user.username))
+        for key in keys:
+            self._local.set(key, data)
+        try:
+            async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(key, raw, ex=self.redis_ttl)
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning("principal cache write failed: %s", e)
+
+    async def invalidate(self, user_id: int, username: Optional[str] = None) -> None:
+        keys = [_id_key(user_id)]
+        if username:
+            keys.append(_name_key(username))
+        for key in keys:
+            self._local.pop(key)
+        try:
+            await RedisClient.get_client().delete(*keys)
+        except RedisError as e:
+            logger.warning("principal cache invalidation failed: %s", e)
+
+
+principal_cache = PrincipalCache(
+    local_maxsize=settings.PRINCIPAL_CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.PRINCIPAL_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PRINCIPAL_CACHE_REDIS_TTL,
+)
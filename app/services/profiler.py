@@ -0,0 +1,321 @@
+"""
+按请求的统计采样分析器。
+
+被选中的请求（采样率或带口令的请求头）在处理期间由一个后台线程每隔 PROFILING_INTERVAL_MS
+采一次栈。栈不是事件循环线程的当前栈，而是沿请求 task 的协程链（`cr_await`）展开得到的
+逻辑调用栈：请求挂起等待 MySQL / Redis 时，时间同样记在发起等待的调用路径上，
+叶子节点为 `<await 类型名>`；请求正在执行时再接上线程栈中位于最内层协程之下的同步调用。
+
+结果以 collapsed stack（flamegraph.pl / speedscope 均可打开）或 speedscope JSON 写入
+PROFILING_DIR，文件名中包含时间、耗时、method 与路由，供管理接口列出。
+"""
+
+import asyncio
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass
+from types import CodeType, FrameType
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+Frame = Union[CodeType, str]  # 代码对象，或 `<await ...>` 叶子
+Stack = Tuple[Frame, ...]
+
+_MAX_DEPTH = 256
+_EXTENSIONS = {"collapsed": ".collapsed.txt", "speedscope": ".speedscope.json"}
+# 20261018190302123-45ms-GET-api_v1_users_me-1a2b3c4d.collapsed.txt
+_NAME_RE = re.compile(
+    r"^(?P<ts>\d{17})-(?P<duration>\d+)ms-(?P<method>[A-Z]+)-(?P<route>\w*)-"
+    r"(?P<id>[0-9a-f]{8})(?P<ext>\.collapsed\.txt|\.speedscope\.json)$"
+)
+
+
+def _coroutine_frame(obj) -> Optional[FrameType]:
+    return (
+        getattr(obj, "cr_frame", None)
+        or getattr(obj, "gi_frame", None)
+        or getattr(obj, "ag_frame", None)
+    )
+
+
+def _awaiting(obj):
+    return (
+        getattr(obj, "cr_await", None)
+        or getattr(obj, "gi_yieldfrom", None)
+        or getattr(obj, "ag_await", None)
+    )
+
+
+def _frame_label(code: Frame) -> str:
+    if isinstance(code, str):
+        return code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Capture:
+    """一次请求的采样结果"""
+
+    def __init__(self, task: asyncio.Task, root: FrameType, thread_id: int):
+        self.id = uuid.uuid4().hex[:8]
+        self.task = task
+        self.root = root  # 分析中间件自身的帧，之上的 uvicorn 帧不记录
+        self.thread_id = thread_id
+        self.started = time.perf_counter()
+        self.last = self.started
+        self.samples: List[Tuple[Stack, float]] = []
+
+    def sample(self, thread_frame: Optional[FrameType], now: float) -> None:
+        weight = now - self.last
+        self.last = now
+        stack = self._stack(thread_frame)
+        if stack:
+            self.samples.append((stack, weight))
+
+    def _stack(self, thread_frame: Optional[FrameType]) -> Stack:
+        frames: List[FrameType] = []
+        leaf: Optional[str] = None
+        obj = self.task.get_coro()
+        for _ in range(_MAX_DEPTH):
+            if isinstance(obj, asyncio.Task):
+                obj = obj.get_coro()
+            frame = _coroutine_frame(obj)
+            if frame is None:
+                if obj is not None:
+                    leaf = f"<await {type(obj).__name__}>"
+                break
+            frames.append(frame)
+            obj = _awaiting(obj)
+            if obj is None:
+                break
+
+        if leaf is None and frames and thread_frame is not None:
+            # 协程正在执行：接上线程栈中最内层协程帧之下的同步调用
+            innermost = frames[-1]
+            sync: List[FrameType] = []
+            frame = thread_frame
+            while frame is not None and frame is not innermost:
+                sync.append(frame)
+                frame = frame.f_back
+            if frame is innermost:
+                frames.extend(reversed(sync))
+
+        for index, frame in enumerate(frames):
+            if frame is self.root:
+                frames = frames[index + 1 :]
+                break
+        stack: Stack = tuple(frame.f_code for frame in frames)
+        return stack + (leaf,) if leaf else stack
+
+
+class Sampler:
+    """后台采样线程，只在有请求正被分析时工作"""
+
+    def __init__(self, interval: float, max_seconds: float):
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self._active: Dict[str, Capture] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, capture: Capture) -> None:
+        with self._lock:
+            self._active[capture.id] = capture
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="request-profiler", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def stop(self, capture: Capture) -> None:
+        with self._lock:
+            self._active.pop(capture.id, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._lock:
+                idle = not self._active
+                if idle:
+                    self._wakeup.clear()
+            if idle:
+                self._wakeup.wait()
+                continue
+            time.sleep(self.interval)
+            now = time.perf_counter()
+            thread_frames = sys._current_frames()
+            with self._lock:
+                captures = list(self._active.values())
+            for capture in captures:
+                if now - capture.started > self.max_seconds:
+                    continue
+                try:
+                    capture.sample(thread_frames.get(capture.thread_id), now)
+                except Exception:  # 采样失败不影响请求
+                    logger.debug("profile sample failed", exc_info=True)
+
+
+def _collapsed(samples: List[Tuple[Stack, float]]) -> str:
+    counts: Counter = Counter(stack for stack, _ in samples)
+    return "".join(
+        ";".join(_frame_label(code) for code in stack) + f" {count}\n"
+        for stack, count in counts.items()
+    )
+
+
+def _speedscope(
+    samples: List[Tuple[Stack, float]], name: str, duration_ms: float
+) -> str:
+    frames: List[dict] = []
+    index: Dict[Frame, int] = {}
+    stacks = []
+    for stack, _ in samples:
+        ids = []
+        for code in stack:
+            if code not in index:
+                index[code] = len(frames)
+                if isinstance(code, str):
+                    frames.append({"name": code})
+                else:
+                    frames.append(
+                        {
+                            "name": getattr(code, "co_qualname", code.co_name),
+                            "file": code.co_filename,
+                            "line": code.co_firstlineno,
+                        }
+                    )
+            ids.append(index[code])
+        stacks.append(ids)
+    weights = [round(weight * 1000, 3) for _, weight in samples]
+    return json.dumps(
+        {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": settings.PROJECT_NAME,
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": round(duration_ms, 3),
+                    "samples": stacks,
+                    "weights": weights,
+                }
+            ],
+        },
+        separators=(",", ":"),
+    )
+
+
+@dataclass
+class CaptureInfo:
+    name: str
+    created_at: str
+    duration_ms: int
+    method: str
+    route: str
+    format: str
+    size: int
+
+
+class ProfileStore:
+    """PROFILING_DIR 下的采样文件，各 worker 共用，超过 max_files 时删除最旧的"""
+
+    def __init__(self, directory: str, max_files: int):
+        self.directory = os.path.abspath(directory)
+        self.max_files = max_files
+
+    def save(
+        self,
+        capture: Capture,
+        method: str,
+        route: str,
+        duration_ms: float,
+        fmt: str,
+    ) -> str:
+        slug = re.sub(r"\W+", "_", route).strip("_")[:80]
+        now = time.time()
+        ts = time.strftime("%Y%m%d%H%M%S", time.localtime(now))
+        ts += f"{int(now * 1000) % 1000:03d}"
+        name = (
+            f"{ts}-{int(duration_ms)}ms-{method}-{slug}-{capture.id}{_EXTENSIONS[fmt]}"
+        )
+        if fmt == "speedscope":
+            content = _speedscope(capture.samples, f"{method} {route}", duration_ms)
+        else:
+            content = _collapsed(capture.samples)
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, name)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(path + ".tmp", path)
+        self._prune()
+        return name
+
+    def _prune(self) -> None:
+        names = sorted(n for n in os.listdir(self.directory) if _NAME_RE.match(n))
+        for name in names[: max(len(names) - self.max_files, 0)]:
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+    def list(
+        self, limit: int = 100, capture_id: Optional[str] = None
+    ) -> List[CaptureInfo]:
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return []
+        captures = []
+        for entry in sorted(entries, key=lambda e: e.name, reverse=True):
+            match = _NAME_RE.match(entry.name)
+            if not match or (capture_id and match["id"] != capture_id):
+                continue
+            ts = match["ts"]
+            captures.append(
+                CaptureInfo(
+                    name=entry.name,
+                    created_at=(
+                        f"{ts[0:4]}-{ts[4:6]}-{ts[6:8]}T"
+                        f"{ts[8:10]}:{ts[10:12]}:{ts[12:14]}.{ts[14:]}"
+                    ),
+                    duration_ms=int(match["duration"]),
+                    method=match["method"],
+                    route=match["route"],
+                    format=(
+                        "speedscope" if match["ext"].endswith(".json") else "collapsed"
+                    ),
+                    size=entry.stat().st_size,
+                )
+            )
+            if len(captures) >= limit:
+                break
+        return captures
+
+    def path(self, name: str) -> Optional[str]:
+        """文件名合法且存在时返回完整路径"""
+        if not _NAME_RE.match(name):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+sampler = Sampler(
+    interval=settings.PROFILING_INTERVAL_MS / 1000,
+    max_seconds=settings.PROFILING_MAX_SECONDS,
+)
+profile_store = ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_FILES)
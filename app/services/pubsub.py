@@ -0,0 +1,88 @@
+"""
+进程内共享的 Redis pub/sub 订阅器。
+
+每个 worker 只占用一条订阅连接，按频道把消息分发给注册的回调。
+断线重连后会先调用各频道的 resync 回调（重新全量同步），
+期间 `synced` 为 False，依赖方应退回到直接查询 Redis/数据库。
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from app.db.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[str], None]
+ResyncHandler = Callable[[], Awaitable[None]]
+
+
+class RedisSubscriber:
+    def __init__(self):
+        self._handlers: Dict[str, List[MessageHandler]] = {}
+        self._resync: List[ResyncHandler] = []
+        self._task: Optional[asyncio.Task] = None
+        self.synced = False
+
+    def subscribe(
+        self,
+        channel: str,
+        handler: MessageHandler,
+        resync: Optional[ResyncHandler] = None,
+    ) -> None:
+        """需在 start() 之前注册"""
+        self._handlers.setdefault(channel, []).append(handler)
+        if resync is not None:
+            self._resync.append(resync)
+
+    def _dispatch(self, channel: str, data: str) -> None:
+        for handler in self._handlers.get(channel, ()):
+            try:
+                handler(data)
+            except Exception:
+                logger.exception("pubsub handler failed for channel %s", channel)
+
+    async def _listen(self) -> None:
+        pubsub = RedisClient.get_client().pubsub()
+        try:
+            await pubsub.subscribe(*self._handlers)
+            # 先订阅再全量同步，避免丢失同步期间发布的消息
+            for resync in self._resync:
+                await resync()
+            self.synced = True
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=5.0
+                )
+                if message is not None and message["type"] == "message":
+                    self._dispatch(message["channel"], message["data"])
+        finally:
+            self.synced = False
+            await pubsub.aclose()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("redis pubsub disconnected: %s", e)
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._handlers and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+subscriber = RedisSubscriber()
@@ -0,0 +1,266 @@
+"""
+基于 Redis 的限流（GCRA）。
+
+每条规则（如「同一 IP 每 60 秒 20 次登录」）对应 Redis 键 `ratelimit:{rule}:{id}`，值为
+GCRA 的理论到达时间（TAT，毫秒）。一个请求命中的所有规则在同一个 Lua 脚本中判定：
+任一规则超限时全部不计数，否则全部扣减 —— 一次往返、原子执行，各 worker 共享同一份配额，
+时间取 Redis 服务端的 TIME，不受 worker 时钟偏差影响。
+
+本地租约预过滤：配额较大的规则（limit * RATE_LIMIT_LEASE_FRACTION >= 2）一次向 Redis
+预支 n 个令牌，之后 n 次请求在本进程内直接放行，不访问 Redis。预支的令牌已计入全局配额，
+不会放大限额；请求量大、明显未超限的流量因此几乎不增加 Redis 往返。
+"""
+
+import hashlib
+import inspect
+import logging
+import math
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.redis import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# KEYS: 每条规则的键
+# ARGV: 每条规则依次 emission_ms, tolerance_ms, cost（租约大小，不足时退回 1）
+# 返回: {allowed, 被拒绝或余量最小的规则下标(1 起), remaining, retry_after_ms, reset_ms,
+#        各规则实际扣减的令牌数与余量 cost1, remaining1, cost2, ...}
+_GCRA_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local n = #KEYS
+local tats, costs, remainings = {}, {}, {}
+local worst, worst_remaining, worst_reset = 0, -1, 0
+for i = 1, n do
+    local emission = tonumber(ARGV[i * 3 - 2])
+    local tolerance = tonumber(ARGV[i * 3 - 1])
+    local tat = math.max(tonumber(redis.call('GET', KEYS[i])) or now, now)
+    local cost = tonumber(ARGV[i * 3])
+    if cost > 1 and tat + emission * cost - tolerance > now then
+        cost = 1
+    end
+    -- 取整：Lua 数字转为命令参数时只保留 14 位有效数字
+    local new_tat = math.ceil(tat + emission * cost)
+    local diff = now - (new_tat - tolerance)
+    if diff < 0 then
+        return {0, i, 0, -diff, tat - now}
+    end
+    local remaining = math.floor(diff / emission)
+    if worst_remaining < 0 or remaining < worst_remaining then
+        worst, worst_remaining, worst_reset = i, remaining, new_tat - now
+    end
+    tats[i], costs[i], remainings[i] = new_tat, cost, remaining
+end
+for i = 1, n do
+    redis.call('SET', KEYS[i], tats[i], 'PX', math.max(tats[i] - now, 1))
+end
+local result = {1, worst, worst_remaining, 0, worst_reset}
+for i = 1, n do
+    table.insert(result, costs[i])
+    table.insert(result, remainings[i])
+end
+return result
+"""
+
+
+def client_ip(request: Request) -> Optional[str]:
+    # 反向代理之后需让 uvicorn/gunicorn 信任代理（FORWARDED_ALLOW_IPS），client 才是真实 IP
+    return request.client.host if request.client else None
+
+
+async def form_username(request: Request) -> Optional[str]:
+    # Starlette 缓存解析结果，之后 OAuth2PasswordRequestForm 不会再读一次请求体
+    username = (await request.form()).get("username")
+    if not isinstance(username, str) or not username:
+        return None
+    return hashlib.sha1(username.strip().lower().encode()).hexdigest()[:20]
+
+
+def route_key(request: Request) -> Optional[str]:
+    return "all"
+
+
+@dataclass(frozen=True)
+class Rule:
+    """每 period 秒最多 limit 次（允许一次性突发 limit 次）"""
+
+    name: str
+    limit: int
+    period: int
+    key: Callable[[Request], object]  # 返回该请求在此规则下的标识；None 表示不适用
+
+    @property
+    def emission_ms(self) -> float:
+        return self.period * 1000 / self.limit
+
+    @property
+    def lease_size(self) -> int:
+        return int(self.limit * settings.RATE_LIMIT_LEASE_FRACTION)
+
+    @property
+    def policy(self) -> str:
+        return f"{self.limit};w={self.period}"
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    rule: Rule
+    remaining: int
+    retry_after: float  # 秒
+    reset: float  # 秒，配额完全恢复所需时间
+
+    def headers(self) -> dict:
+        headers = {
+            "RateLimit-Limit": str(self.rule.limit),
+            "RateLimit-Remaining": str(max(self.remaining, 0)),
+            "RateLimit-Reset": str(math.ceil(self.reset)),
+            "RateLimit-Policy": self.rule.policy,
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(math.ceil(self.retry_after), 1))
+        return headers
+
+
+class _Lease:
+    __slots__ = ("tokens", "remaining")
+
+    def __init__(self, tokens: int, remaining: int):
+        self.tokens = tokens  # 本进程尚未用完的预支令牌
+        self.remaining = remaining  # 预支时 Redis 返回的全局余量
+
+
+class RateLimiter:
+    """
+    FastAPI 依赖：`dependencies=[Depends(RateLimiter([...]))]`。
+    超限时返回 429 与 Retry-After；放行时结果保存在 request.state.rate_limit，
+    由 RateLimitHeadersMiddleware 写入 RateLimit-* 响应头。
+    """
+
+    def __init__(self, rules: Sequence[Rule]):
+        self.rules = list(rules)
+        self._leases = TTLCache(
+            maxsize=settings.RATE_LIMIT_LEASE_MAXSIZE,
+            ttl=min(rule.period for rule in self.rules),
+        )
+        self._script = None
+        self._client = None
+
+    def _gcra(self):
+        client = RedisClient.get_client()
+        if client is not self._client:
+            self._client = client
+            self._script = client.register_script(_GCRA_SCRIPT)
+        return self._script
+
+    async def __call__(self, request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        result = await self.hit(request)
+        if result is None:
+            return
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests",
+                headers=result.headers(),
+            )
+        request.state.rate_limit = result
+
+    async def hit(self, request: Request) -> Optional[RateLimitResult]:
+        local: List[tuple] = []  # (rule, lease) 本地租约放行
+        remote: List[tuple] = []  # (rule, redis key, lease cache key)
+        for rule in self.rules:
+            ident = rule.key(request)
+            if inspect.isawaitable(ident):
+                ident = await ident
+            if ident is None:
+                continue
+            cache_key = (rule.name, ident)
+            lease = self._leases.get(cache_key)
+            if lease is not None and lease.tokens > 0:
+                lease.tokens -= 1
+                local.append((rule, lease))
+            else:
+                remote.append((rule, f"ratelimit:{rule.name}:{ident}", cache_key))
+
+        if not remote:
+            if not local:
+                # 没有适用的规则（如 unix socket 上无客户端地址），不限流
+                return None
+            rule, lease = min(local, key=lambda item: item[1].remaining)
+            return RateLimitResult(True, rule, lease.remaining + lease.tokens, 0, 0)
+
+        args: list = []
+        for rule, _, _ in remote:
+            lease_size = rule.lease_size
+            args += [
+                rule.emission_ms,
+                rule.period * 1000,
+                lease_size if lease_size >= 2 else 1,
+            ]
+        try:
+            reply = await self._gcra()(keys=[key for _, key, _ in remote], args=args)
+        except RedisError as e:
+            # Redis 不可用时放行，避免限流组件拖垮登录
+            logger.warning("rate limiter unavailable, allowing request: %s", e)
+            return None
+
+        allowed, index, remaining, retry_after_ms, reset_ms = (
+            int(v) for v in reply[:5]
+        )
+        rule = remote[index - 1][0]
+        if not allowed:
+            for _, lease in local:
+                lease.tokens += 1
+            return RateLimitResult(
+                False, rule, 0, retry_after_ms / 1000, reset_ms / 1000
+            )
+
+        for i, (_, _, cache_key) in enumerate(remote):
+            cost, rule_remaining = int(reply[5 + i * 2]), int(reply[6 + i * 2])
+            if cost > 1:
+                # 本次请求用掉一个，其余留给之后的请求
+                self._leases.set(cache_key, _Lease(cost - 1, rule_remaining))
+        return RateLimitResult(True, rule, remaining, 0, reset_ms / 1000)
+
+
+login_rate_limit = RateLimiter(
+    [
+        Rule(
+            "login:ip",
+            settings.RATE_LIMIT_LOGIN_PER_IP,
+            settings.RATE_LIMIT_LOGIN_WINDOW,
+            client_ip,
+        ),
+        Rule(
+            "login:user",
+            settings.RATE_LIMIT_LOGIN_PER_USER,
+            settings.RATE_LIMIT_LOGIN_WINDOW,
+            form_username,
+        ),
+        Rule(
+            "login:route",
+            settings.RATE_LIMIT_LOGIN_PER_ROUTE,
+            settings.RATE_LIMIT_LOGIN_WINDOW,
+            route_key,
+        ),
+    ]
+)
+
+signup_rate_limit = RateLimiter(
+    [
+        Rule(
+            "signup:ip",
+            settings.RATE_LIMIT_SIGNUP_PER_IP,
+            settings.RATE_LIMIT_SIGNUP_WINDOW,
+            client_ip,
+        ),
+    ]
+)
@@ -0,0 +1,355 @@
+"""
+基于 f_sys_casbin_rule 的 RBAC 鉴权（casbin RBAC 模型的子集）。
+
+规则：
+- p, sub, obj, act[, eft]  sub 为角色或用户，obj 为接口路径，act 为请求方法
+  obj 支持 `:id` / `{id}` 单段参数与结尾 `*` 通配；act 支持 `*`；eft 为 deny 时优先拒绝
+- g, user, role            用户/角色继承，可多级
+
+规则只在启动（及 pub/sub 重连）时从数据库全量加载一次，编译为内存索引：
+精确路径走哈希表，含参数/通配的路径编译进按段拆分的前缀树，主体的角色闭包按需计算并缓存。
+规则变更通过 `rbac:policy` 频道广播增量，各 worker 原地更新索引，无需重新加载。
+全量加载期间收到的增量先照常应用，并在新索引替换上来之后重放一次：
+查询结果可能早于增量的提交，否则被撤销的权限会在重新加载后恢复。
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, delete, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.redis import RedisClient
+from app.db.session import AsyncSessionLocal
+from app.models.f_sys_casbin_rule import FSysCasbinRule
+from app.services.pubsub import subscriber
+
+logger = logging.getLogger(__name__)
+
+POLICY_CHANNEL = "rbac:policy"
+
+# (ptype, v0, v1, v2, v3)
+Rule = Tuple[str, ...]
+# method -> {sub: 是否允许}
+_Decisions = Dict[str, Dict[str, bool]]
+
+
+def _normalize(rule: Iterable[Optional[str]]) -> Rule:
+    values = [v or "" for v in rule]
+    values += [""] * (5 - len(values))
+    return tuple(values[:5])
+
+
+_RULE_COLUMNS = ("ptype", "v0", "v1", "v2")
+
+
+def _effect(eft: str) -> str:
+    return "deny" if eft == "deny" else "allow"
+
+
+def _column_eq(column, value: str):
+    # 规则表的 v* 列可空，空值与空串视为相同
+    if value:
+        return column == value
+    return or_(column == "", column.is_(None))
+
+
+def _rule_condition(rule: Rule):
+    conditions = [
+        _column_eq(getattr(FSysCasbinRule, name), value)
+        for name, value in zip(_RULE_COLUMNS, rule[:4])
+    ]
+    if rule[0] == "p":
+        # allow 规则的 eft 可以是空或 "allow"
+        if _effect(rule[4]) == "deny":
+            conditions.append(FSysCasbinRule.v3 == "deny")
+        else:
+            conditions.append(
+                or_(FSysCasbinRule.v3.is_(None), FSysCasbinRule.v3 != "deny")
+            )
+    return and_(*conditions)
+
+
+def _is_pattern(obj: str) -> bool:
+    return ":" in obj or "{" in obj or "*" in obj
+
+
+def _is_param(segment: str) -> bool:
+    return segment.startswith(":") or (
+        segment.startswith("{") and segment.endswith("}")
+    )
+
+
+class _Node:
+    __slots__ = ("static", "param", "wildcard", "decisions")
+
+    def __init__(self):
+        self.static: Dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        # 结尾 `*`：匹配剩余任意路径
+        self.wildcard: Optional[_Decisions] = None
+        self.decisions: Optional[_Decisions] = None
+
+
+class RBACEnforcer:
+    def __init__(self):
+        # (sub, obj, act, eft)
+        self._policies: Set[Tuple[str, str, str, str]] = set()
+        self._exact: Dict[str, _Decisions] = {}
+        self._trie = _Node()
+        self._parents: Dict[str, Set[str]] = {}
+        self._closures: Dict[str, FrozenSet[str]] = {}
+        self._lock = asyncio.Lock()
+        # 全量加载期间收到的增量 [(added, removed)]，不在加载时为 None
+        self._pending: Optional[List[Tuple[List[Rule], List[Rule]]]] = None
+        self.loaded = False
+
+    # ---- 索引维护 ----
+
+    def _decisions_for(self, obj: str, create: bool) -> Optional[_Decisions]:
+        if not _is_pattern(obj):
+            if create:
+                return self._exact.setdefault(obj, {})
+            return self._exact.get(obj)
+
+        node = self._trie
+        segments = obj.split("/")[1:]
+        for i, segment in enumerate(segments):
+            if segment == "*" and i == len(segments) - 1:
+                if node.wildcard is None and create:
+                    node.wildcard = {}
+                return node.wildcard
+            if _is_param(segment):
+                if node.param is None:
+                    if not create:
+                        return None
+                    node.param = _Node()
+                node = node.param
+            else:
+                child = node.static.get(segment)
+                if child is None:
+                    if not create:
+                        return None
+                    child = node.static[segment] = _Node()
+                node = child
+        if node.decisions is None and create:
+            node.decisions = {}
+        return node.decisions
+
+    def _apply(self, rule: Rule, add: bool) -> None:
+        ptype, v0, v1, v2, v3 = rule
+        if ptype == "p":
+            key = (v0, v1, v2, _effect(v3))
+            if add:
+                self._policies.add(key)
+            elif key in self._policies:
+                self._policies.discard(key)
+            else:
+                return
+            # 同一 (sub, obj, act) 可同时有 allow 与 deny 规则，deny 优先
+            if (v0, v1, v2, "deny") in self._policies:
+                allow = False
+            elif (v0, v1, v2, "allow") in self._policies:
+                allow = True
+            else:
+                allow = None
+            decisions = self._decisions_for(v1, create=allow is not None)
+            if allow is not None:
+                decisions.setdefault(v2, {})[v0] = allow
+            elif decisions is not None and v2 in decisions:
+                decisions[v2].pop(v0, None)
+        elif ptype == "g":
+            if add:
+                self._parents.setdefault(v0, set()).add(v1)
+            else:
+                self._parents.get(v0, set()).discard(v1)
+            self._closures.clear()
+
+    def _reset(self, rules: Iterable[Rule]) -> None:
+        self._policies = set()
+        self._exact = {}
+        self._trie = _Node()
+        self._parents = {}
+        self._closures = {}
+        for rule in rules:
+            self._apply(rule, add=True)
+        self.loaded = True
+
+    def apply_changes(
+        self, added: Iterable[Rule] = (), removed: Iterable[Rule] = ()
+    ) -> None:
+        added, removed = list(added), list(removed)
+        if self._pending is not None:
+            self._pending.append((added, removed))
+        for rule in removed:
+            self._apply(_normalize(rule), add=False)
+        for rule in added:
+            self._apply(_normalize(rule), add=True)
+
+    # ---- 鉴权 ----
+
+    def roles_for(self, subject: str) -> FrozenSet[str]:
+        """主体自身及其（传递）继承的全部角色"""
+        closure = self._closures.get(subject)
+        if closure is None:
+            seen = {subject}
+            stack = [subject]
+            while stack:
+                for parent in self._parents.get(stack.pop(), ()):
+                    if parent not in seen:
+                        seen.add(parent)
+                        stack.append(parent)
+            closure = self._closures[subject] = frozenset(seen)
+        return closure
+
+    def _match(self, path: str) -> Iterator[_Decisions]:
+        exact = self._exact.get(path)
+        if exact is not None:
+            yield exact
+        segments = path.split("/")[1:]
+        stack = [(self._trie, 0)]
+        while stack:
+            node, i = stack.pop()
+            if node.wildcard is not None:
+                yield node.wildcard
+            if i == len(segments):
+                if node.decisions is not None:
+                    yield node.decisions
+                continue
+            child = node.static.get(segments[i])
+            if child is not None:
+                stack.append((child, i + 1))
+            if node.param is not None and segments[i]:
+                stack.append((node.param, i + 1))
+
+    def enforce(self, subject: str, path: str, method: str) -> bool:
+        roles = self.roles_for(subject)
+        allowed = False
+        for decisions in self._match(path):
+            for act in (method, "*"):
+                by_sub = decisions.get(act)
+                if not by_sub:
+                    continue
+                for role in roles:
+                    allow = by_sub.get(role)
+                    if allow is False:
+                        return False
+                    if allow:
+                        allowed = True
+        return allowed
+
+    # ---- 加载与同步 ----
+
+    async def load(self, db: AsyncSession) -> None:
+        self._pending = pending = []
+        try:
+            result = await db.execute(
+                select(
+                    FSysCasbinRule.ptype,
+                    FSysCasbinRule.v0,
+                    FSysCasbinRule.v1,
+                    FSysCasbinRule.v2,
+                    FSysCasbinRule.v3,
+                ).where(FSysCasbinRule.ptype.in_(("p", "g")))
+            )
+            rows = result.all()
+        finally:
+            self._pending = None
+        self._reset(_normalize(row) for row in rows)
+        for added, removed in pending:
+            self.apply_changes(added, removed)
+        logger.info(
+            "rbac policy loaded: %d policies, %d subjects with roles",
+            len(self._policies),
+            len(self._parents),
+        )
+
+    async def _load_from_db(self) -> None:
+        async with AsyncSessionLocal() as db:
+            await self.load(db)
+
+    async def reload(self) -> None:
+        async with self._lock:
+            await self._load_from_db()
+
+    async def ensure_loaded(self) -> None:
+        if self.loaded:
+            return
+        async with self._lock:
+            if not self.loaded:
+                await self._load_from_db()
+
+    async def resync(self) -> None:
+        try:
+            await self.reload()
+        except Exception:
+            # 数据库不可用时不影响其它频道的同步，首次鉴权时会再次尝试加载
+            logger.exception("rbac policy reload failed")
+            self.loaded = False
+
+    def on_message(self, data: str) -> None:
+        message = json.loads(data)
+        if message.get("op") == "reload":
+            asyncio.get_running_loop().create_task(self.resync())
+            return
+        self.apply_changes(
+            added=message.get("added", ()), removed=message.get("removed", ())
+        )
+
+    # ---- 规则变更 ----
+
+    async def publish(
+        self, added: Iterable[Rule] = (), removed: Iterable[Rule] = ()
+    ) -> None:
+        message = {
+            "added": [list(_normalize(r)) for r in added],
+            "removed": [list(_normalize(r)) for r in removed],
+        }
+        # 本进程立即生效，其它 worker 通过频道同步（重复应用是幂等的）
+        self.apply_changes(message["added"], message["removed"])
+        await RedisClient.get_client().publish(POLICY_CHANNEL, json.dumps(message))
+
+    async def add_rules(self, db: AsyncSession, rules: List[Rule]) -> None:
+        rules = [_normalize(r) for r in rules]
+        if not rules:
+            return
+        db.add_all(
+            FSysCasbinRule(ptype=p, v0=v0, v1=v1, v2=v2, v3=v3, v4="", v5="")
+            for p, v0, v1, v2, v3 in rules
+        )
+        await db.commit()
+        await self.publish(added=rules)
+
+    async def remove_rules(self, db: AsyncSession, rules: List[Rule]) -> None:
+        rules = [_normalize(r) for r in rules]
+        # 空的 or_() 会生成不带 WHERE 的 DELETE，删除全部规则
+        if not rules:
+            return
+        await db.execute(
+            delete(FSysCasbinRule).where(or_(*(_rule_condition(r) for r in rules)))
+        )
+        await db.commit()
+        await self.publish(removed=rules)
+
+    async def request_reload(self) -> None:
+        """直接修改了数据库中的规则后，通知所有 worker 全量重新加载"""
+        await RedisClient.get_client().publish(
+            POLICY_CHANNEL, json.dumps({"op": "reload"})
+        )
+
+    def stats(self) -> dict:
+        return {
+            "loaded": self.loaded,
+            "policies": len(self._policies),
+            "exact_paths": len(self._exact),
+            "subjects": len(self._parents),
+            "cached_closures": len(self._closures),
+        }
+
+
+rbac_enforcer = RBACEnforcer()
+subscriber.subscribe(
+    POLICY_CHANNEL, rbac_enforcer.on_message, resync=rbac_enforcer.resync
+)
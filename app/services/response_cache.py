@@ -0,0 +1,238 @@
+"""
+响应缓存存储（路由装饰器见 app/api/caching.py）。
+
+两级：进程内 LRU 在前，Redis 在后，条目为序列化好的响应体及其弱 ETag。
+
+失效基于标签代数：每个标签在 Redis 中有一个计数器 `respcache:gen:{tag}`，条目记录写入时
+各标签的代数；读取 Redis 时条目与当前代数在同一次往返中取回，不一致即视为失效。
+CRUD 写入后递增相关标签的代数，不需要找出受影响的键；端点执行期间发生的失效，
+同样会让随后写入的条目作废（其记录的是执行前的代数）。
+失效后 DB_READ_YOUR_WRITES_SECONDS 内标签带有 `respcache:recent:{tag}` 标记，
+此时重新生成的条目须从主库读取：从库可能尚未同步，旧数据会被记在新的代数下。
+
+进程内条目不访问 Redis 即返回，依赖 `respcache:invalidate` 频道推送的代数变化；
+订阅未就绪（断线重连中）时跳过本地缓存。
+"""
+
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.redis import RedisClient, acquire_lock, release_lock
+from app.services.pubsub import subscriber
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "respcache:invalidate"
+
+# 远大于条目的最长存活时间：计数器过期归零时，记录旧代数的条目早已过期
+_GENERATION_TTL = 7 * 86400
+
+
+def _entry_key(key: str) -> str:
+    return f"respcache:entry:{key}"
+
+
+def _generation_key(tag: str) -> str:
+    return f"respcache:gen:{tag}"
+
+
+def _recent_key(tag: str) -> str:
+    return f"respcache:recent:{tag}"
+
+
+def _lock_key(key: str) -> str:
+    return f"respcache:lock:{key}"
+
+
+@dataclass
+class CacheEntry:
+    body: bytes
+    media_type: str
+    etag: str
+    created_at: float  # time.time()
+    max_age: int
+    stale: int
+    generations: Dict[str, int]
+
+    @property
+    def age(self) -> float:
+        return max(time.time() - self.created_at, 0.0)
+
+    @property
+    def fresh(self) -> bool:
+        return self.age < self.max_age
+
+    @property
+    def ttl(self) -> float:
+        """剩余可用时间（含 stale 窗口）"""
+        return self.max_age + self.stale - self.age
+
+    def dumps(self) -> str:
+        # 客户端 decode_responses=True，响应体须为 UTF-8（JSON 总是满足）
+        return json.dumps(
+            {
+                "body": self.body.decode(),
+                "media_type": self.media_type,
+                "etag": self.etag,
+                "created_at": self.created_at,
+                "max_age": self.max_age,
+                "stale": self.stale,
+                "generations": self.generations,
+            },
+            separators=(",", ":"),
+        )
+
+    @classmethod
+    def loads(cls, raw: str) -> "CacheEntry":
+        data = json.loads(raw)
+        data["body"] = data["body"].encode()
+        return cls(**data)
+
+
+class ResponseCache:
+    def __init__(self, local_maxsize: int, local_ttl: float):
+        self._local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        # 收到的各标签最新代数。本地条目最多存活 local_ttl，记录保留同样久即可
+        self._generations = TTLCache(maxsize=local_maxsize * 4, ttl=local_ttl)
+
+    # ---- 本地 ----
+
+    def _local_get(self, key: str) -> Optional[CacheEntry]:
+        if not subscriber.synced:
+            return None
+        entry = self._local.get(key)
+        if entry is None:
+            return None
+        for tag, generation in entry.generations.items():
+            if self._generations.get(tag, generation) != generation:
+                self._local.pop(key)
+                return None
+        return entry
+
+    def _local_set(self, key: str, entry: CacheEntry) -> None:
+        self._local.set(key, entry, ttl=min(self._local.ttl, entry.ttl))
+
+    def _observe(self, generations: Dict[str, int]) -> None:
+        for tag, generation in generations.items():
+            if generation <= self._generations.get(tag, -1):
+                continue
+            if len(self._generations) >= self._generations.maxsize:
+                # 记录被挤出后无法再判断本地条目是否失效，整体清空
+                self._generations.clear()
+                self._local.clear()
+            self._generations.set(tag, generation)
+
+    # ---- 读写 ----
+
+    async def get(
+        self, key: str, tags: Sequence[str]
+    ) -> Tuple[Optional[CacheEntry], Optional[Dict[str, int]], bool]:
+        """
+        返回 (可用的条目, 各标签当前代数, 是否刚失效过)。
+        未命中时代数用于随后写入的条目，刚失效过时应从主库重新生成；
+        Redis 不可用时为 (None, None, False)，不写入。
+        """
+        entry = self._local_get(key)
+        if entry is not None:
+            return entry, entry.generations, False
+        try:
+            async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+                pipe.get(_entry_key(key))
+                if tags:
+                    pipe.mget([_generation_key(tag) for tag in tags])
+                    pipe.mget([_recent_key(tag) for tag in tags])
+                results = await pipe.execute()
+        except RedisError as e:
+            logger.warning("response cache read failed: %s", e)
+            return None, None, False
+        generations = (
+            {tag: int(value or 0) for tag, value in zip(tags, results[1])}
+            if tags
+            else {}
+        )
+        recent = bool(tags) and any(results[2])
+        if results[0] is None:
+            return None, generations, recent
+        entry = CacheEntry.loads(results[0])
+        if entry.generations != generations or entry.ttl <= 0:
+            return None, generations, recent
+        self._local_set(key, entry)
+        return entry, generations, recent
+
+    async def set(self, key: str, entry: CacheEntry) -> None:
+        self._local_set(key, entry)
+        try:
+            raw = entry.dumps()
+        except UnicodeDecodeError:
+            return
+        try:
+            await RedisClient.get_client().set(
+                _entry_key(key), raw, ex=max(int(entry.ttl), 1)
+            )
+        except RedisError as e:
+            logger.warning("response cache write failed: %s", e)
+
+    async def lock(self, key: str, ttl: int) -> Optional[str]:
+        """后台刷新锁，同一键同时只有一个 worker 重新生成；成功时返回解锁用的令牌"""
+        try:
+            return await acquire_lock(_lock_key(key), ttl)
+        except RedisError:
+            return None
+
+    async def unlock(self, key: str, token: str) -> None:
+        try:
+            await release_lock(_lock_key(key), token)
+        except RedisError:
+            pass
+
+    # ---- 失效 ----
+
+    async def invalidate(self, *tags: str) -> None:
+        """数据写入后调用：带这些标签的条目在所有 worker 上失效"""
+        tags = sorted(set(tags))
+        if not tags or not settings.RESPONSE_CACHE_ENABLED:
+            return
+        client = RedisClient.get_client()
+        try:
+            recent = math.ceil(settings.DB_READ_YOUR_WRITES_SECONDS)
+            async with client.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.incr(_generation_key(tag))
+                    pipe.expire(_generation_key(tag), _GENERATION_TTL)
+                    pipe.set(_recent_key(tag), 1, ex=max(recent, 1))
+                results = await pipe.execute()
+            generations = dict(zip(tags, results[::3]))
+            self._observe(generations)
+            await client.publish(INVALIDATE_CHANNEL, json.dumps(generations))
+        except RedisError as e:
+            # 其他 worker 的本地条目只能等 TTL 过期
+            logger.warning("response cache invalidation failed: %s", e)
+            self._local.clear()
+
+    def on_message(self, data: str) -> None:
+        self._observe(json.loads(data))
+
+    async def resync(self) -> None:
+        # 断线期间可能错过了失效消息
+        self._generations.clear()
+        self._local.clear()
+
+    def stats(self) -> dict:
+        return {"local": self._local.stats(), "generations": len(self._generations)}
+
+
+response_cache = ResponseCache(
+    local_maxsize=settings.RESPONSE_CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.RESPONSE_CACHE_LOCAL_TTL,
+)
+subscriber.subscribe(
+    INVALIDATE_CHANNEL, response_cache.on_message, resync=response_cache.resync
+)
@@ -0,0 +1,258 @@
+"""
+管理员资源权限集。
+
+`f_sys_role_auth.resource_ids` 与 `f_sys_admin.role_ids` 都是逗号分隔的字符串，
+这里把每个角色的资源预先编译为位图（Python int，第 i 位表示资源 i），
+管理员的有效权限即其各角色位图的并集：鉴权是一次位与，菜单过滤是一次集合运算。
+
+- 角色位图：每个 worker 在内存中全量保存，角色/授权变更时按角色增量重载
+- 管理员并集：进程内 TTL 缓存 + Redis（键带版本号，角色变更时整体失效）
+变更通过 `perm:invalidate` 频道通知所有 worker。
+"""
+
+import asyncio
+import json
+import logging
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db.redis import RedisClient
+from app.db.session import AsyncSessionLocal
+from app.models.f_sys_admin import FSysAdmin
+from app.models.f_sys_role import FSysRole
+from app.models.f_sys_role_auth import FSysRoleAuth
+from app.services.pubsub import subscriber
+
+logger = logging.getLogger(__name__)
+
+INVALIDATE_CHANNEL = "perm:invalidate"
+VERSION_KEY = "perm:version"
+
+ROLE_STATUS_NORMAL = 1
+
+
+class PermissionSet(NamedTuple):
+    role_ids: FrozenSet[int]
+    bits: int
+
+    def has(self, resource_id: int) -> bool:
+        return bool(self.bits >> resource_id & 1)
+
+    def resource_ids(self) -> List[int]:
+        return bits_to_ids(self.bits)
+
+
+EMPTY = PermissionSet(frozenset(), 0)
+
+
+def parse_ids(value: Optional[str]) -> List[int]:
+    """解析 "1,2,3" 形式的 id 列表，忽略空项与非法项"""
+    ids = []
+    for part in (value or "").split(","):
+        part = part.strip()
+        if part.isdigit():
+            ids.append(int(part))
+    return ids
+
+
+def ids_to_bits(ids: Iterable[int]) -> int:
+    bits = 0
+    for i in ids:
+        bits |= 1 << i
+    return bits
+
+
+def bits_to_ids(bits: int) -> List[int]:
+    ids = []
+    while bits:
+        low = bits & -bits
+        ids.append(low.bit_length() - 1)
+        bits ^= low
+    return ids
+
+
+def _admin_key(version: int, admin_id: int) -> str:
+    return f"perm:{version}:admin:{admin_id}"
+
+
+class RolePermissions:
+    def __init__(self, local_maxsize: int, local_ttl: float, redis_ttl: int):
+        self.redis_ttl = redis_ttl
+        self._local = TTLCache(maxsize=local_maxsize, ttl=local_ttl)
+        self._role_bits: Dict[int, int] = {}
+        self._loaded = False
+        self._version = 0
+        self._lock = asyncio.Lock()
+        self._reloading: Optional[asyncio.Task] = None
+
+    # ---- 角色位图 ----
+
+    async def _load_roles(
+        self, db: AsyncSession, role_ids: Optional[List[int]] = None
+    ) -> None:
+        stmt = (
+            select(FSysRoleAuth.role_id, FSysRoleAuth.resource_ids)
+            .join(FSysRole, FSysRole.id == FSysRoleAuth.role_id)
+            .where(FSysRole.status == ROLE_STATUS_NORMAL)
+        )
+        if role_ids is not None:
+            stmt = stmt.where(FSysRoleAuth.role_id.in_(role_ids))
+        bits: Dict[int, int] = {}
+        for role_id, resource_ids in (await db.execute(stmt)).all():
+            bits[role_id] = bits.get(role_id, 0) | ids_to_bits(parse_ids(resource_ids))
+
+        if role_ids is None:
+            self._role_bits = bits
+            self._loaded = True
+        else:
+            for role_id in role_ids:
+                # 被停用或删除授权的角色不再有任何资源
+                self._role_bits.pop(role_id, None)
+            self._role_bits.update(bits)
+
+    async def _reload_roles(self, role_ids: Optional[List[int]] = None) -> None:
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                await self._load_roles(db, role_ids)
+        self._local.clear()
+
+    async def _ensure_ready(self) -> None:
+        if self._reloading is not None and not self._reloading.done():
+            await self._reloading
+        if not self._loaded:
+            async with self._lock:
+                if not self._loaded:
+                    async with AsyncSessionLocal() as db:
+                        await self._load_roles(db)
+
+    def union(self, role_ids: Iterable[int]) -> int:
+        bits = 0
+        for role_id in role_ids:
+            bits |= self._role_bits.get(role_id, 0)
+        return bits
+
+    # ---- 管理员权限集 ----
+
+    async def for_admin(
+        self, admin_id: int, db: Optional[AsyncSession] = None
+    ) -> PermissionSet:
+        cached = self._local.get(admin_id)
+        if cached is not None:
+            return cached
+
+        await self._ensure_ready()
+        version = self._version
+        key = _admin_key(version, admin_id)
+        client = RedisClient.get_client()
+        try:
+            raw = await client.get(key)
+        except RedisError as e:
+            logger.warning("permission cache read failed: %s", e)
+            raw = None
+
+        if raw is not None:
+            data = json.loads(raw)
+            perms = PermissionSet(frozenset(data["roles"]), int(data["bits"], 16))
+        else:
+            role_ids = await self._admin_role_ids(admin_id, db)
+            if role_ids is None:
+                return EMPTY
+            perms = PermissionSet(role_ids, self.union(role_ids))
+            raw = json.dumps(
+                {"roles": sorted(perms.role_ids), "bits": format(perms.bits, "x")},
+                separators=(",", ":"),
+            )
+            try:
+                await client.set(key, raw, ex=self.redis_ttl)
+            except RedisError as e:
+                logger.warning("permission cache write failed: %s", e)
+
+        # 计算期间版本已变化时不写本地缓存，避免保存旧角色位图的结果
+        if version == self._version:
+            self._local.set(admin_id, perms)
+        return perms
+
+    async def _admin_role_ids(
+        self, admin_id: int, db: Optional[AsyncSession]
+    ) -> Optional[FrozenSet[int]]:
+        stmt = select(FSysAdmin.role_ids).where(FSysAdmin.id == admin_id)
+        if db is None:
+            async with AsyncSessionLocal() as session:
+                role_ids = (await session.execute(stmt)).scalar_one_or_none()
+        else:
+            role_ids = (await db.execute(stmt)).scalar_one_or_none()
+        if role_ids is None:
+            return None
+        return frozenset(parse_ids(role_ids))
+
+    async def has_resource(self, admin_id: int, resource_id: int) -> bool:
+        return (await self.for_admin(admin_id)).has(resource_id)
+
+    # ---- 失效 ----
+
+    async def invalidate_roles(self, role_ids: Iterable[int]) -> None:
+        """角色或其授权（f_sys_role_auth）变更后调用"""
+        role_ids = sorted(set(role_ids))
+        client = RedisClient.get_client()
+        version = await client.incr(VERSION_KEY)
+        message = {"roles": role_ids, "version": version}
+        self.on_message(json.dumps(message))
+        await client.publish(INVALIDATE_CHANNEL, json.dumps(message))
+
+    async def invalidate_admin(self, admin_id: int) -> None:
+        """管理员的 role_ids 变更后调用"""
+        self._local.pop(admin_id)
+        client = RedisClient.get_client()
+        try:
+            await client.delete(_admin_key(self._version, admin_id))
+            await client.publish(INVALIDATE_CHANNEL, json.dumps({"admins": [admin_id]}))
+        except RedisError as e:
+            logger.warning("permission cache invalidation failed: %s", e)
+
+    def on_message(self, data: str) -> None:
+        message = json.loads(data)
+        for admin_id in message.get("admins", ()):
+            self._local.pop(admin_id)
+        if "roles" in message:
+            version = message.get("version", self._version)
+            if version <= self._version:
+                return
+            self._version = version
+            self._local.clear()
+            if self._loaded:
+                self._reloading = asyncio.get_running_loop().create_task(
+                    self._reload_roles(message["roles"])
+                )
+
+    async def resync(self) -> None:
+        # 订阅（重新）建立时：同步版本号并全量重载角色位图
+        try:
+            version = await RedisClient.get_client().get(VERSION_KEY)
+            self._version = int(version or 0)
+            await self._reload_roles()
+        except Exception:
+            logger.exception("role permission reload failed")
+            self._loaded = False
+            self._local.clear()
+
+    def stats(self) -> dict:
+        return {
+            "version": self._version,
+            "roles": len(self._role_bits),
+            "cached_admins": len(self._local),
+        }
+
+
+role_permissions = RolePermissions(
+    local_maxsize=settings.PERMISSION_CACHE_LOCAL_MAXSIZE,
+    local_ttl=settings.PERMISSION_CACHE_LOCAL_TTL,
+    redis_ttl=settings.PERMISSION_CACHE_REDIS_TTL,
+)
+subscriber.subscribe(
+    INVALIDATE_CHANNEL, role_permissions.on_message, resync=role_permissions.resync
+)
@@ -0,0 +1,131 @@
+"""
+附件存储后端。
+
+接口方法均为阻塞调用，由调用方放到线程池中执行（`asyncio.to_thread`），
+不会在事件循环线程上做磁盘 I/O。
+"""
+
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Iterator, Optional
+
+from app.core.config import settings
+
+READ_BLOCK_SIZE = 1024 * 1024
+
+
+class Storage(ABC):
+    @abstractmethod
+    def open_part(self, key: str, offset: int) -> BinaryIO:
+        """打开未完成文件，定位到 offset 处写入（截断 offset 之后的内容）"""
+
+    @abstractmethod
+    def read_part(self, key: str, length: int) -> Iterator[bytes]:
+        """读取未完成文件的前 length 字节"""
+
+    @abstractmethod
+    def part_size(self, key: str) -> int:
+        """未完成文件当前大小，不存在时为 0"""
+
+    @abstractmethod
+    def commit(self, part_key: str, key: str) -> None:
+        """未完成文件写完后移动到最终位置"""
+
+    @abstractmethod
+    def delete_part(self, key: str) -> None: ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None: ...
+
+    @abstractmethod
+    def exists(self, key: str) -> bool: ...
+
+    @abstractmethod
+    def url(self, key: str) -> str: ...
+
+    def local_path(self, key: str) -> Optional[str]:
+        """可直接 sendfile 的本地路径；非本地存储返回 None"""
+        return None
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        """由 url() 生成的地址反查存储 key，不属于本存储时返回 None"""
+        return None
+
+
+class LocalStorage(Storage):
+    def __init__(self, root: str, base_url: str):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url.rstrip("/")
+        self._parts = os.path.join(self.root, ".parts")
+
+    def _path(self, key: str) -> str:
+        path = os.path.abspath(os.path.join(self.root, key))
+        if not path.startswith(self.root + os.sep):
+            raise ValueError(f"invalid storage key: {key!r}")
+        return path
+
+    def _part_path(self, key: str) -> str:
+        return os.path.join(self._parts, os.path.basename(key))
+
+    def open_part(self, key: str, offset: int) -> BinaryIO:
+        path = self._part_path(key)
+        os.makedirs(self._parts, exist_ok=True)
+        f = open(path, "r+b" if os.path.exists(path) else "w+b")
+        f.seek(offset)
+        f.truncate()
+        return f
+
+    def read_part(self, key: str, length: int) -> Iterator[bytes]:
+        with open(self._part_path(key), "rb") as f:
+            while length > 0:
+                block = f.read(min(READ_BLOCK_SIZE, length))
+                if not block:
+                    break
+                length -= len(block)
+                yield block
+
+    def part_size(self, key: str) -> int:
+        try:
+            return os.path.getsize(self._part_path(key))
+        except FileNotFoundError:
+            return 0
+
+    def commit(self, part_key: str, key: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(self._part_path(part_key), path)
+
+    def delete_part(self, key: str) -> None:
+        try:
+            os.remove(self._part_path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def url(self, key: str) -> str:
+        return f"{self.base_url}/{key}"
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    def key_for_url(self, url: str) -> Optional[str]:
+        prefix = f"{self.base_url}/"
+        return url[len(prefix) :] if url.startswith(prefix) else None
+
+
+def create_storage() -> Storage:
+    if settings.STORAGE_BACKEND == "local":
+        return LocalStorage(settings.STORAGE_LOCAL_ROOT, settings.STORAGE_BASE_URL)
+    raise ValueError(f"unsupported storage backend: {settings.STORAGE_BACKEND}")
+
+
+storage = create_storage()
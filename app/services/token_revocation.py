@@ -0,0 +1,67 @@
+"""
+token 吊销检查。
+
+每个 worker 在内存中维护已吊销 token 摘要表（启动/重连时从 `revoked_tokens`
+全量加载，之后通过 `token:revoked` 频道增量同步），认证请求只做一次本地查表，
+不产生 Redis 往返。订阅未就绪时退回到直接检查 `token:{jwt}` 是否存在。
+"""
+
+import logging
+import time
+from typing import Dict
+
+from redis.exceptions import RedisError
+
+from app.core.security import token_digest
+from app.services.pubsub import subscriber
+from app.services.token_store import REVOKED_CHANNEL, token_store
+
+logger = logging.getLogger(__name__)
+
+
+class TokenRevocationList:
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._revoked: Dict[str, float] = {}
+        self._next_prune = 0.0
+
+    def _add(self, digest: str, expire_at: float) -> None:
+        self._revoked[digest] = expire_at
+        now = time.time()
+        if now >= self._next_prune:
+            self._revoked = {d: e for d, e in self._revoked.items() if e > now}
+            self._next_prune = now + 60
+
+    def on_message(self, data: str) -> None:
+        expire_at = time.time() + self.ttl
+        for digest in data.split(","):
+            self._add(digest, expire_at)
+
+    async def resync(self) -> None:
+        self._revoked = {
+            digest: expire_at
+            for digest, expire_at in await token_store.revoked_digests()
+        }
+
+    def is_revoked_local(self, token: str) -> bool:
+        expire_at = self._revoked.get(token_digest(token))
+        return expire_at is not None and expire_at > time.time()
+
+    async def is_revoked(self, token: str) -> bool:
+        if subscriber.synced:
+            return self.is_revoked_local(token)
+        try:
+            return await token_store.get_user_id(token) is None
+        except RedisError as e:
+            # Redis 不可用时放行，签名与过期时间仍由 JWT 校验保证
+            logger.warning("token revocation check skipped: %s", e)
+            return False
+
+    def __len__(self) -> int:
+        return len(self._revoked)
+
+
+token_revocation = TokenRevocationList(ttl=token_store.ttl)
+subscriber.subscribe(
+    REVOKED_CHANNEL, token_revocation.on_message, resync=token_revocation.resync
+)
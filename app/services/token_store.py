@@ -0,0 +1,262 @@
+"""
+登录 token 存储。
+
+Redis 键：
+- token:{access_token}  -> user_id
+- user:{user_id}:token  -> 最近一次签发的 access_token
+- user:{user_id}:tokens -> 该用户所有有效 token 的集合（用于批量吊销）
+- revoked_tokens        -> 已吊销 token 摘要的有序集合（score 为过期时间戳）
+
+签发/吊销都在单个 Lua 脚本中完成：一次往返、原子执行，不会留下只写了一半的状态。
+吊销的 token 摘要（sha1，由调用方计算后传入）同时发布到 `token:revoked` 频道，供各 worker 同步本地吊销表。
+
+脚本访问的键全部通过 KEYS 声明：要吊销的 token 由调用方先读出，脚本内核对集合未变化，
+变化了（并发登录）则返回 RETRY，短暂随机退避后重新读取再执行，多次失败时抛出 TokenStoreBusy。`token:{t}` 按 token 查找，无法与
+用户的键放到同一个 hash slot，因此只支持单节点 Redis（含主从 / Sentinel），不支持 Cluster。
+"""
+
+import asyncio
+import random
+import time
+from typing import List, Optional, Sequence
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+from app.core.security import token_digest
+from app.db.redis import RedisClient
+
+REVOKED_TOKENS_KEY = "revoked_tokens"
+REVOKED_CHANNEL = "token:revoked"
+
+_RETRY = -1
+_MAX_ATTEMPTS = 5
+_RETRY_DELAY = 0.01  # 秒，第 n 次重试前随机等待 [0, _RETRY_DELAY * 2**n)
+
+
+class TokenStoreBusy(Exception):
+    """用户的 token 持续被并发修改，重试后仍未完成，请求应稍后重试"""
+
+
+async def _backoff(attempt: int) -> None:
+    if attempt:
+        await asyncio.sleep(random.uniform(0, _RETRY_DELAY * 2**attempt))
+
+
+# 公共部分。KEYS[1] revoked_tokens，KEYS[2] user:{id}:tokens，KEYS[3] user:{id}:token；
+# ARGV[1] 当前时间戳，ARGV[2] ttl。
+# 调用方预先读出的 n 个 token 放在 KEYS / ARGV 末尾：KEYS[key_base + i] 为 token
+# ARGV[arg_base + i] 的键，ARGV[arg_base + n + i] 为其摘要
+_REVOKE_PRELUDE = """
+local now = tonumber(ARGV[1])
+local expire_at = now + tonumber(ARGV[2])
+local revoked = {}
+-- 只记录仍然有效的 token；已过期的 JWT 本身就会被拒绝
+local function revoke(key, digest)
+    if redis.call('DEL', key) == 1 then
+        redis.call('ZADD', KEYS[1], expire_at, digest)
+        table.insert(revoked, digest)
+    end
+end
+local function publish()
+    if #revoked > 0 then
+        redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+        redis.call('PUBLISH', 'token:revoked', table.concat(revoked, ','))
+    end
+    return #revoked
+end
+local function declared(key_base, arg_base)
+    local keys, digests = {}, {}
+    local n = #KEYS - key_base
+    for i = 1, n do
+        keys[ARGV[arg_base + i]] = KEYS[key_base + i]
+        digests[ARGV[arg_base + i]] = ARGV[arg_base + n + i]
+    end
+    return keys, digests
+end
+-- 用户当前的全部 token（集合 + 最近一次签发的）；有未声明的返回 nil
+local function user_tokens(keys)
+    local tokens = redis.call('SMEMBERS', KEYS[2])
+    local latest = redis.call('GET', KEYS[3])
+    if latest and redis.call('SISMEMBER', KEYS[2], latest) == 0 then
+        table.insert(tokens, latest)
+    end
+    for _, t in ipairs(tokens) do
+        if not keys[t] then
+            return nil
+        end
+    end
+    return tokens
+end
+"""
+
+# KEYS: revoked_tokens, user:{id}:tokens, user:{id}:token, token:{new}, token:{old}...
+# ARGV: now, ttl, new_token, user_id, single_session, old..., sha1(old)...
+_ISSUE_SCRIPT = _REVOKE_PRELUDE + """
+local old = redis.call('GET', KEYS[3])
+if ARGV[5] == '1' then
+    local keys, digests = declared(4, 5)
+    local tokens = user_tokens(keys)
+    if not tokens then
+        return {-1, false}
+    end
+    for _, t in ipairs(tokens) do
+        if t ~= ARGV[3] then
+            revoke(keys[t], digests[t])
+        end
+    end
+    redis.call('DEL', KEYS[2])
+    publish()
+end
+redis.call('SET', KEYS[4], ARGV[4], 'EX', ARGV[2])
+redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[2])
+redis.call('SADD', KEYS[2], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return {0, old}
+"""
+
+# KEYS: revoked_tokens, user:{id}:tokens, user:{id}:token, token:{token}
+# ARGV: now, ttl, token, user_id（调用方读到的 token:{token} 的值）, sha1(token)
+_REVOKE_SCRIPT = _REVOKE_PRELUDE + """
+local user_id = redis.call('GET', KEYS[4])
+if not user_id then
+    return 0
+end
+if user_id ~= ARGV[4] then
+    return -1
+end
+revoke(KEYS[4], ARGV[5])
+redis.call('SREM', KEYS[2], ARGV[3])
+if redis.call('GET', KEYS[3]) == ARGV[3] then
+    redis.call('DEL', KEYS[3])
+end
+return publish()
+"""
+
+# KEYS: revoked_tokens, user:{id}:tokens, user:{id}:token, token:{t}...
+# ARGV: now, ttl, t..., sha1(t)...
+_REVOKE_ALL_SCRIPT = _REVOKE_PRELUDE + """
+local keys, digests = declared(3, 2)
+local tokens = user_tokens(keys)
+if not tokens then
+    return -1
+end
+for _, t in ipairs(tokens) do
+    revoke(keys[t], digests[t])
+end
+redis.call('DEL', KEYS[2], KEYS[3])
+return publish()
+"""
+
+
+def _user_keys(user_id: int) -> List[str]:
+    return [REVOKED_TOKENS_KEY, f"user:{user_id}:tokens", f"user:{user_id}:token"]
+
+
+class TokenStore:
+    def __init__(self, ttl: int, single_session: bool = True):
+        self.ttl = ttl
+        self.single_session = single_session
+        self._client: Optional[redis.Redis] = None
+        self._scripts: dict = {}
+
+    def _script(self, source: str):
+        # Script 对象缓存 SHA，之后走 EVALSHA；客户端重建后重新注册
+        client = RedisClient.get_client()
+        if client is not self._client:
+            self._client = client
+            self._scripts = {}
+        script = self._scripts.get(source)
+        if script is None:
+            script = self._scripts[source] = client.register_script(source)
+        return script
+
+    def _now_args(self) -> list:
+        return [int(time.time()), self.ttl]
+
+    async def _user_tokens(self, user_id: int) -> List[str]:
+        """脚本执行前读出用户当前的全部 token，用于声明它们的键"""
+        async with RedisClient.get_client().pipeline(transaction=False) as pipe:
+            pipe.smembers(f"user:{user_id}:tokens")
+            pipe.get(f"user:{user_id}:token")
+            tokens, latest = await pipe.execute()
+        tokens = set(tokens)
+        if latest:
+            tokens.add(latest)
+        return sorted(tokens)
+
+    async def _run(
+        self, source: str, keys: Sequence[str], args: Sequence, user_id: int
+    ):
+        """执行需要声明用户全部 token 的脚本；集合在读取后被并发修改时重试"""
+        for attempt in range(_MAX_ATTEMPTS):
+            await _backoff(attempt)
+            tokens = await self._user_tokens(user_id)
+            result = await self._script(source)(
+                keys=[*keys, *(f"token:{t}" for t in tokens)],
+                args=[*args, *tokens, *(token_digest(t) for t in tokens)],
+            )
+            status = result[0] if isinstance(result, list) else result
+            if status != _RETRY:
+                return result
+        raise TokenStoreBusy(f"tokens of user {user_id} kept changing")
+
+    async def issue(self, user_id: int, access_token: str) -> Optional[str]:
+        """
+        保存新 token；单会话模式下同时吊销该用户之前的全部 token。
+        返回之前最近一次签发的 token（若有）。
+        """
+        keys = [*_user_keys(user_id), f"token:{access_token}"]
+        args = [
+            *self._now_args(),
+            access_token,
+            user_id,
+            int(self.single_session),
+        ]
+        if self.single_session:
+            _, old = await self._run(_ISSUE_SCRIPT, keys, args, user_id)
+        else:
+            _, old = await self._script(_ISSUE_SCRIPT)(keys=keys, args=args)
+        return old
+
+    async def get_user_id(self, access_token: str) -> Optional[int]:
+        user_id = await RedisClient.cached_get(f"token:{access_token}")
+        return int(user_id) if user_id is not None else None
+
+    async def revoke(self, access_token: str) -> bool:
+        for attempt in range(_MAX_ATTEMPTS):
+            await _backoff(attempt)
+            # 不走本地缓存：用户 id 决定脚本要声明的键
+            user_id = await RedisClient.get_client().get(f"token:{access_token}")
+            if user_id is None:
+                return False
+            revoked = await self._script(_REVOKE_SCRIPT)(
+                keys=[*_user_keys(int(user_id)), f"token:{access_token}"],
+                args=[
+                    *self._now_args(),
+                    access_token,
+                    user_id,
+                    token_digest(access_token),
+                ],
+            )
+            if revoked != _RETRY:
+                return bool(revoked)
+        raise TokenStoreBusy("token owner kept changing")
+
+    async def revoke_all(self, user_id: int) -> int:
+        """吊销用户的所有会话，返回吊销的 token 数量"""
+        return await self._run(
+            _REVOKE_ALL_SCRIPT, _user_keys(user_id), self._now_args(), user_id
+        )
+
+    async def revoked_digests(self) -> List[tuple]:
+        """仍在有效期内的已吊销 token 摘要 [(digest, expire_at), ...]"""
+        return await RedisClient.get_client().zrangebyscore(
+            REVOKED_TOKENS_KEY, int(time.time()), "+inf", withscores=True
+        )
+
+
+token_store = TokenStore(
+    ttl=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    single_session=settings.TOKEN_SINGLE_SESSION,
+)
@@ -0,0 +1,381 @@
+"""
+可续传的分块上传。
+
+流程（与 tus 协议类似）：
+1. create：登记文件名与总大小，得到 upload_id（状态保存在 Redis `upload:{id}`）
+2. append：从 Upload-Offset 处流式写入请求体，可多次调用/断点续传
+3. 写满总大小后生成 FAttachment 记录，上传状态删除
+
+内容按 SHA-256 去重（f_attachment_blob，唯一索引 + 引用计数）：相同内容只保存一份，
+已存在时刚上传的未完成文件直接删除。create 时带上 sha256 且当前用户已有该内容的附件，
+不需要传输数据即可生成附件（秒传，见 `instant`）。哈希不是秘密（下载的 ETag 即为哈希），
+不能凭哈希引用别人上传的内容。
+
+请求体按 UPLOAD_CHUNK_SIZE 聚合成块，每块的写盘与 SHA-256 更新在同一次线程池调用中完成，
+事件循环只负责收包；内存占用上限约为一个块。MIME 类型在写入第一块时按文件头识别。
+sha256 的中间状态无法序列化，续传落到其它 worker 时会先在线程中重新计算已写入部分的哈希。
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import time
+import uuid
+from typing import AsyncIterator, BinaryIO, Optional, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.crud.crud_attachment import attachment_crud
+from app.crud.crud_attachment_blob import attachment_blob_crud
+from app.db.redis import RedisClient, acquire_lock, extend_lock, release_lock
+from app.models.f_attachment import FAttachment
+from app.models.f_attachment_blob import FAttachmentBlob
+from app.services.storage import Storage, storage
+
+ATTACH_TYPE_IMAGE = 1
+ATTACH_TYPE_VIDEO = 2
+ATTACH_TYPE_FILE = 3
+
+# 写入锁的过期时间（秒），每写入一块续期一次
+_LOCK_TTL = 300
+# 登记内容时与并发的相同内容上传/释放冲突的重试次数
+_BLOB_ATTEMPTS = 3
+
+# (偏移, 魔数, mimetype, 扩展名)
+_SIGNATURES = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", "png"),
+    (0, b"\xff\xd8\xff", "image/jpeg", "jpg"),
+    (0, b"GIF87a", "image/gif", "gif"),
+    (0, b"GIF89a", "image/gif", "gif"),
+    (0, b"BM", "image/bmp", "bmp"),
+    (0, b"\x1a\x45\xdf\xa3", "video/webm", "webm"),
+    (4, b"ftypqt", "video/quicktime", "mov"),
+    (4, b"ftyp", "video/mp4", "mp4"),
+    (0, b"%PDF-", "application/pdf", "pdf"),
+    (0, b"PK\x03\x04", "application/zip", "zip"),
+]
+
+
+def sniff_mimetype(head: bytes, filename: str) -> Tuple[str, str]:
+    """按文件头识别类型，无法识别时按文件名猜测"""
+    if head[:4] == b"RIFF" and head[8:12] in (b"WEBP", b"AVI "):
+        return (
+            ("image/webp", "webp")
+            if head[8:12] == b"WEBP"
+            else ("video/x-msvideo", "avi")
+        )
+    for offset, magic, mimetype, ext in _SIGNATURES:
+        if head[offset : offset + len(magic)] == magic:
+            return mimetype, ext
+    ext = os.path.splitext(filename)[1].lstrip(".").lower()[:16]
+    return mimetypes.guess_type(filename)[0] or "application/octet-stream", ext
+
+
+def attach_type_for(mimetype: str) -> int:
+    if mimetype.startswith("image/"):
+        return ATTACH_TYPE_IMAGE
+    if mimetype.startswith("video/"):
+        return ATTACH_TYPE_VIDEO
+    return ATTACH_TYPE_FILE
+
+
+class UploadError(Exception):
+    status_code = 400
+
+    def __init__(self, detail: str, offset: Optional[int] = None):
+        super().__init__(detail)
+        self.offset = offset
+
+
+class UploadNotFound(UploadError):
+    status_code = 404
+
+
+class UploadConflict(UploadError):
+    """Upload-Offset 与服务端不一致，或同一上传正在被另一个请求写入"""
+
+    status_code = 409
+
+
+class UploadTooLarge(UploadError):
+    status_code = 413
+
+
+def _write_chunk(f: BinaryIO, chunk: bytes, hasher) -> None:
+    # 线程池中执行：写盘与哈希（hashlib 处理大块数据时释放 GIL）
+    f.write(chunk)
+    hasher.update(chunk)
+
+
+def _rehash(store: Storage, key: str, length: int):
+    hasher = hashlib.sha256()
+    for block in store.read_part(key, length):
+        hasher.update(block)
+    return hasher
+
+
+class UploadManager:
+    def __init__(self, store: Storage, chunk_size: int, max_size: int, expire: int):
+        self.storage = store
+        self.chunk_size = chunk_size
+        self.max_size = max_size
+        self.expire = expire
+        # upload_id -> (offset, hasher)，同一 worker 上续传时免去重新哈希
+        self._hashers = TTLCache(maxsize=1024, ttl=expire)
+
+    @staticmethod
+    def _key(upload_id: str) -> str:
+        return f"upload:{upload_id}"
+
+    @staticmethod
+    def _lock_key(upload_id: str) -> str:
+        return f"upload:{upload_id}:lock"
+
+    async def create(
+        self, user_id: int, filename: str, size: int, sha256: Optional[str] = None
+    ) -> dict:
+        """sha256 为客户端声明的内容哈希，上传完成时校验"""
+        if size > self.max_size:
+            raise UploadTooLarge(f"File exceeds {self.max_size} bytes")
+        upload_id = uuid.uuid4().hex
+        state = {
+            "user_id": user_id,
+            "filename": filename,
+            "size": size,
+            "offset": 0,
+            "mimetype": "",
+            "ext": "",
+            "sha256": sha256 or "",
+        }
+        client = RedisClient.get_client()
+        async with client.pipeline(transaction=True) as pipe:
+            pipe.hset(self._key(upload_id), mapping=state)
+            pipe.expire(self._key(upload_id), self.expire)
+            await pipe.execute()
+        return {"upload_id": upload_id, **state}
+
+    async def get(self, upload_id: str, user_id: int) -> dict:
+        raw = await RedisClient.get_client().hgetall(self._key(upload_id))
+        if not raw or int(raw["user_id"]) != user_id:
+            raise UploadNotFound("Upload not found")
+        return {
+            "upload_id": upload_id,
+            "user_id": int(raw["user_id"]),
+            "filename": raw["filename"],
+            "size": int(raw["size"]),
+            "offset": int(raw["offset"]),
+            "mimetype": raw["mimetype"],
+            "ext": raw["ext"],
+            "sha256": raw.get("sha256", ""),
+        }
+
+    async def instant(
+        self, db: AsyncSession, user_id: int, filename: str, size: int, sha256: str
+    ) -> Optional[FAttachment]:
+        """用户已有该内容（哈希与大小都一致）的附件时直接生成新附件，否则返回 None"""
+        if not await attachment_crud.owns_hash(db, user_id, sha256):
+            return None
+        blob = await attachment_blob_crud.get_by_hash(db, sha256)
+        if blob is None or blob.attach_size != size:
+            return None
+        blob = await attachment_blob_crud.acquire(db, sha256)
+        if blob is None:
+            # 期间被最后一个引用者删除
+            return None
+        return await self._create_attachment(db, user_id, filename, blob)
+
+    async def abort(self, upload_id: str, user_id: int) -> None:
+        await self.get(upload_id, user_id)
+        await self._discard(upload_id)
+
+    async def _hasher_at(self, upload_id: str, offset: int):
+        cached = self._hashers.get(upload_id)
+        if cached is not None and cached[0] == offset:
+            return cached[1]
+        if offset == 0:
+            return hashlib.sha256()
+        return await asyncio.to_thread(_rehash, self.storage, upload_id, offset)
+
+    async def append(
+        self,
+        db: AsyncSession,
+        upload_id: str,
+        user_id: int,
+        offset: int,
+        body: AsyncIterator[bytes],
+    ) -> Tuple[dict, Optional[FAttachment]]:
+        """
+        从 offset 处写入 body。返回最新状态，写满时同时返回新建的附件记录。
+        """
+        state = await self.get(upload_id, user_id)
+        lock_key = self._lock_key(upload_id)
+        token = await acquire_lock(lock_key, _LOCK_TTL)
+        if token is None:
+            raise UploadConflict("Upload is in progress", offset=state["offset"])
+        try:
+            # 加锁前读到的状态可能已被刚结束的请求改变（甚至已完成并删除），重新读取
+            state = await self.get(upload_id, user_id)
+            if offset != state["offset"]:
+                raise UploadConflict("Upload-Offset mismatch", offset=state["offset"])
+            client = RedisClient.get_client()
+            part_size = await asyncio.to_thread(self.storage.part_size, upload_id)
+            if part_size < offset:
+                # 未完成文件丢失或被截断，让客户端从实际位置续传
+                await client.hset(self._key(upload_id), "offset", part_size)
+                self._hashers.pop(upload_id)
+                raise UploadConflict("Upload-Offset mismatch", offset=part_size)
+
+            hasher = await self._hasher_at(upload_id, offset)
+            f = await asyncio.to_thread(self.storage.open_part, upload_id, offset)
+            try:
+                state = await self._receive(f, hasher, state, body, token)
+            finally:
+                await asyncio.to_thread(f.close)
+
+            if state["offset"] < state["size"]:
+                return state, None
+            attachment = await self._complete(db, state, hasher.hexdigest())
+            return state, attachment
+        finally:
+            await release_lock(lock_key, token)
+
+    async def _receive(
+        self, f: BinaryIO, hasher, state: dict, body, token: str
+    ) -> dict:
+        buffer = bytearray()
+        lock_key = self._lock_key(state["upload_id"])
+
+        async def flush() -> None:
+            if not buffer:
+                return
+            chunk = bytes(buffer)
+            buffer.clear()
+            if not await extend_lock(lock_key, token, _LOCK_TTL):
+                # 锁已过期并可能被其他请求取得，不能再写入
+                raise UploadConflict("Upload lock lost", offset=state["offset"])
+            if state["offset"] == 0:
+                state["mimetype"], state["ext"] = sniff_mimetype(
+                    chunk[:64], state["filename"]
+                )
+            await asyncio.to_thread(_write_chunk, f, chunk, hasher)
+            state["offset"] += len(chunk)
+            self._hashers.set(state["upload_id"], (state["offset"], hasher))
+            await RedisClient.get_client().hset(
+                self._key(state["upload_id"]),
+                mapping={
+                    "offset": state["offset"],
+                    "mimetype": state["mimetype"],
+                    "ext": state["ext"],
+                },
+            )
+
+        try:
+            async for data in body:
+                if state["offset"] + len(buffer) + len(data) > state["size"]:
+                    buffer.clear()
+                    raise UploadTooLarge("Body exceeds declared upload size")
+                buffer += data
+                if len(buffer) >= self.chunk_size:
+                    await flush()
+        finally:
+            # 连接中断时已收到的数据同样落盘，客户端可从新的 offset 续传
+            await flush()
+        return state
+
+    async def _complete(
+        self, db: AsyncSession, state: dict, digest: str
+    ) -> FAttachment:
+        upload_id = state["upload_id"]
+        if state["sha256"] and state["sha256"] != digest:
+            await self._discard(upload_id)
+            raise UploadError("Content does not match the declared sha256")
+        if not state["mimetype"]:
+            # 空文件没有经过 flush，按文件名识别
+            state["mimetype"], state["ext"] = sniff_mimetype(b"", state["filename"])
+
+        blob = await attachment_blob_crud.acquire(db, digest)
+        if blob is None:
+            # 路径带上 upload_id 而非只用哈希：内容被释放删除后再次上传不会与之冲突
+            ext = state["ext"]
+            name = f"{upload_id}.{ext}" if ext else upload_id
+            key = f"{digest[:2]}/{digest[2:4]}/{name}"
+            await asyncio.to_thread(self.storage.commit, upload_id, key)
+            blob = await self._add_blob(db, state, digest, key)
+        else:
+            await asyncio.to_thread(self.storage.delete_part, upload_id)
+
+        attachment = await self._create_attachment(
+            db, state["user_id"], state["filename"], blob
+        )
+        await RedisClient.get_client().delete(self._key(upload_id))
+        self._hashers.pop(upload_id)
+        state["sha256"] = digest
+        return attachment
+
+    async def _add_blob(
+        self, db: AsyncSession, state: dict, digest: str, key: str
+    ) -> FAttachmentBlob:
+        """登记已移动到 key 的新内容；相同内容已被并发登记时改为引用已有记录"""
+        for _ in range(_BLOB_ATTEMPTS):
+            blob = await attachment_blob_crud.add(
+                db,
+                {
+                    "attach_hash": digest,
+                    "storage_key": key,
+                    "attach_size": state["size"],
+                    "attach_mimetype": state["mimetype"],
+                    "attach_extension": state["ext"],
+                },
+            )
+            if blob is not None:
+                return blob
+            # 并发上传了相同内容并先登记成功
+            blob = await attachment_blob_crud.acquire(db, digest)
+            if blob is not None:
+                await asyncio.to_thread(self.storage.delete, key)
+                return blob
+            # 对方的记录随即因引用归零被删除，重新登记
+        await asyncio.to_thread(self.storage.delete, key)
+        await RedisClient.get_client().delete(self._key(state["upload_id"]))
+        self._hashers.pop(state["upload_id"])
+        raise UploadConflict("Concurrent upload of the same content, please retry")
+
+    async def _discard(self, upload_id: str) -> None:
+        await RedisClient.get_client().delete(self._key(upload_id))
+        self._hashers.pop(upload_id)
+        await asyncio.to_thread(self.storage.delete_part, upload_id)
+
+    async def _create_attachment(
+        self, db: AsyncSession, user_id: int, filename: str, blob: FAttachmentBlob
+    ) -> FAttachment:
+        # 与 blob 引用计数的变更在同一事务中提交
+        now = int(time.time())
+        mimetype = blob.attach_mimetype
+        return await attachment_crud.create(
+            db,
+            {
+                "user_id": user_id,
+                "attach_name": blob.storage_key.rsplit("/", 1)[-1],
+                "attach_origin_name": filename[:255],
+                "attach_url": self.storage.url(blob.storage_key),
+                "attach_type": attach_type_for(mimetype),
+                "attach_mimetype": mimetype,
+                "attach_extension": blob.attach_extension,
+                "attach_size": str(blob.attach_size),
+                "attach_hash": blob.attach_hash,
+                "status": 1,
+                "created_at": now,
+                "updated_at": now,
+            },
+        )
+
+
+upload_manager = UploadManager(
+    storage,
+    chunk_size=settings.UPLOAD_CHUNK_SIZE,
+    max_size=settings.UPLOAD_MAX_SIZE,
+    expire=settings.UPLOAD_EXPIRE_SECONDS,
+)
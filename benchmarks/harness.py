@@ -0,0 +1,62 @@
+"""
+In-process benchmark harness.
+
+Runs `app.main:app` through httpx's ASGI transport against local stand-ins:
+SQLite (aiosqlite) instead of MySQL and fakeredis instead of Redis.
+Environment defaults are applied before any `app` module is imported.
+"""
+
+import logging
+import os
+import tempfile
+
+_DB_DIR = tempfile.mkdtemp(prefix="fastapi-bench-")
+
+os.environ.setdefault("MYSQL_USER", "bench")
+os.environ.setdefault("MYSQL_PASSWORD", "bench")
+os.environ.setdefault("MYSQL_HOST", "localhost")
+os.environ.setdefault("MYSQL_DB", "bench")
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+os.environ["SQLALCHEMY_DATABASE_URI"] = (
+    f"sqlite+aiosqlite:///{os.path.join(_DB_DIR, 'bench.db')}"
+)
+os.environ["DB_ECHO"] = "false"
+os.environ["DB_REPLICA_URIS"] = ""
+os.environ["REDIS_CLIENT_CACHE_ENABLED"] = "false"
+os.environ.setdefault("ACCESS_LOG_SAMPLE_RATE", "0")
+os.environ.setdefault("ACCESS_LOG_SLOW_MS", "1000000")
+# login 场景反复以同一用户登录，压测的是 bcrypt 路径而非限流
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+from contextlib import asynccontextmanager  # noqa: E402
+
+import fakeredis  # noqa: E402
+import httpx  # noqa: E402
+
+from app.db.redis import RedisClient  # noqa: E402
+from app.db.session import engine  # noqa: E402
+from app.main import app  # noqa: E402
+from benchmarks.sqlite import sqlite_metadata  # noqa: E402
+
+# 每个请求一条 httpx 日志会明显拖慢压测
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+async def reset_database() -> None:
+    metadata = sqlite_metadata()
+    async with engine.begin() as conn:
+        await conn.run_sync(metadata.drop_all)
+        await conn.run_sync(metadata.create_all)
+
+
+@asynccontextmanager
+async def running_app():
+    """启动应用（含 lifespan），返回一个直连 ASGI 的 httpx 客户端"""
+    await reset_database()
+    RedisClient._client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            yield client
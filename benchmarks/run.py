@@ -0,0 +1,227 @@
+"""
+API hot-path benchmark.
+
+    uv run python -m benchmarks.run                       # run and print
+    uv run python -m benchmarks.run --save benchmarks/baseline.json
+    uv run python -m benchmarks.run --compare benchmarks/baseline.json
+
+In compare mode the process exits with status 1 if any scenario's throughput
+drops, or its p95 latency grows, by more than --tolerance relative to the baseline.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List
+
+import httpx
+
+from benchmarks.harness import running_app
+
+API = "/api/v1"
+USERNAME = "bench_user"
+PASSWORD = "bench_password"
+
+
+@dataclass
+class Scenario:
+    name: str
+    requests: int
+    # 接收客户端与序号，发起一次请求
+    call: Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def build_scenarios(token: str, scale: float) -> List[Scenario]:
+    auth = {"Authorization": f"Bearer {token}"}
+    counter = itertools.count()
+
+    async def health(client, i):
+        return await client.get("/health")
+
+    async def users_me(client, i):
+        return await client.get(f"{API}/users/me", headers=auth)
+
+    async def login(client, i):
+        return await client.post(
+            f"{API}/auth/login", data={"username": USERNAME, "password": PASSWORD}
+        )
+
+    async def create_user(client, i):
+        n = next(counter)
+        return await client.post(
+            f"{API}/users/",
+            json={
+                "email": f"bench{n}@example.com",
+                "username": f"bench{n}",
+                "password": PASSWORD,
+            },
+        )
+
+    # bcrypt 场景单次请求耗时高，请求数按比例减少
+    return [
+        Scenario("health", int(2000 * scale), health),
+        Scenario("users_me", int(2000 * scale), users_me),
+        Scenario("login", max(int(100 * scale), 1), login),
+        Scenario("create_user", max(int(100 * scale), 1), create_user),
+    ]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(
+        int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1
+    )
+    return sorted_values[index]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, scenario: Scenario, concurrency: int
+) -> Dict[str, float]:
+    # warmup
+    for i in range(min(10, scenario.requests)):
+        await scenario.call(client, i)
+
+    latencies: List[float] = []
+    errors = 0
+    indexes = iter(range(scenario.requests))
+
+    async def worker():
+        nonlocal errors
+        for i in indexes:
+            start = time.perf_counter()
+            response = await scenario.call(client, i)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    # 内存：单独的串行阶段，避免 tracemalloc 开销影响延迟数据
+    samples = max(min(50, scenario.requests // 10), 1)
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for i in range(samples):
+            await scenario.call(client, scenario.requests + i)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "requests": scenario.requests,
+        "errors": errors,
+        "rps": scenario.requests / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "alloc_peak_kib": (peak - baseline) / 1024,
+        "retained_bytes_per_req": (current - baseline) / samples,
+    }
+
+
+async def run(names: List[str], concurrency: int, scale: float) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    async with running_app() as client:
+        response = await client.post(
+            f"{API}/users/",
+            json={
+                "email": f"{USERNAME}@example.com",
+                "username": USERNAME,
+                "password": PASSWORD,
+            },
+        )
+        response.raise_for_status()
+        response = await client.post(
+            f"{API}/auth/login", data={"username": USERNAME, "password": PASSWORD}
+        )
+        response.raise_for_status()
+        token = response.json()["access_token"]
+
+        for scenario in build_scenarios(token, scale):
+            if names and scenario.name not in names:
+                continue
+            results[scenario.name] = await run_scenario(client, scenario, concurrency)
+    return results
+
+
+def compare(
+    results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float
+) -> List[str]:
+    failures = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if current["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(
+                f"{name}: rps {current['rps']:.1f} < baseline {base['rps']:.1f}"
+            )
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(
+                f"{name}: p95 {current['p95_ms']:.2f}ms"
+                f" > baseline {base['p95_ms']:.2f}ms"
+            )
+        if current["errors"]:
+            failures.append(f"{name}: {current['errors']} error responses")
+    return failures
+
+
+def print_table(results: Dict[str, dict]) -> None:
+    header = (
+        f"{'scenario':<12} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'peak KiB':>9} {'retained B/req':>15} {'errors':>6}"
+    )
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<12} {r['rps']:>9.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{r['p99_ms']:>8.2f} {r['alloc_peak_kib']:>9.1f} "
+            f"{r['retained_bytes_per_req']:>15.1f} {r['errors']:>6}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scenario", action="append", default=[], dest="scenarios")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiplier for request counts"
+    )
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    results = asyncio.run(run(args.scenarios, args.concurrency, args.scale))
+    print_table(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failures = compare(results, baseline, args.tolerance)
+        if failures:
+            print("\nRegressions:")
+            for failure in failures:
+                print(f"  {failure}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,26 @@
+"""把 MySQL 模型建到 SQLite 上（压测与单元测试用），导入时没有其他副作用"""
+
+from sqlalchemy import Integer, MetaData, String
+
+from app import models  # noqa: F401
+from app.db.base import Base
+
+
+def sqlite_metadata() -> MetaData:
+    """把 MySQL 方言类型转换为 SQLite 可建表的通用类型"""
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        copy = table.to_metadata(metadata)
+        for column in copy.columns:
+            generic = column.type.as_generic()
+            if isinstance(generic, Integer):
+                # SQLite 只有 INTEGER PRIMARY KEY 才会自增
+                column.type = Integer()
+            elif isinstance(generic, String):
+                column.type = type(generic)(generic.length)
+            else:
+                column.type = generic
+        # MySQL 的索引名按表隔离，SQLite 要求全库唯一
+        for index in copy.indexes:
+            index.name = f"{copy.name}_{index.name}"
+    return metadata
@@ -0,0 +1,37 @@
+"""
+单元测试环境：数据库连接参数给默认值（只创建引擎，不连接 MySQL），Redis 换成 fakeredis，
+需要数据库的测试用 `db` 夹具（临时 SQLite）。环境变量需在导入 app 之前设置。
+"""
+
+import os
+
+os.environ.setdefault("MYSQL_USER", "test")
+os.environ.setdefault("MYSQL_PASSWORD", "test")
+os.environ.setdefault("MYSQL_HOST", "localhost")
+os.environ.setdefault("MYSQL_DB", "test")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine  # noqa: E402
+
+from app.db.redis import RedisClient  # noqa: E402
+from benchmarks.sqlite import sqlite_metadata  # noqa: E402
+
+
+@pytest.fixture
+def redis_client():
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    RedisClient._client = client
+    yield client
+    RedisClient._client = None
+
+
+@pytest.fixture
+async def db(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(sqlite_metadata().create_all)
+    async with AsyncSession(engine, expire_on_commit=False, autoflush=False) as session:
+        yield session
+    await engine.dispose()
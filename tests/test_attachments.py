@@ -0,0 +1,118 @@
+import pytest
+
+from app.crud import crud_attachment_blob
+from app.crud.crud_attachment import attachment_crud
+from app.crud.crud_attachment_blob import attachment_blob_crud
+from app.services.storage import LocalStorage
+
+DIGEST = "ab" * 32
+KEY = "ab/ab/blob.txt"
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LocalStorage(str(tmp_path), "http://files.test")
+    monkeypatch.setattr(crud_attachment_blob, "storage", store)
+    (tmp_path / "ab" / "ab").mkdir(parents=True)
+    (tmp_path / KEY).write_bytes(b"content")
+    return store
+
+
+async def add_blob(db):
+    blob = await attachment_blob_crud.add(
+        db,
+        {
+            "attach_hash": DIGEST,
+            "storage_key": KEY,
+            "attach_size": 7,
+            "attach_mimetype": "text/plain",
+            "attach_extension": "txt",
+        },
+    )
+    await db.commit()
+    return blob
+
+
+async def add_attachment(db, user_id=1):
+    return await attachment_crud.create(
+        db,
+        {
+            "user_id": user_id,
+            "attach_name": "blob.txt",
+            "attach_origin_name": "a.txt",
+            "attach_url": f"http://files.test/{KEY}",
+            "attach_type": 3,
+            "attach_mimetype": "text/plain",
+            "attach_extension": "txt",
+            "attach_size": "7",
+            "attach_hash": DIGEST,
+            "status": 1,
+        },
+    )
+
+
+async def ref_count(db):
+    blob = await attachment_blob_crud.get_by_hash(db, DIGEST)
+    if blob is None:
+        return None
+    await db.refresh(blob)
+    return blob.ref_count
+
+
+async def test_removing_last_reference_deletes_blob_after_commit(db, store):
+    await add_blob(db)
+    first = await add_attachment(db)
+    await attachment_blob_crud.acquire(db, DIGEST)
+    second = await add_attachment(db)
+    assert await ref_count(db) == 2
+
+    await attachment_crud.remove(db, first.id)
+    assert await ref_count(db) == 1
+    assert store.exists(KEY)
+
+    await attachment_crud.remove(db, second.id)
+    assert await ref_count(db) is None
+    assert not store.exists(KEY)
+
+
+async def test_failed_release_keeps_attachment_row(db, store, monkeypatch):
+    await add_blob(db)
+    attachment_id = (await add_attachment(db)).id
+
+    async def fail(db, digest):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr(attachment_blob_crud, "release", fail)
+    with pytest.raises(RuntimeError):
+        await attachment_crud.remove(db, attachment_id)
+    await db.rollback()
+
+    # 删除与引用计数变更同时回滚
+    assert await attachment_crud.get(db, attachment_id) is not None
+    assert await ref_count(db) == 1
+    assert store.exists(KEY)
+
+
+async def test_acquire_counts_references_and_add_rejects_duplicates(db, store):
+    assert await attachment_blob_crud.acquire(db, DIGEST) is None
+    await add_blob(db)
+
+    blob = await attachment_blob_crud.acquire(db, DIGEST)
+    assert blob is not None and await ref_count(db) == 2
+    # 并发上传相同内容时唯一索引冲突，调用方改为 acquire
+    assert await add_blob(db) is None
+    assert await ref_count(db) == 2
+
+
+async def test_release_deletes_only_unreferenced_blob(db, store):
+    assert await attachment_blob_crud.release(db, DIGEST) is None
+    await add_blob(db)
+    await attachment_blob_crud.acquire(db, DIGEST)
+
+    assert await attachment_blob_crud.release(db, DIGEST) is None
+    assert await ref_count(db) == 1
+    assert await attachment_blob_crud.release(db, DIGEST) == KEY
+    await db.commit()
+    assert await ref_count(db) is None
+    # 文件由调用方在提交后删除
+    assert store.exists(KEY)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.models.f_sys_resource import FSysResource
+from app.services import menu_tree as menu_tree_module
+from app.services.menu_tree import MenuTree
+
+# id -> (parent_id, sort_order)
+FOREST = {
+    1: (0, 10),
+    2: (0, 20),
+    3: (1, 5),
+    4: (1, 7),
+    5: (3, 1),
+    6: (2, 1),
+    7: (2, 9),
+}
+ALL = sum(1 << id for id in FOREST)
+WITHOUT_5 = ALL & ~(1 << 5)
+
+
+@pytest.fixture
+async def resources(db, monkeypatch):
+    monkeypatch.setattr(
+        menu_tree_module,
+        "AsyncSessionLocal",
+        async_sessionmaker(db.bind, expire_on_commit=False),
+    )
+    db.add_all(
+        FSysResource(
+            id=id,
+            parent_id=parent_id,
+            sort_order=sort_order,
+            name=f"menu{id}",
+            alias=f"menu{id}",
+            desc="",
+            b_url="",
+            status=1,
+            created_at=0,
+            updated_at=0,
+        )
+        for id, (parent_id, sort_order) in FOREST.items()
+    )
+    await db.commit()
+    return db
+
+
+async def move(db, tree, id, **values):
+    await db.execute(update(FSysResource).where(FSysResource.id == id).values(**values))
+    await db.commit()
+    await tree.refresh([id])
+
+
+async def assert_matches_rebuild(tree):
+    fresh = MenuTree()
+    for bits in (ALL, WITHOUT_5):
+        assert await tree.render(bits, 1) == await fresh.render(bits, 1)
+
+
+def children(blob, id):
+    def find(nodes):
+        for node in nodes:
+            if node["id"] == id:
+                return node
+            found = find(node["children"])
+            if found:
+                return found
+
+    return [child["id"] for child in find(json.loads(blob))["children"]]
+
+
+async def test_moved_subtree_renders_like_a_full_rebuild(resources):
+    tree = MenuTree()
+    # 预热两个顶级菜单的片段与整体缓存
+    for bits in (ALL, WITHOUT_5):
+        await tree.render(bits, 1)
+
+    # 带子节点的 3 从 1 移到 2 下，按 sort_order 插到 6 与 7 之间
+    await move(resources, tree, 3, parent_id=2, sort_order=5)
+    blob = await tree.render(ALL, 1)
+    assert children(blob, 1) == [4]
+    assert children(blob, 2) == [6, 3, 7]
+    assert children(blob, 3) == [5]
+    await assert_matches_rebuild(tree)
+
+    # 同级重新排序
+    await move(resources, tree, 7, sort_order=0)
+    assert children(await tree.render(ALL, 1), 2) == [7, 6, 3]
+    await assert_matches_rebuild(tree)
+
+    # 移回原顶级菜单，排在 4 之后
+    await move(resources, tree, 3, parent_id=1, sort_order=8)
+    assert children(await tree.render(ALL, 1), 1) == [4, 3]
+    await assert_matches_rebuild(tree)
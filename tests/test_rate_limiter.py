@@ -0,0 +1,60 @@
+from starlette.requests import Request
+
+from app.services.rate_limiter import RateLimiter, Rule, client_ip, route_key
+
+
+def make_request(client=("10.0.0.1", 1234)):
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+    if client is not None:
+        scope["client"] = client
+    return Request(scope)
+
+
+async def test_gcra_allows_burst_then_denies(redis_client):
+    limiter = RateLimiter([Rule("t:ip", 3, 60, client_ip)])
+    results = [await limiter.hit(make_request()) for _ in range(4)]
+
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results[:3]] == [2, 1, 0]
+    assert 0 < results[3].retry_after <= 20
+    assert "Retry-After" in results[3].headers()
+    # 其他 IP 的配额不受影响
+    assert (await limiter.hit(make_request(("10.0.0.2", 1)))).allowed
+
+
+async def test_denied_request_consumes_no_rule(redis_client):
+    limiter = RateLimiter(
+        [Rule("t:ip", 10, 60, client_ip), Rule("t:route", 1, 60, route_key)]
+    )
+    assert (await limiter.hit(make_request())).allowed
+    denied = await limiter.hit(make_request())
+    assert not denied.allowed and denied.rule.name == "t:route"
+
+    ip_only = RateLimiter([Rule("t:ip", 10, 60, client_ip)])
+    assert (await ip_only.hit(make_request())).remaining == 8
+
+
+async def test_lease_serves_requests_locally(redis_client, monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.RATE_LIMIT_LEASE_FRACTION", 0.1)
+    limiter = RateLimiter([Rule("t:route", 100, 60, route_key)])
+
+    first = await limiter.hit(make_request())
+    assert first.allowed
+    # 一次预支 10 个令牌，已计入全局配额
+    assert first.remaining == 90
+    tat = await redis_client.get("ratelimit:t:route:all")
+
+    for _ in range(9):
+        assert (await limiter.hit(make_request())).allowed
+    assert await redis_client.get("ratelimit:t:route:all") == tat
+
+    await limiter.hit(make_request())
+    assert await redis_client.get("ratelimit:t:route:all") != tat
+
+
+async def test_no_applicable_rule_is_not_limited(redis_client):
+    limiter = RateLimiter([Rule("t:ip", 1, 60, client_ip)])
+    request = make_request(client=None)
+    assert await limiter.hit(request) is None
+    assert await limiter(request) is None
+    assert await redis_client.keys("ratelimit:*") == []
@@ -0,0 +1,80 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+from app.services.rbac_enforcer import RBACEnforcer
+
+
+def make_enforcer(*rules):
+    enforcer = RBACEnforcer()
+    enforcer._reset(rules)
+    return enforcer
+
+
+def test_deny_overrides_allow_on_same_rule():
+    enforcer = make_enforcer(
+        ("p", "admin", "/api/v1/users/", "GET", ""),
+        ("p", "admin", "/api/v1/users/", "GET", "deny"),
+        ("g", "alice", "admin", "", ""),
+    )
+    assert enforcer.stats()["policies"] == 2
+    assert not enforcer.enforce("alice", "/api/v1/users/", "GET")
+
+    enforcer.apply_changes(removed=[("p", "admin", "/api/v1/users/", "GET", "deny")])
+    assert enforcer.enforce("alice", "/api/v1/users/", "GET")
+
+    enforcer.apply_changes(added=[("p", "admin", "/api/v1/users/", "GET", "deny")])
+    enforcer.apply_changes(removed=[("p", "admin", "/api/v1/users/", "GET", "allow")])
+    assert enforcer.stats()["policies"] == 1
+    assert not enforcer.enforce("alice", "/api/v1/users/", "GET")
+
+
+def test_removing_allow_keeps_pattern_deny():
+    enforcer = make_enforcer(
+        ("p", "ops", "/api/v1/admins/:id", "*", ""),
+        ("p", "ops", "/api/v1/admins/:id", "*", "deny"),
+    )
+    enforcer.apply_changes(removed=[("p", "ops", "/api/v1/admins/:id", "*", "")])
+    assert not enforcer.enforce("ops", "/api/v1/admins/7", "DELETE")
+    enforcer.apply_changes(removed=[("p", "ops", "/api/v1/admins/:id", "*", "deny")])
+    assert enforcer.stats()["policies"] == 0
+    assert not enforcer.enforce("ops", "/api/v1/admins/7", "DELETE")
+
+
+async def test_empty_rule_lists_touch_nothing():
+    enforcer = make_enforcer(("p", "admin", "/api/v1/users/", "GET", ""))
+    enforcer.publish = AsyncMock()
+    db = AsyncMock()
+
+    await enforcer.add_rules(db, [])
+    await enforcer.remove_rules(db, [])
+
+    db.execute.assert_not_awaited()
+    db.commit.assert_not_awaited()
+    db.add_all.assert_not_called()
+    enforcer.publish.assert_not_awaited()
+    assert enforcer.enforce("admin", "/api/v1/users/", "GET")
+
+
+async def test_removal_during_reload_is_not_undone():
+    allow = ("p", "admin", "/api/v1/users/", "GET", "")
+    member = ("g", "alice", "admin", "", "")
+    enforcer = make_enforcer(allow, member)
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def execute(stmt):
+        started.set()
+        await release.wait()
+        # 查询快照早于规则删除的提交
+        return SimpleNamespace(all=lambda: [allow, member])
+
+    task = asyncio.create_task(enforcer.load(SimpleNamespace(execute=execute)))
+    await started.wait()
+    enforcer.on_message(json.dumps({"added": [], "removed": [list(allow)]}))
+    assert not enforcer.enforce("alice", "/api/v1/users/", "GET")
+
+    release.set()
+    await task
+    assert not enforcer.enforce("alice", "/api/v1/users/", "GET")
+    assert enforcer.stats()["policies"] == 0
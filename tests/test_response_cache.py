@@ -0,0 +1,47 @@
+import time
+
+from app.services.response_cache import CacheEntry, ResponseCache, _lock_key
+
+
+def make_entry(generations):
+    return CacheEntry(
+        body=b"{}",
+        media_type="application/json",
+        etag='W/"x"',
+        created_at=time.time(),
+        max_age=60,
+        stale=30,
+        generations=generations,
+    )
+
+
+async def test_invalidated_tag_is_reported_recent(redis_client):
+    cache = ResponseCache(local_maxsize=16, local_ttl=5)
+    _, generations, recent = await cache.get("k", ["menu"])
+    assert generations == {"menu": 0} and not recent
+
+    await cache.set("k", make_entry(generations))
+    await cache.invalidate("menu")
+    entry, generations, recent = await cache.get("k", ["menu"])
+    # 刚失效：条目作废，重新生成应读主库
+    assert entry is None and generations == {"menu": 1} and recent
+
+    await redis_client.delete("respcache:recent:menu")
+    assert not (await cache.get("k", ["menu"]))[2]
+
+
+async def test_unlock_keeps_lock_taken_by_another_worker(redis_client):
+    cache = ResponseCache(local_maxsize=16, local_ttl=5)
+    token = await cache.lock("k", 30)
+    assert token is not None
+    assert await cache.lock("k", 30) is None
+
+    # 锁过期后被另一个 worker 取得
+    await redis_client.set(_lock_key("k"), "other")
+    await cache.unlock("k", token)
+    assert await redis_client.get(_lock_key("k")) == "other"
+
+    await redis_client.delete(_lock_key("k"))
+    token = await cache.lock("k", 30)
+    await cache.unlock("k", token)
+    assert not await redis_client.exists(_lock_key("k"))
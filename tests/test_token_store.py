@@ -0,0 +1,41 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.services import token_store as token_store_module
+from app.services.token_store import TokenStore, TokenStoreBusy
+
+
+async def test_single_session_login_revokes_previous_token(redis_client):
+    store = TokenStore(ttl=60)
+    await store.issue(1, "first")
+    assert await store.issue(1, "second") == "first"
+
+    assert await store.get_user_id("first") is None
+    assert await store.get_user_id("second") == 1
+    assert await store.revoke("second")
+    assert not await store.revoke("second")
+
+
+async def test_concurrent_changes_back_off_then_give_up(redis_client, monkeypatch):
+    store = TokenStore(ttl=60)
+    await store.issue(1, "first")
+    backoff = AsyncMock()
+    monkeypatch.setattr(token_store_module, "_backoff", backoff)
+    # 每次读到的集合都已过时（另一个请求不断登录）
+    monkeypatch.setattr(store, "_user_tokens", AsyncMock(return_value=[]))
+
+    with pytest.raises(TokenStoreBusy):
+        await store.issue(1, "second")
+    assert [c.args for c in backoff.await_args_list] == [
+        (n,) for n in range(token_store_module._MAX_ATTEMPTS)
+    ]
+    assert await store.get_user_id("first") == 1
+
+
+async def test_busy_token_store_maps_to_503():
+    from app.main import token_store_busy_handler
+
+    response = await token_store_busy_handler(None, TokenStoreBusy("busy"))
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
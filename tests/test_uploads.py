@@ -0,0 +1,164 @@
+import hashlib
+import os
+
+import pytest
+
+from app.crud.crud_attachment_blob import attachment_blob_crud
+from app.services import uploads
+from app.services.storage import LocalStorage
+from app.services.uploads import (
+    UploadConflict,
+    UploadError,
+    UploadManager,
+    UploadNotFound,
+)
+
+
+@pytest.fixture
+def manager(tmp_path, redis_client):
+    store = LocalStorage(str(tmp_path), "http://files.test")
+    return UploadManager(store, chunk_size=4, max_size=1024, expire=60)
+
+
+async def body(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def test_stale_offset_is_rechecked_under_lock(manager, redis_client):
+    state = await manager.create(1, "a.txt", 8)
+    upload_id = state["upload_id"]
+    state, _ = await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+    assert state["offset"] == 4
+
+    # 与上一个请求同时发出、带着旧偏移的 PATCH
+    with pytest.raises(UploadConflict) as e:
+        await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+    assert e.value.offset == 4
+    assert manager.storage.part_size(upload_id) == 4
+
+
+async def test_append_after_completion_does_not_recreate_state(
+    manager, redis_client, monkeypatch
+):
+    state = await manager.create(1, "a.txt", 4)
+    upload_id = state["upload_id"]
+
+    async def complete(db, state, digest):
+        await redis_client.delete(manager._key(upload_id))
+
+    monkeypatch.setattr(manager, "_complete", complete)
+    await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+
+    with pytest.raises(UploadNotFound):
+        await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+    assert not await redis_client.exists(manager._key(upload_id))
+
+
+async def test_expired_lock_is_not_released_by_old_holder(manager, redis_client):
+    state = await manager.create(1, "a.txt", 8)
+    upload_id = state["upload_id"]
+    lock_key = manager._lock_key(upload_id)
+
+    async def slow_body():
+        yield b"abcd"
+        # 锁过期后被另一个请求取得
+        await redis_client.set(lock_key, "other")
+        yield b"efgh"
+
+    with pytest.raises(UploadConflict):
+        await manager.append(None, upload_id, 1, 0, slow_body())
+    assert await redis_client.get(lock_key) == "other"
+    assert (await manager.get(upload_id, 1))["offset"] == 4
+
+
+async def test_complete_retries_when_existing_blob_disappears(
+    manager, redis_client, monkeypatch
+):
+    state = await manager.create(1, "a.txt", 4)
+    upload_id = state["upload_id"]
+    added = []
+
+    async def acquire(db, digest):
+        return None
+
+    async def add(db, values):
+        added.append(values)
+        # 第一次与并发上传冲突，对方的记录随即被释放删除
+        return None if len(added) == 1 else values
+
+    async def create_attachment(db, user_id, filename, blob):
+        return blob
+
+    monkeypatch.setattr(uploads.attachment_blob_crud, "acquire", acquire)
+    monkeypatch.setattr(uploads.attachment_blob_crud, "add", add)
+    monkeypatch.setattr(manager, "_create_attachment", create_attachment)
+
+    _, attachment = await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+    assert len(added) == 2
+    assert manager.storage.exists(attachment["storage_key"])
+    assert not await redis_client.exists(manager._key(upload_id))
+
+
+async def test_complete_gives_up_with_conflict(manager, redis_client, monkeypatch):
+    state = await manager.create(1, "a.txt", 4)
+    upload_id = state["upload_id"]
+
+    async def none(db, *args):
+        return None
+
+    monkeypatch.setattr(uploads.attachment_blob_crud, "acquire", none)
+    monkeypatch.setattr(uploads.attachment_blob_crud, "add", none)
+
+    with pytest.raises(UploadConflict):
+        await manager.append(None, upload_id, 1, 0, body(b"abcd"))
+    assert not await redis_client.exists(manager._key(upload_id))
+    assert not await redis_client.exists(manager._lock_key(upload_id))
+
+
+async def upload(manager, db, user_id, content):
+    state = await manager.create(user_id, "a.txt", len(content))
+    _, attachment = await manager.append(
+        db, state["upload_id"], user_id, 0, body(content)
+    )
+    return attachment
+
+
+async def test_instant_requires_owning_the_content(manager, redis_client, db):
+    first = await upload(manager, db, 1, b"secret")
+    digest = first.attach_hash
+
+    # 哈希可以从别处得知，但其他用户不能凭它引用内容
+    assert await manager.instant(db, 2, "b.txt", 6, digest) is None
+    assert await manager.instant(db, 1, "b.txt", 5, digest) is None
+
+    again = await manager.instant(db, 1, "b.txt", 6, digest)
+    assert again.user_id == 1 and again.attach_url == first.attach_url
+    blob = await attachment_blob_crud.get_by_hash(db, digest)
+    await db.refresh(blob)
+    assert blob.ref_count == 2
+
+
+async def test_same_content_is_stored_once(manager, redis_client, db):
+    first = await upload(manager, db, 1, b"shared")
+    second = await upload(manager, db, 2, b"shared")
+
+    assert first.attach_hash == second.attach_hash
+    assert first.attach_url == second.attach_url
+    blob = await attachment_blob_crud.get_by_hash(db, first.attach_hash)
+    await db.refresh(blob)
+    assert blob.ref_count == 2
+    assert not os.listdir(os.path.join(manager.storage.root, ".parts"))
+
+
+async def test_declared_sha256_is_verified_on_completion(manager, redis_client, db):
+    state = await manager.create(
+        1, "a.txt", 4, sha256=hashlib.sha256(b"abcd").hexdigest()
+    )
+    upload_id = state["upload_id"]
+
+    with pytest.raises(UploadError):
+        await manager.append(db, upload_id, 1, 0, body(b"abce"))
+    assert not await redis_client.exists(manager._key(upload_id))
+    assert manager.storage.part_size(upload_id) == 0
+    assert await attachment_blob_crud.get_by_hash(db, state["sha256"]) is None